@@ -117,6 +117,11 @@ def is_vector_structure(dtype: np.dtype) -> bool:
             dtype.names == vector_field_names and
             all([dtype[i] == dtype[0] for i in range(1, ndim)]))
 
+# Note: DataType instances are immutable and converted on every array
+#         construction, so the conversions are memoized per (kind,nbit,veclen)
+_BFDTYPE_CACHE = {}
+_NUMPY_DTYPE_CACHE = {}
+
 class DataType(object):
     # Note: Default of None results in default Numpy type (np.float)
     def __init__(self, t: Optional[Union[str,_th.BFdtype_enum,_bf.BFdtype,"DataType",np.dtype]]=None):
@@ -180,19 +185,31 @@ class DataType(object):
     def __ne__(self, other):
         return not (self == other)
     def as_BFdtype(self) -> _bf.BFdtype:
+        key = (self._kind, self._nbit, self._veclen)
+        try:
+            return _BFDTYPE_CACHE[key]
+        except KeyError:
+            pass
         base = TYPEMAP[self._kind][self._nbit]
-        return base | ((self._veclen - 1) << _bf.BF_DTYPE_VECTOR_BIT0)
+        ret = base | ((self._veclen - 1) << _bf.BF_DTYPE_VECTOR_BIT0)
+        return _BFDTYPE_CACHE.setdefault(key, ret)
     def as_numpy_dtype(self) -> np.dtype:
+        key = (self._kind, self._nbit, self._veclen)
+        try:
+            return _NUMPY_DTYPE_CACHE[key]
+        except KeyError:
+            pass
         base = np.dtype(NUMPY_TYPEMAP[self._kind][self._nbit])
         if self._veclen == 1:
-            return base
+            ret = base
         else:
             #return np.dtype((base, self._veclen))
             # WAR for vector types not working as expected when passed to
             #   np.view (the shape gets merged into the ndarray's shape instead
             #   of remaining part of the dtype). We return a structure type
             #   with fields representing a vector instead.
-            return np.dtype(','.join((str(base),)*self._veclen))
+            ret = np.dtype(','.join((str(base),)*self._veclen))
+        return _NUMPY_DTYPE_CACHE.setdefault(key, ret)
     def __str__(self):
         if self._veclen == 1:
             return f"{self._kind}{self._nbit}"
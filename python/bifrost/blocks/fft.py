@@ -27,6 +27,8 @@
 
 from bifrost.pipeline import TransformBlock
 from bifrost.fft import Fft
+from bifrost.map import map as bf_map
+from bifrost.ndarray import ndarray
 from bifrost.units import transform_units
 from bifrost.DataType import DataType
 
@@ -35,6 +37,19 @@ from copy import deepcopy
 from bifrost import telemetry
 telemetry.track_module()
 
+def _fftshift(idata, odata, axes, inverse=False):
+    # Cyclic shift of idata along axes into odata via bifrost.map
+    ind_names = ['i%i' % i for i in range(idata.ndim)]
+    inds = list(ind_names)
+    for ax in axes:
+        if inverse:
+            inds[ax] += '-(a.shape(%i)-a.shape(%i)/2)' % (ax, ax)
+        else:
+            inds[ax] += '-a.shape(%i)/2' % ax
+    inds = ','.join(inds)
+    bf_map("b = a(%s)" % inds, shape=idata.shape, axis_names=ind_names,
+           data={'a': idata, 'b': odata})
+
 class FftBlock(TransformBlock):
     # TODO: Add support for sizes (aka 's') parameter that defines transform
     #         length in each dimension (i.e., cropped/padded transforms).
@@ -53,6 +68,8 @@ class FftBlock(TransformBlock):
         self.inverse     = inverse
         self.axis_labels = axis_labels
         self.apply_fftshift = apply_fftshift
+        # Set when a downstream FftShiftBlock has been fused into this block
+        self.fused_fftshift = False
         self.space       = self.irings[0].space
         self.fft         = Fft()
         self.plan_ishape   = None
@@ -114,10 +131,25 @@ class FftBlock(TransformBlock):
                 otensor['scales'][ax][1] = 1. / (scale * length)
             if 'labels' in otensor and self.axis_labels is not None:
                 otensor['labels'][ax] = self.axis_labels[i]
+        if self.fused_fftshift:
+            # Mirror the header update made by FftShiftBlock
+            if 'scales' in otensor:
+                for ax in axes:
+                    scale_step = otensor['scales'][ax][1]
+                    otensor['scales'][ax][0] -= (otensor['shape'][ax] // 2) * scale_step
+            # Only complex inputs can be shifted inside the transform itself;
+            #   otherwise the shift is done as a separate pass
+            self.shift_output = self.mode != 'c2c'
+            self.plan_ishape = None
+        else:
+            self.shift_output = False
         return ohdr
     def on_data(self, ispan, ospan):
         idata = ispan.data
         odata = ospan.data
+        if self.shift_output:
+            self._on_data_shift_output(idata, odata)
+            return
         # Check if shapes or strides have changed
         if (idata.shape   != self.plan_ishape or
             odata.shape   != self.plan_oshape or
@@ -125,7 +157,8 @@ class FftBlock(TransformBlock):
             odata.strides != self.plan_ostrides):
             # (Re-)generate the FFT plan
             self.fft.init(idata, odata, axes=self.axes,
-                          apply_fftshift=self.apply_fftshift)
+                          apply_fftshift=(self.apply_fftshift or
+                                          self.fused_fftshift))
             self.plan_ishape   = idata.shape
             self.plan_oshape   = odata.shape
             self.plan_istrides = idata.strides
@@ -135,6 +168,25 @@ class FftBlock(TransformBlock):
             self.fft.execute_workspace(idata, odata,
                                        workspace.ptr, workspace.size,
                                        inverse=self.inverse)
+    def _on_data_shift_output(self, idata, odata):
+        # Transform into a scratch array and then apply the fused fftshift
+        #   while copying into the output span
+        if (idata.shape   != self.plan_ishape or
+            odata.shape   != self.plan_oshape or
+            idata.strides != self.plan_istrides):
+            self.shift_tmp = ndarray(shape=odata.shape, dtype=odata.bf.dtype,
+                                     space=self.space)
+            self.fft.init(idata, self.shift_tmp, axes=self.axes)
+            self.plan_ishape   = idata.shape
+            self.plan_oshape   = odata.shape
+            self.plan_istrides = idata.strides
+            self.plan_ostrides = None
+        size = self.fft.workspace_size
+        with self.get_temp_storage(self.space).allocate(size) as workspace:
+            self.fft.execute_workspace(idata, self.shift_tmp,
+                                       workspace.ptr, workspace.size,
+                                       inverse=self.inverse)
+        _fftshift(self.shift_tmp, odata, self.axes)
 
 def fft(iring, axes, inverse=False, real_output=False, axis_labels=None,
         apply_fftshift=False,
@@ -25,8 +25,8 @@
 # (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
-from bifrost.map import map as bf_map
-from bifrost.pipeline import TransformBlock
+from bifrost.pipeline import TransformBlock, base_ring
+from bifrost.blocks.fft import FftBlock, _fftshift
 
 from copy import deepcopy
 
@@ -64,20 +64,31 @@ class FftShiftBlock(TransformBlock):
                 scale_shift = sgn * (oshape[ax] // 2) * scale_step
                 otensor['scales'][ax][0] += scale_shift
         return ohdr
+    def fuse_with_producer(self, blocks):
+        # A forward shift of every transformed axis straight after a forward
+        #   FFT can be applied by the FFT itself (see Fft.init's
+        #   apply_fftshift), provided that nothing else reads the FFT output
+        iring = self.irings[0]
+        producer = iring.owner
+        if (iring.is_view or
+            not isinstance(producer, FftBlock) or
+            self.inverse or
+            producer.inverse or
+            producer.real_output or
+            producer.apply_fftshift or
+            producer.fused_fftshift or
+            sorted(producer.specified_axes, key=str) != sorted(self.specified_axes, key=str)):
+            return False
+        readers = [block for block in blocks
+                   if any(base_ring(r) is iring for r in block.irings)]
+        if readers != [self]:
+            return False
+        if not self.bypass(blocks):
+            return False
+        producer.fused_fftshift = True
+        return True
     def on_data(self, ispan, ospan):
-        idata = ispan.data
-        odata = ospan.data
-        shape = idata.shape
-        ind_names = ['i%i' % i for i in range(idata.ndim)]
-        inds = list(ind_names)
-        for ax in self.axes:
-            if self.inverse:
-                inds[ax] += '-(a.shape(%i)-a.shape(%i)/2)' % (ax, ax)
-            else:
-                inds[ax] += '-a.shape(%i)/2' % ax
-        inds = ','.join(inds)
-        bf_map("b = a(%s)" % inds, shape=shape, axis_names=ind_names,
-               data={'a': idata, 'b': odata})
+        _fftshift(ispan.data, ospan.data, self.axes, self.inverse)
 
 def fftshift(iring, axes, inverse=False, *args, **kwargs):
     """Apply an FFT shift to data along specified axes.
@@ -28,13 +28,26 @@
 from bifrost.libbifrost import _bf, _th, _check, _get, BifrostObject
 from bifrost.ndarray import asarray
 from bifrost.ndarray import ndarray
+from bifrost.device import ExternalStream
 import ctypes
 
-from typing import List, Optional, Tuple, Union
+from typing import Any, List, Optional, Tuple, Union
 
 from bifrost import telemetry
 telemetry.track_module()
 
+# Note: Bound once here since this is called for every transform
+if _bf.BF_CUDA_ENABLED:
+    _bfFftExecute = _bf.bfFftExecute
+
+_AXES_TYPE_CACHE = {}
+def _axes_type(ndim: int):
+    # Note: ctypes array types are slow to create, so reuse them
+    try:
+        return _AXES_TYPE_CACHE[ndim]
+    except KeyError:
+        return _AXES_TYPE_CACHE.setdefault(ndim, ctypes.c_int * ndim)
+
 class Fft(BifrostObject):
     def __init__(self):
         BifrostObject.__init__(self, _bf.bfFftCreate, _bf.bfFftDestroy)
@@ -43,10 +56,12 @@ class Fft(BifrostObject):
              apply_fftshift: bool=False):
         if isinstance(axes, int):
             axes = [axes]
-        ndim = len(axes)
         if axes is not None:
-            axes_type = ctypes.c_int * ndim
-            axes = axes_type(*axes)
+            ndim = len(axes)
+            axes = _axes_type(ndim)(*axes)
+        else:
+            # Note: bfFftInit transforms the last 'ndim' axes when none are given
+            ndim = len(iarray.shape)
         self.workspace_size = _get(_bf.bfFftInit,
                                    self.obj,
                                    asarray(iarray).as_BFarray(),
@@ -54,17 +69,29 @@ class Fft(BifrostObject):
                                    ndim,
                                    axes,
                                    apply_fftshift)
-    def execute(self, iarray: ndarray, oarray: ndarray, inverse: bool=False) -> ndarray:
+    def execute(self, iarray: ndarray, oarray: ndarray, inverse: bool=False,
+                stream: Optional[Any]=None) -> ndarray:
         return self.execute_workspace(iarray, oarray,
                                       workspace_ptr=None, workspace_size=0,
-                                      inverse=inverse)
+                                      inverse=inverse, stream=stream)
     def execute_workspace(self, iarray: ndarray, oarray: ndarray,
                           workspace_ptr: int, workspace_size: int,
-                          inverse: bool=False) -> ndarray:
-        _check(_bf.bfFftExecute(
-            self.obj,
-            asarray(iarray).as_BFarray(),
-            asarray(oarray).as_BFarray(),
-            inverse,
-            workspace_ptr, workspace_size))
+                          inverse: bool=False,
+                          stream: Optional[Any]=None) -> ndarray:
+        """Execute the transform, optionally on 'stream' (a raw CUDA stream
+        handle or a cupy/pycuda stream) instead of the current Bifrost
+        stream."""
+        if stream is not None:
+            with ExternalStream(stream):
+                return self.execute_workspace(iarray, oarray,
+                                              workspace_ptr, workspace_size,
+                                              inverse=inverse)
+        status = _bfFftExecute(self.obj,
+                               asarray(iarray).as_BFarray(),
+                               asarray(oarray).as_BFarray(),
+                               inverse,
+                               workspace_ptr, workspace_size)
+        # Note: _check is only needed to raise on failure
+        if status != _bf.BF_STATUS_SUCCESS:
+            _check(status)
         return oarray
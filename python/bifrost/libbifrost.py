@@ -40,7 +40,7 @@ import bifrost.libbifrost_typehints as _th
 bf = _bf # Public access to library
 th = _th # Public access to type hints
 
-from typing import Any, Callable
+from typing import Any, Callable, List, Optional
 
 from bifrost import telemetry
 telemetry.track_module()
@@ -58,6 +58,7 @@ class EndOfDataStop(RuntimeError):
 
 class BifrostObject(object):
     """Base class for simple objects with create/destroy functions"""
+    __slots__ = ('_obj_basename', 'obj', '_destructor', '__weakref__')
     def __init__(self, constructor: Callable, destructor: Callable, *args: Any):
         self._obj_basename = constructor.__name__.replace('Create','')
         self.obj = destructor.argtypes[0]()
@@ -122,23 +123,24 @@ def _array(size_or_vals, dtype=None):
                 raise TypeError("Cannot deduce C type from ", type(vals[0]))
         return (dtype * len(vals))(*vals)
 
+# Note: The success case is by far the most common, so it is tested first
+#         and returns a pre-built enum value
+_BF_STATUS_SUCCESS = _bf.BF_STATUS_SUCCESS
+_STATUS_SUCCESS = _th.BFstatus_enum(_BF_STATUS_SUCCESS)
+
 def _check(status: _bf.BFstatus) -> _th.BFstatus_enum:
+    if status == _BF_STATUS_SUCCESS:
+        return _STATUS_SUCCESS
     if __debug__:
-        if status != _bf.BF_STATUS_SUCCESS:
-            if status is None:
-                raise RuntimeError("WTF, status is None")
-            if status == _bf.BF_STATUS_END_OF_DATA:
-                raise EndOfDataStop('BF_STATUS_END_OF_DATA')
-            elif status == _bf.BF_STATUS_WOULD_BLOCK:
-                raise IOError('BF_STATUS_WOULD_BLOCK')
-            else:
-                status_str = _bf.bfGetStatusString(status)
-                raise RuntimeError(status_str)
-    else:
-        if status == _bf.BF_STATUS_END_OF_DATA:
-            raise EndOfDataStop('BF_STATUS_END_OF_DATA')
-        elif status == _bf.BF_STATUS_WOULD_BLOCK:
-            raise IOError('BF_STATUS_WOULD_BLOCK')
+        if status is None:
+            raise RuntimeError("WTF, status is None")
+    if status == _bf.BF_STATUS_END_OF_DATA:
+        raise EndOfDataStop('BF_STATUS_END_OF_DATA')
+    elif status == _bf.BF_STATUS_WOULD_BLOCK:
+        raise IOError('BF_STATUS_WOULD_BLOCK')
+    if __debug__:
+        status_str = _bf.bfGetStatusString(status)
+        raise RuntimeError(status_str)
     return _th.BFstatus_enum(status)
 
 DEREF = {ctypes.POINTER(t): t for t in [ctypes.c_bool,
@@ -176,13 +178,48 @@ def _get(func: Callable, *args: Any) -> Any:
     _check(func(*args))
     return ret.value
 
+# Note: These two return copies of _bf functions whose status is checked by a
+#         ctypes errcheck hook, which is cheaper than wrapping each call in
+#         _check/_get.  The copies are bound by name so that ctypes can also
+#         allocate (and dereference) the output argument of getters itself.
+def _errcheck(status: int, func: Callable, args: tuple) -> Any:
+    if status != _bf.BF_STATUS_SUCCESS:
+        _check(status)
+    return args
+
+def _checked(func: Callable, argtypes: Optional[List]=None) -> Callable:
+    """Return a variant of func that raises like _check on failure.  If given,
+    argtypes replaces func's argument types (e.g., to accept any handle type
+    as a c_void_p)"""
+    if argtypes is None:
+        argtypes = func.argtypes
+    proto = ctypes.CFUNCTYPE(func.restype, *argtypes)
+    checked = proto((func.__name__, _bf._libs['bifrost']))
+    checked.errcheck = _errcheck
+    return checked
+
+def _getter(func: Callable) -> Callable:
+    """Return a variant of func that, like _get, takes every argument but
+    the last (output) one and returns the output value"""
+    proto = ctypes.CFUNCTYPE(func.restype, *func.argtypes)
+    paramflags = ((1,),)*(len(func.argtypes) - 1) + ((2,),)
+    getter = proto((func.__name__, _bf._libs['bifrost']), paramflags)
+    getter.errcheck = _errcheck
+    return getter
+
+_SPACE_CACHE = {}
 def _string2space(s: str) -> _bf.BFspace:
+    # Note: This is called for every allocation, so the lookup is memoized
+    try:
+        return _SPACE_CACHE[s]
+    except KeyError:
+        pass
     try:
         space = getattr(_th.BFspace_enum, s)
     except AttributeError:
         raise KeyError("Invalid space '" + str(s) +
                        "'.\nValid spaces: " + str(list(_th.BFspace_enum)))
-    return _bf.BFspace(space.value)
+    return _SPACE_CACHE.setdefault(s, _bf.BFspace(space.value))
 
 def _space2string(i: _bf.BFspace) -> str:
     name = _th.BFspace_enum(i).name
@@ -28,16 +28,22 @@
 from bifrost.libbifrost import _bf, _check, BifrostObject
 from bifrost.ndarray import asarray
 from bifrost.ndarray import ndarray
+from bifrost.device import ExternalStream
 
-from typing import Optional
+from typing import Any, Optional
 
 from bifrost import telemetry
 telemetry.track_module()
 
+# Note: Bound once here since this is called for every product
+if _bf.BF_CUDA_ENABLED:
+    _bfLinAlgMatMul = _bf.bfLinAlgMatMul
+
 class LinAlg(BifrostObject):
     def __init__(self):
         BifrostObject.__init__(self, _bf.bfLinAlgCreate, _bf.bfLinAlgDestroy)
-    def matmul(self, alpha: float, a: Optional[ndarray], b: Optional[ndarray], beta: float, c: ndarray) -> ndarray:
+    def matmul(self, alpha: float, a: Optional[ndarray], b: Optional[ndarray], beta: float, c: ndarray,
+               stream: Optional[Any]=None) -> ndarray:
         """Computes:
           c = alpha*a.b + beta*c
         or if b is None:
@@ -48,7 +54,15 @@ class LinAlg(BifrostObject):
         Multi-dimensional semantics are the same as numpy.matmul:
           The last two dims represent the matrix, and all other dims are
           used as batch dims to be matched or broadcast between a and b.
+        Setting BF_LINALG_TF32=1 in the environment lets cf32 products use
+          TF32 tensor cores on sm_80+ (faster, but with a 10-bit mantissa).
+        If 'stream' is given (a raw CUDA stream handle or a cupy/pycuda
+          stream) the product is queued there instead of on the current
+          Bifrost stream.
         """
+        if stream is not None:
+            with ExternalStream(stream):
+                return self.matmul(alpha, a, b, beta, c)
         if alpha is None:
             alpha = 1.
         if beta is None:
@@ -58,10 +72,13 @@ class LinAlg(BifrostObject):
         a_array = asarray(a).as_BFarray() if a is not None else None
         b_array = asarray(b).as_BFarray() if b is not None else None
         c_array = asarray(c).as_BFarray()
-        _check(_bf.bfLinAlgMatMul(self.obj,
-                                  alpha,
-                                  a_array,
-                                  b_array,
-                                  beta,
-                                  c_array))
+        status = _bfLinAlgMatMul(self.obj,
+                                 alpha,
+                                 a_array,
+                                 b_array,
+                                 beta,
+                                 c_array)
+        # Note: _check is only needed to raise on failure
+        if status != _bf.BF_STATUS_SUCCESS:
+            _check(status)
         return c
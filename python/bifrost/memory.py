@@ -27,35 +27,143 @@
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 from bifrost.libbifrost import _bf, _check, _get, _string2space
+from bifrost.device import get_stream, stream_synchronize
+import os
 import ctypes
+import threading
 
 from typing import Any, List
 
 from bifrost import telemetry
 telemetry.track_module()
 
+# Note: Bound once here since these are called for every array allocation
+_bfMalloc   = _bf.bfMalloc
+_bfMallocEx = _bf.bfMallocEx
+_bfFree     = _bf.bfFree
+_bfGetSpace = _bf.bfGetSpace
+
+# Note: (space, from_space) pairs where memory in 'space' can be accessed from
+#         'from_space'; every space is also accessible from itself
+_ACCESS = frozenset([('cuda_host',    'system'),
+                     ('cuda_managed', 'system'),
+                     ('cuda_managed', 'cuda')])
+
 def space_accessible(space: str, from_spaces: List[str]) -> bool:
     if from_spaces == 'any': # TODO: This is a little bit hacky
         return True
-    from_spaces = set(from_spaces)
-    if space in from_spaces:
-        return True
-    elif space == 'cuda_host':
-        return 'system' in from_spaces
-    elif space == 'cuda_managed':
-        return 'system' in from_spaces or 'cuda' in from_spaces
-    else:
-        return False
+    return any(space == from_space or (space, from_space) in _ACCESS
+               for from_space in from_spaces)
 
-def raw_malloc(size: int, space: str) -> int:
+def raw_malloc(size: int, space: str, flags: int=0) -> int:
+    """Allocate 'size' bytes in 'space'.  'flags' is a combination of the
+    BF_MALLOC_* hints (e.g., _bf.BF_MALLOC_WRITE_COMBINED for cuda_host
+    buffers that are only written by the host, or _bf.BF_MALLOC_PREFETCH to
+    migrate cuda_managed buffers to the device up front)."""
     ptr = ctypes.c_void_p()
-    _check(_bf.bfMalloc(ptr, size, _string2space(space)))
+    if flags:
+        _check(_bfMallocEx(ptr, size, _string2space(space), flags))
+    else:
+        _check(_bfMalloc(ptr, size, _string2space(space)))
     return ptr.value
 def raw_free(ptr: int, space: str='auto') -> int:
-    _check(_bf.bfFree(ptr, _string2space(space)))
+    _check(_bfFree(ptr, _string2space(space)))
 def raw_get_space(ptr: int) -> _bf.BFspace:
-    return _get(_bf.bfGetSpace, ptr)
+    return _get(_bfGetSpace, ptr)
 
 def alignment() -> int:
     ret, _ = _bf.bfGetAlignment()
     return ret
+
+def _pool_nbyte(size):
+    # Note: Small sizes are rounded up to powers of two and large ones to
+    #         whole MiB so that similar requests can share cached buffers
+    if size <= (1 << 20):
+        return 1 << max(size - 1, 0).bit_length()
+    return ((size - 1) // (1 << 20) + 1) << 20
+
+class MemoryPool(object):
+    """Caches freed 'cuda' allocations so that they can be reused by later
+    allocations of the same (rounded) size on the same stream.  This avoids
+    the cost of cudaMalloc/cudaFree, and the device-wide synchronization that
+    cudaFree implies, for arrays that are created and destroyed per gulp.
+    
+    Only device memory is pooled: reuse is ordered by the stream the buffer
+    was allocated on, which does not protect host-accessible memory from
+    host access.  Buffers freed from a different stream are released
+    immediately.  Set max_cached_nbyte to 0 to disable caching.
+    
+    Cached buffers are not returned to CUDA until clear() is called, so
+    the default_pool used by bifrost.ndarray only caches if asked to via
+    the BIFROST_POOL_MAX_MB environment variable (e.g., 256 for 256 MiB).
+    
+    If pin_host is True, 'system' allocations are served from page-locked
+    'cuda_host' memory so that copies to and from the GPU can use DMA.
+    These are pooled as well, and the stream is synchronized before a cached
+    buffer is handed back to the host."""
+    spaces = ('cuda',)
+    def __init__(self, max_cached_nbyte: int=256*1024**2,
+                 pin_host: bool=False):
+        self.max_cached_nbyte = max_cached_nbyte
+        self.pin_host = bool(pin_host) and bool(_bf.BF_CUDA_ENABLED)
+        self.cached_nbyte = 0
+        self._lock   = threading.Lock()
+        self._cache  = {} # (stream, nbyte, space) -> [ptr, ...]
+        self._in_use = {} # ptr -> (stream, nbyte, space)
+    def malloc(self, size: int, space: str) -> int:
+        if not size:
+            # Note: Not tracked, so must be allocated in the space that the
+            #         caller will later free it from
+            return raw_malloc(size, space)
+        if space == 'system' and self.pin_host:
+            space = 'cuda_host'
+        elif space not in self.spaces:
+            return raw_malloc(size, space)
+        key = (get_stream(), _pool_nbyte(size), space)
+        ptr = None
+        if self.max_cached_nbyte:
+            with self._lock:
+                ptrs = self._cache.get(key)
+                ptr = ptrs.pop() if ptrs else None
+                if ptr is not None:
+                    self.cached_nbyte -= key[1]
+            if ptr is not None and space == 'cuda_host':
+                # Wait for any pending copies out of the buffer to finish
+                stream_synchronize()
+        if ptr is None:
+            try:
+                ptr = raw_malloc(key[1], space)
+            except RuntimeError:
+                # Release everything cached and try again
+                self.clear()
+                ptr = raw_malloc(key[1], space)
+        with self._lock:
+            self._in_use[ptr] = key
+        return ptr
+    def free(self, ptr: int, space: str) -> None:
+        with self._lock:
+            key = self._in_use.pop(ptr, None)
+            if key is not None:
+                space = key[2]
+                if (self.cached_nbyte + key[1] <= self.max_cached_nbyte and
+                    key[0] == get_stream()):
+                    self._cache.setdefault(key, []).append(ptr)
+                    self.cached_nbyte += key[1]
+                    return
+        raw_free(ptr, space)
+    def clear(self) -> None:
+        """Release all cached buffers"""
+        with self._lock:
+            cache, self._cache = self._cache, {}
+            self.cached_nbyte = 0
+        for key, ptrs in cache.items():
+            for ptr in ptrs:
+                raw_free(ptr, key[2])
+
+# Note: Used by bifrost.ndarray for the buffers that it owns
+#       Set BIFROST_POOL_MAX_MB to the number of MiB of freed device memory
+#         to keep cached for reuse (default 0, i.e., no caching)
+#       Set BIFROST_PIN_HOST=1 to back 'system' arrays with pinned memory
+default_pool = MemoryPool(
+    max_cached_nbyte=int(os.environ.get('BIFROST_POOL_MAX_MB', '0'))*1024**2,
+    pin_host=os.environ.get('BIFROST_PIN_HOST', '0') == '1')
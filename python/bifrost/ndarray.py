@@ -38,13 +38,14 @@ TODO: Some calls result in segfault with space=cuda (e.g., __getitem__
 
 import sys
 import ctypes
+import functools
 import numpy as np
 try:
     from numpy.exceptions import ComplexWarning as NPComplexWarning
 except ImportError:
     from numpy import ComplexWarning as NPComplexWarning
-from bifrost.memory import raw_malloc, raw_free, raw_get_space, space_accessible
-from bifrost.libbifrost import _bf, _th, _check, _array, _space2string
+from bifrost.memory import raw_get_space, space_accessible, default_pool
+from bifrost.libbifrost import _bf, _th, _check, _array, _space2string, _string2space
 from bifrost import device
 from bifrost.DataType import DataType
 from bifrost.Space import Space
@@ -60,41 +61,116 @@ telemetry.track_module()
 
 # TODO: Single-element assignment appears to be broken
 
+# Note: This doesn't work as a buffer when using pypy
+# return (ctypes.c_byte*nbyte).from_address(address)
+# Note: This works as a buffer in regular python and pypy
+# Note: int_asbuffer is undocumented; see here:
+# https://mail.scipy.org/pipermail/numpy-discussion/2008-January/030938.html
+# Note: Configured once here since this is called for every ring span
+_int_asbuffer = ctypes.pythonapi.PyMemoryView_FromMemory
+_int_asbuffer.restype = ctypes.py_object
+_int_asbuffer.argtypes = (ctypes.c_void_p, ctypes.c_ssize_t, ctypes.c_int)
+
 def _address_as_buffer(address, nbyte, readonly=False):
     if address is None:
         raise ValueError("Cannot create buffer from NULL pointer")
-    # Note: This doesn't work as a buffer when using pypy
-    # return (ctypes.c_byte*nbyte).from_address(address)
-    # Note: This works as a buffer in regular python and pypy
-    # Note: int_asbuffer is undocumented; see here:
-    # https://mail.scipy.org/pipermail/numpy-discussion/2008-January/030938.html
-    int_asbuffer = ctypes.pythonapi.PyMemoryView_FromMemory
-    int_asbuffer.restype = ctypes.py_object
-    int_asbuffer.argtypes = (ctypes.c_void_p, ctypes.c_ssize_t, ctypes.c_int)
-    return int_asbuffer(address, nbyte, 0x100 if readonly else 0x200)
-        
+    return _int_asbuffer(address, nbyte, 0x100 if readonly else 0x200)
+
+def _is_plain_cast(base, dtype):
+    """Return True if the numpy array base can be cast directly into a new
+    system-space array of DataType dtype with np.copyto"""
+    if not isinstance(base, np.ndarray) or isinstance(base, ndarray):
+        return False
+    if base.dtype.fields is not None:
+        return False
+    np_dtype = dtype.as_numpy_dtype()
+    # Note: Complex integer types are numpy structured types
+    return np_dtype.fields is None and DataType(np_dtype) == dtype
+
+def _c_layout(shape, dtype):
+    """Return the (shape, strides, nbyte) of a C-ordered array of DataType
+    dtype"""
+    itemsize_bits = dtype.itemsize_bits
+    # HACK to support 'packed' arrays, by folding the last
+    #   dimension of the shape into the dtype.
+    # TODO: Consider using bit strides when dtype < 8 bits
+    #         It's hacky, but it may be worth it
+    if itemsize_bits < 8:
+        pack_factor = 8 // itemsize_bits
+        if not len(shape) or shape[-1] % pack_factor != 0:
+            raise ValueError("Array cannot be packed")
+        shape = list(shape)
+        shape[-1] //= pack_factor
+        itemsize = 1
+    else:
+        itemsize = itemsize_bits // 8
+    # Note: A plain loop is much faster than np.cumprod for the
+    #         handful of dims that arrays have
+    strides = [0] * len(shape)
+    stride = itemsize
+    for d in range(len(shape) - 1, -1, -1):
+        strides[d] = stride
+        stride *= shape[d]
+    nbyte = strides[0] * shape[0] if len(shape) else itemsize
+    return shape, tuple(strides), nbyte
+
+@functools.lru_cache(maxsize=256)
+def _empty_factory(shape, dtype, space):
+    # Returns a function that allocates new C-ordered, native, unconjugated
+    #   arrays with the given metadata, which is all worked out up front
+    dtype = DataType(dtype)
+    shape, strides, nbyte = _c_layout(shape, dtype)
+    shape = tuple(shape)
+    dtype_np = np.dtype(dtype.as_numpy_dtype())
+    def empty_fast():
+        ownbuffer = default_pool.malloc(nbyte, space)
+        obj = np.ndarray.__new__(ndarray, shape, dtype_np,
+                                 _address_as_buffer(ownbuffer, nbyte), 0,
+                                 strides)
+        obj.bf = BFArrayInfo(space, dtype, True, False, ownbuffer)
+        obj._update_BFarray()
+        return obj
+    return empty_fast
+
 def asarray(arr, space=None):
     if isinstance(arr, ndarray) and (space is None or space == arr.bf.space):
         return arr
+    elif space is None and isinstance(arr, np.ndarray):
+        # Note: This is what ndarray(arr) does, minus the argument checks
+        return arr.view(ndarray) # Note: This calls __array_finalize__
     else:
         return ndarray(arr, space=space)
 
 def empty_like(arr, space=None):
-    arr = asarray(arr)
+    if not isinstance(arr, ndarray):
+        arr = asarray(arr)
     if space is None:
         space = arr.bf.space
     return ndarray(shape=arr.shape, dtype=arr.bf.dtype, space=space,
                    native=arr.bf.native, conjugated=arr.bf.conjugated)
 def empty(shape, dtype='f32', space=None, **kwargs):
+    if not kwargs:
+        # Note: Arrays with the same metadata tend to be created over and
+        #         over, so the allocator for each one is cached
+        if isinstance(shape, int):
+            shape = (shape,)
+        try:
+            factory = _empty_factory(tuple(shape), dtype, space or 'system')
+        except TypeError:
+            # Unhashable dtype (e.g., a DataType instance)
+            pass
+        else:
+            return factory()
     return ndarray(shape=shape, dtype=dtype, space=space, **kwargs)
 
 def zeros_like(arr, space=None):
     ret = empty_like(arr, space)
-    memset_array(ret, 0)
+    # Note: ret is already a bf.ndarray, so memset_array's wrapping is skipped
+    _check(_bf.bfArrayMemset(ret.as_BFarray(), 0))
     return ret
 def zeros(shape, dtype='f32', space=None, **kwargs):
     ret = empty(shape, dtype, space, **kwargs)
-    memset_array(ret, 0)
+    _check(_bf.bfArrayMemset(ret.as_BFarray(), 0))
     return ret
 
 def copy_array(dst, src):
@@ -106,7 +182,14 @@ def copy_array(dst, src):
             dst_bf.bf.space == 'cuda_managed'):
             # TODO: Decide where/when these need to be called
             device.stream_synchronize()
-        np.copyto(dst_bf, src_bf)
+        if (dst_bf.shape == src_bf.shape and dst_bf.dtype == src_bf.dtype and
+            dst_bf.flags['C_CONTIGUOUS'] and src_bf.flags['C_CONTIGUOUS'] and
+            dst_bf.flags['WRITEABLE']):
+            # Note: This skips the setup cost of np.copyto's iterator
+            ctypes.memmove(dst_bf.ctypes.data, src_bf.ctypes.data,
+                           src_bf.nbytes)
+        else:
+            np.copyto(dst_bf, src_bf)
     else:
         _check(_bf.bfArrayCopy(dst_bf.as_BFarray(),
                                src_bf.as_BFarray()))
@@ -122,12 +205,14 @@ def memset_array(dst, value):
 
 # Stores Bifrost-specific metadata that augments Numpy's metadata
 class BFArrayInfo(object):
-    def __init__(self, space, dtype, native, conjugated, ownbuffer=None):
+    def __init__(self, space, dtype, native, conjugated, ownbuffer=None,
+                 owner=None):
         self.space      = space
         self.dtype      = dtype
         self.native     = native
         self.conjugated = conjugated
         self.ownbuffer  = ownbuffer
+        self.owner      = owner
 
 # A np.ndarray subclass that adds support for different spaces and
 #   bifrost-specific metadata.
@@ -168,6 +253,38 @@ class ndarray(np.ndarray):
                                            dtype=base.dtype,
                                            strides=base.strides,
                                            native=np.dtype(base.dtype).isnative)
+            # Wrap anything else that exports its device memory via the CUDA
+            #   Array Interface (e.g., numba, PyTorch) without copying it
+            if (not isinstance(base, np.ndarray) and
+                hasattr(base, '__cuda_array_interface__')):
+                cai = base.__cuda_array_interface__
+                if cai.get('mask', None) is not None:
+                    raise TypeError("Masked arrays are not supported")
+                stream = cai.get('stream', None)
+                if stream is not None:
+                    # Wait for any work that is still pending on the
+                    #   producer's stream before we touch the data
+                    with device.ExternalStream(stream):
+                        device.stream_synchronize()
+                descr = cai.get('descr', None)
+                if descr is not None and (len(descr) > 1 or descr[0][0] != ''):
+                    base_dtype = np.dtype(descr)
+                else:
+                    base_dtype = np.dtype(cai['typestr'])
+                # Note: The space (e.g., cuda vs. cuda_managed) is looked up
+                #         from the pointer itself
+                obj = ndarray.__new__(cls,
+                                      buffer=int(cai['data'][0]),
+                                      shape=tuple(cai['shape']),
+                                      dtype=base_dtype,
+                                      strides=cai.get('strides', None),
+                                      native=base_dtype.isnative)
+                # Keep the producer alive for as long as we reference its memory
+                obj.bf.owner = base
+                if ((space is not None and space != obj.bf.space) or
+                    (dtype is not None and DataType(dtype) != obj.bf.dtype)):
+                    obj = ndarray(obj, space=space or obj.bf.space, dtype=dtype)
+                return obj
             # Check if a BFarray ctypes struct is passed
             if isinstance(base, struct_BFarray_):
                 ndim = base.ndim
@@ -196,6 +313,19 @@ class ndarray(np.ndarray):
                 if conjugated is not None:
                     obj.bf.conjugated = conjugated
                     obj._update_BFarray()
+            elif (dtype is not None and space in (None, 'system') and
+                  _is_plain_cast(base, dtype)):
+                # Note: Fast path for system-space numpy -> dtype conversion
+                #         Allocates the result once and casts straight into
+                #         it instead of going via a temporary astype copy.
+                if conjugated is None:
+                    conjugated = False
+                obj = ndarray.__new__(cls,
+                                      space='system',
+                                      shape=base.shape,
+                                      dtype=dtype,
+                                      conjugated=conjugated)
+                np.copyto(obj.view(np.ndarray), base, casting='unsafe')
             else:
                 if not isinstance(base, np.ndarray):
                     # Convert base to np.ndarray
@@ -234,31 +364,9 @@ class ndarray(np.ndarray):
             if conjugated is None:
                 conjugated = False # Default unconjugated
             if strides is None:
-                #itemsize = dtype.itemsize
-                itemsize_bits = dtype.itemsize_bits
-                # HACK to support 'packed' arrays, by folding the last
-                #   dimension of the shape into the dtype.
-                # TODO: Consider using bit strides when dtype < 8 bits
-                #         It's hacky, but it may be worth it
-                if itemsize_bits < 8:
-                    pack_factor = 8 // itemsize_bits
-                    if shape[-1] % pack_factor != 0 or not len(shape):
-                        raise ValueError("Array cannot be packed")
-                    shape = list(shape)
-                    shape[-1] //= pack_factor
-                    itemsize = 1
-                else:
-                    itemsize = itemsize_bits // 8
-
-                if len(shape):
-                    # This magic came from http://stackoverflow.com/a/32874295
-                    strides = (itemsize *
-                               np.r_[1, np.cumprod(shape[::-1][:-1],
-                                                   dtype=np.int64)][::-1])
-                    strides = tuple(strides)
-                else:
-                    strides = tuple()
-            nbyte = strides[0] * shape[0] if len(shape) else itemsize
+                shape, strides, nbyte = _c_layout(shape, dtype)
+            else:
+                nbyte = strides[0] * shape[0] if len(shape) else dtype.itemsize
             if buffer is None:
                 # Allocate new buffer
                 if space is None:
@@ -266,7 +374,7 @@ class ndarray(np.ndarray):
                 if shape is None:
                     raise ValueError('Either buffer or shape must be '
                                      'specified')
-                ownbuffer = raw_malloc(nbyte, space)
+                ownbuffer = default_pool.malloc(nbyte, space)
                 buffer = ownbuffer
             else:
                 if space is None:
@@ -306,39 +414,74 @@ class ndarray(np.ndarray):
         self._update_BFarray()
     def __del__(self):
         if hasattr(self, 'bf') and self.bf.ownbuffer:
-            raw_free(self.bf.ownbuffer, self.bf.space)
+            default_pool.free(self.bf.ownbuffer, self.bf.space)
     def _update_BFarray(self):
         # (Re-)cache the BFarray structure
         # Note: This must be called after any updates to self.bf.*
         self._BFarray = None
         self._BFarray = self.as_BFarray()
+    def _BFarray_key(self):
+        # Everything that goes into the BFarray structure, including the
+        #   parts that can change behind our backs (e.g., via in-place
+        #   assignment to .shape or to .bf.*)
+        return (self.ctypes.data, self.shape, self.strides,
+                self.flags['WRITEABLE'],
+                self.bf.space, self.bf.dtype, self.bf.native,
+                self.bf.conjugated)
     def as_BFarray(self):
-        # ***TODO: The caching here is broken because of shape, strides and ctypes.data
-        #            How to fix?
-        #*if self._BFarray is not None:
-        #*    return self._BFarray
+        # Note: The returned structure is shared between calls and must be
+        #         treated as read-only; use _new_BFarray() for a private copy
+        key = self._BFarray_key()
+        cached = getattr(self, '_BFarray', None)
+        if cached is not None and self._BFarray_cache_key == key:
+            return cached
+        self._BFarray = self._new_BFarray()
+        self._BFarray_cache_key = key
+        return self._BFarray
+    def _new_BFarray(self):
         a = _bf.BFarray()
         a.data      = self.ctypes.data
-        a.space     = Space(self.bf.space).as_BFspace()
+        # Note: _string2space is memoized, unlike Space(...).as_BFspace()
+        a.space     = _string2space(self.bf.space)
         a.dtype     = self.bf.dtype.as_BFdtype()
         a.immutable = not self.flags['WRITEABLE']
-        a.ndim      = len(self.shape)
+        ndim        = self.ndim
+        a.ndim      = ndim
         # HACK WAR for backend not yet supporting ndim=0 (scalar arrays)
-        if a.ndim == 0:
+        if ndim == 0:
             a.ndim = 1
             a.shape[0] = 1
             a.strides[0] = self.bf.dtype.itemsize
-        for d in range(len(self.shape)):
-            a.shape[d] = self.shape[d]
+        else:
+            a.shape[:ndim]   = self.shape
+            a.strides[:ndim] = self.strides
         # HACK TESTING support for 'packed' arrays
         itemsize_bits = self.bf.dtype.itemsize_bits
         if itemsize_bits < 8:
             a.shape[a.ndim - 1] *= 8 // itemsize_bits
-        for d in range(len(self.strides)):
-            a.strides[d] = self.strides[d]
         a.big_endian = not self.bf.native
         a.conjugated = self.bf.conjugated
         return a
+    @property
+    def __cuda_array_interface__(self):
+        # Note: Host-side arrays already export __array_interface__ via
+        #         np.ndarray; this is only exposed for arrays that live in
+        #         CUDA-accessible memory so that hasattr() checks work
+        if not space_accessible(self.bf.space, ['cuda']):
+            raise AttributeError("'ndarray' in space '%s' has no attribute "
+                                 "'__cuda_array_interface__'" % self.bf.space)
+        # Note: Work on the array may still be queued on Bifrost's stream; a
+        #         handle of 0 is not allowed here so it is mapped to the
+        #         legacy default stream (1)
+        stream = device.get_stream()
+        return {'shape':   self.shape,
+                'typestr': self.dtype.str,
+                'descr':   self.dtype.descr,
+                'data':    (self.ctypes.data, not self.flags['WRITEABLE']),
+                'strides': self.strides,
+                'mask':    None,
+                'stream':  stream if stream else 1,
+                'version': 3}
     def conj(self):
         return ndarray(self, conjugated=not self.bf.conjugated)
     def view(self, dtype=None, type_=None):
@@ -368,11 +511,21 @@ class ndarray(np.ndarray):
             if dtype_bf.is_complex and dtype_bf.is_integer:
                 ## Catch for the complex integer types
                 a = ndarray(shape=self.shape, dtype=dtype_bf)
-                a['re'] = self.real.astype(dtype_bf.as_real())
-                a['im'] = self.imag.astype(dtype_bf.as_real())
+                if self.dtype.kind == 'c' and self.flags['C_CONTIGUOUS']:
+                    ## Convert both parts in a single pass by viewing each
+                    ## side as a flat run of interleaved re/im values
+                    src = self.view(np.ndarray).reshape(-1)
+                    src = src.view(src.real.dtype)
+                    dst = a.view(np.ndarray).reshape(-1)
+                    dst = dst.view(dtype_bf.as_real().as_numpy_dtype())
+                    np.copyto(dst, src, casting='unsafe')
+                else:
+                    a['re'] = self.real.astype(dtype_bf.as_real())
+                    a['im'] = self.imag.astype(dtype_bf.as_real())
             else:
                 a = super(ndarray, self).astype(dtype_np)
             a.bf.dtype = dtype_bf
+            a._update_BFarray()
         else:
             ## For arrays that can be access from CUDA, use bifrost.map
             ## to do the heavy lifting
@@ -413,8 +566,15 @@ class ndarray(np.ndarray):
             self.bf.native = not self.bf.native
             self._update_BFarray()
             return super(ndarray, self).byteswap(True)
+        elif self.bf.space == 'system':
+            # Note: numpy swaps into a new buffer in one pass; the result
+            #         inherits self.bf via __array_finalize__
+            out = super(ndarray, self).byteswap(False)
+            out.bf.native = not self.bf.native
+            out._update_BFarray()
+            return out
         else:
-            return ndarray(self).byteswap(True)
+            return self.copy().byteswap(True)
     def copy(self, space=None, order='C'):
         if order != 'C':
             raise NotImplementedError('Only order="C" is supported')
@@ -429,9 +589,10 @@ class ndarray(np.ndarray):
                 if space == 'cuda_managed':
                     ## TODO: Decide where/when these need to be called
                     device.stream_synchronize()
-                ## This actually makes two copies and throws one away
+                ## Let numpy handle the strides while copying straight into
+                ## the new (C-ordered) buffer
                 temp = ndarray(shape=self.shape, dtype=self.dtype, space=self.bf.space)
-                temp[...] = np.array(self).copy()
+                np.copyto(temp.view(np.ndarray), self.view(np.ndarray))
                 if self.bf.space != space:
                     return ndarray(temp, space=space)
                 return temp
@@ -439,11 +600,15 @@ class ndarray(np.ndarray):
                 ## For arrays that can be access from CUDA, use bifrost.transpose
                 ## to do the heavy lifting
                 ### Figure out the correct axis order for C
-                permute = np.argsort(self.strides)[::-1]
+                ### Note: Axes are sorted by decreasing stride, with ties (e.g.,
+                ###       unit-length axes) kept in their original order
+                ###       rather than reversed as np.argsort(...)[::-1] did
+                permute = sorted(range(self.ndim),
+                                 key=lambda d: (-self.strides[d], d))
                 c_shape = [self.shape[p] for p in permute]
                 ### Make a BFarray wrapper for self so we can reset shape/strides
                 ### to what they should be for a C ordered array
-                self_corder = self.as_BFarray()
+                self_corder = self._new_BFarray()
                 shape_type = ctypes.c_long*_bf.BF_MAX_DIMS
                 self_corder.shape = shape_type(*c_shape)
                 self_corder.strides = shape_type(*[self.strides[p] for p in permute])
@@ -460,23 +625,67 @@ class ndarray(np.ndarray):
         return ndarray(self, space=space)
     def _key_returns_scalar(self, key):
         # Returns True if self[key] would return a scalar (i.e., not a view)
-        if isinstance(key, tuple):
-            if len(key) == len(self.shape):
-                if all([not isinstance(k, slice) for k in key]):
-                    return True
-        elif not isinstance(key, slice):
-            if self.shape == 1:
-                return True
-        return False
+        # Note: This is called for every subscript, so avoid building lists
+        if type(key) is tuple:
+            if len(key) != self.ndim:
+                return False
+            for k in key:
+                if type(k) is slice or k is Ellipsis or k is None:
+                    return False
+            return True
+        return (self.ndim == 1 and type(key) is not bool and
+                isinstance(key, (int, np.integer)))
+    def _scalar_key_as_slice(self, key):
+        # Returns the 1-element slice equivalent of an all-integer key (so that
+        #   indexing gives a view), or None if the key is not all integers
+        if not isinstance(key, tuple):
+            key = (key,)
+        if not all([isinstance(k, (int, np.integer)) for k in key]):
+            return None
+        k0 = int(key[0])
+        if k0 < 0:
+            k0 += self.shape[0]
+        if not 0 <= k0 < self.shape[0]:
+            raise IndexError("index %i is out of bounds for axis 0 with size "
+                             "%i" % (key[0], self.shape[0]))
+        return (slice(k0, k0 + 1),) + tuple(key[1:])
     def __getitem__(self, key):
         if self._key_returns_scalar(key):
+            if not space_accessible(self.bf.space, ['system']):
+                slice_key = self._scalar_key_as_slice(key)
+                if slice_key is not None:
+                    # Note: Only the element being read is copied to the host
+                    elem = super(ndarray, self).__getitem__(slice_key)
+                    elem = elem.copy(space='system')
+                    return super(ndarray, elem).__getitem__(0)
             return super(ndarray, self._system_accessible_copy()).__getitem__(key)
         return super(ndarray, self).__getitem__(key)
     def __setitem__(self, key, val):
         if self._key_returns_scalar(key):
+            slice_key = self._scalar_key_as_slice(key)
+            if (slice_key is not None and np.isscalar(val) and
+                self.dtype.fields is None and
+                self.bf.dtype.itemsize_bits >= 8):
+                if (space_accessible(self.bf.space, ['system']) and
+                    self.bf.space != 'cuda_managed'):
+                    super(ndarray, self).__setitem__(key, val)
+                else:
+                    # Note: Write the single element directly rather than
+                    #         going through a full bfArrayCopy
+                    elem = super(ndarray, self).__getitem__(slice_key)
+                    src = np.array(val, dtype=self.dtype)
+                    _check(_bf.bfMemcpy(elem.ctypes.data,
+                                        _string2space(self.bf.space),
+                                        src.ctypes.data,
+                                        _string2space('system'),
+                                        self.itemsize))
+                    device.stream_synchronize()
+                return
             # HACK WAR to turn key into slice to avoid scalar (non-view) result
             #   from __getitem__.
-            if isinstance(key, tuple):
+            if slice_key is not None:
+                key = slice_key
+            elif isinstance(key, tuple):
                 key = (slice(key[0], key[0] + 1),) + key[1:]
             else:
                 key = slice(key, key + 1)
@@ -488,7 +697,8 @@ class ndarray(np.ndarray):
             mptr = cp.cuda.MemoryPointer(umem, 0)
             ca = cp.ndarray(self.shape, dtype=self.dtype, memptr=mptr, strides=self.strides)
         else:
-            ca = cp.asarray(np.array(self))
+            # Note: The plain numpy view avoids an extra host-side copy
+            ca = cp.asarray(self.view(np.ndarray))
         return ca
     def as_GPUArray(self, *args, **kwargs):
         from pycuda.gpuarray import GPUArray as pycuda_GPUArray
@@ -496,3 +706,14 @@ class ndarray(np.ndarray):
         ga = asarray(g)
         copy_array(ga, self)
         return g
+
+def _wrap_address(address, space, shape, strides, dtype, dtype_np, readonly=False):
+    """Wrap existing memory as an ndarray without ndarray.__new__'s argument
+    handling; for callers (e.g., ring spans) that already know the native,
+    unconjugated layout and the matching numpy dtype"""
+    nbyte = strides[0] * shape[0] if len(shape) else dtype.itemsize
+    data_buffer = _address_as_buffer(address, nbyte, readonly=readonly)
+    obj = np.ndarray.__new__(ndarray, shape, dtype_np, data_buffer, 0, strides)
+    obj.bf = BFArrayInfo(space, dtype, True, False)
+    # Note: The BFarray structure is built on first use by as_BFarray()
+    return obj
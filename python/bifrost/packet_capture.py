@@ -32,68 +32,133 @@ from bifrost.udp_socket import UDPSocket
 from bifrost.ring import Ring
 from bifrost.ring2 import Ring as Ring2
 
+import os
 import ctypes
-from functools import reduce
+import socket
+import struct
+import itertools
 from io import IOBase
+try:
+    from math import prod
+except ImportError:
+    # Python < 3.8
+    from functools import reduce
+    def prod(value):
+        return reduce(lambda x,y: x*y, value, 1)
 
-from typing import Optional, Union
+from typing import Callable, Optional, Union
 
 from bifrost import telemetry
 telemetry.track_module()
 
 class PacketCaptureCallback(BifrostObject):
-    _ref_cache = {}
+    __slots__ = ('_ref_cache', '_retired')
     def __init__(self):
         BifrostObject.__init__(
             self, _bf.bfPacketCaptureCallbackCreate, _bf.bfPacketCaptureCallbackDestroy)
+        # Note: kind -> (fnc, trampoline).  Captures copy the C function
+        #         pointers when they are created, so replaced trampolines
+        #         are kept alive in _retired for as long as this object is.
+        self._ref_cache = {}
+        self._retired = []
+    def _set_callback(self, kind, callback_type, setter, fnc):
+        # Note: Re-registering the same function reuses the existing
+        #         trampoline rather than allocating a new libffi closure
+        cached = self._ref_cache.get(kind)
+        if cached is None or cached[0] != fnc:
+            if cached is not None:
+                self._retired.append(cached[1])
+            cached = (fnc, callback_type(fnc))
+        _check(setter(self.obj, cached[1]))
+        self._ref_cache[kind] = cached
 
-    def set_simple(self, fnc):
-        self._ref_cache['simple'] = _bf.BFpacketcapture_simple_sequence_callback(fnc)
-        _check(_bf.bfPacketCaptureCallbackSetSIMPLE(
-               self.obj, self._ref_cache['simple']))
-
-    def set_chips(self, fnc: _bf.BFpacketcapture_chips_sequence_callback):
-        self._ref_cache['chips'] = _bf.BFpacketcapture_chips_sequence_callback(fnc)
-        _check(_bf.bfPacketCaptureCallbackSetCHIPS(
-               self.obj, self._ref_cache['chips']))
-    def set_snap2(self, fnc: _bf.BFpacketcapture_snap2_sequence_callback):
-        self._ref_cache['snap2'] = _bf.BFpacketcapture_snap2_sequence_callback(fnc)
-        _check(_bf.bfPacketCaptureCallbackSetSNAP2(
-               self.obj, self._ref_cache['snap2']))
-    def set_ibeam(self, fnc: _bf.BFpacketcapture_ibeam_sequence_callback):
-        self._ref_cache['ibeam'] = _bf.BFpacketcapture_ibeam_sequence_callback(fnc)
-        _check(_bf.bfPacketCaptureCallbackSetIBeam(
-               self.obj, self._ref_cache['ibeam']))
-    def set_pbeam(self, fnc: _bf.BFpacketcapture_pbeam_sequence_callback):
-        self._ref_cache['pbeam'] = _bf.BFpacketcapture_pbeam_sequence_callback(fnc)
-        _check(_bf.bfPacketCaptureCallbackSetPBeam(
-               self.obj, self._ref_cache['pbeam']))
-    def set_cor(self, fnc: _bf.BFpacketcapture_cor_sequence_callback):
-        self._ref_cache['cor'] = _bf.BFpacketcapture_cor_sequence_callback(fnc)
-        _check(_bf.bfPacketCaptureCallbackSetCOR(
-               self.obj, self._ref_cache['cor']))
-    def set_vdif(self, fnc: _bf.BFpacketcapture_vdif_sequence_callback):
-        self._ref_cache['vdif'] = _bf.BFpacketcapture_vdif_sequence_callback(fnc)
-        _check(_bf.bfPacketCaptureCallbackSetVDIF(
-               self.obj, self._ref_cache['vdif']))
-    def set_tbn(self, fnc: _bf.BFpacketcapture_tbn_sequence_callback):
-        self._ref_cache['tbn'] = _bf.BFpacketcapture_tbn_sequence_callback(fnc)
-        _check(_bf.bfPacketCaptureCallbackSetTBN(
-               self.obj, self._ref_cache['tbn']))
-    def set_drx(self, fnc: _bf.BFpacketcapture_drx_sequence_callback):
-        self._ref_cache['drx'] = _bf.BFpacketcapture_drx_sequence_callback(fnc)
-        _check(_bf.bfPacketCaptureCallbackSetDRX(
-            self.obj, self._ref_cache['drx']))
-    def set_drx8(self, fnc: _bf.BFpacketcapture_drx8_sequence_callback):
-        self._ref_cache['drx8'] = _bf.BFpacketcapture_drx8_sequence_callback(fnc)
-        _check(_bf.bfPacketCaptureCallbackSetDRX8(
-            self.obj, self._ref_cache['drx8']))
+# Note: (method suffix, C setter suffix) for each PacketCaptureCallback.set_*
+#         method, which are all generated from this table
+_CB_KINDS = [('simple', 'SIMPLE'), ('chips', 'CHIPS'), ('snap2', 'SNAP2'),
+             ('ibeam',  'IBeam'),  ('pbeam', 'PBeam'), ('cor',   'COR'),
+             ('vdif',   'VDIF'),   ('tbn',   'TBN'),   ('drx',   'DRX'),
+             ('drx8',   'DRX8')]
+
+def _make_set_callback(kind, callback_type, setter):
+    def set_callback(self, fnc):
+        self._set_callback(kind, callback_type, setter, fnc)
+    set_callback.__name__ = f"set_{kind}"
+    set_callback.__qualname__ = f"PacketCaptureCallback.set_{kind}"
+    set_callback.__annotations__ = {'fnc': callback_type}
+    return set_callback
+
+for _kind, _setter in _CB_KINDS:
+    setattr(PacketCaptureCallback, f"set_{_kind}",
+            _make_set_callback(_kind,
+                               getattr(_bf, f"BFpacketcapture_{_kind}_sequence_callback"),
+                               getattr(_bf, f"bfPacketCaptureCallbackSet{_setter}")))
+del _kind, _setter
+
+def _parse_cpulist(cpulist):
+    # Parses a sysfs CPU list like "0-7,16-23" into a list of core numbers
+    cores = []
+    for part in cpulist.strip().split(','):
+        if '-' in part:
+            first, last = part.split('-')
+            cores.extend(range(int(first), int(last)+1))
+        elif part:
+            cores.append(int(part))
+    return cores
+
+def _sock_interface(sock):
+    # Returns the name of the network interface that sock is bound to, or
+    #   None if that cannot be determined (e.g., bound to INADDR_ANY)
+    import fcntl
+    with socket.fromfd(sock.fileno(), socket.AF_INET, socket.SOCK_DGRAM) as s:
+        local_ip = s.getsockname()[0]
+    if local_ip in ('0.0.0.0', ''):
+        return None
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+        for _, iface in socket.if_nameindex():
+            try:
+                ifreq = fcntl.ioctl(s.fileno(), 0x8915, # SIOCGIFADDR
+                                    struct.pack('256s', iface.encode()[:15]))
+            except OSError:
+                continue
+            if socket.inet_ntoa(ifreq[20:24]) == local_ip:
+                return iface
+    return None
+
+# Note: Spreads captures placed with core='auto' over the cores of a NUMA node
+_numa_core_counter = itertools.count()
+
+def _numa_core_for_sock(sock):
+    """Returns a core on the same NUMA node as the NIC that sock is bound to,
+    or -1 if the NIC's node cannot be determined or the system only has one
+    NUMA node."""
+    try:
+        with open('/sys/devices/system/node/online') as fh:
+            if len(_parse_cpulist(fh.read())) < 2:
+                return -1
+        iface = _sock_interface(sock)
+        if iface is None:
+            return -1
+        with open(f"/sys/class/net/{iface}/device/numa_node") as fh:
+            node = int(fh.read())
+        if node < 0:
+            return -1
+        with open(f"/sys/devices/system/node/node{node}/cpulist") as fh:
+            cores = _parse_cpulist(fh.read())
+        allowed = os.sched_getaffinity(0)
+        cores = [core for core in cores if core in allowed]
+    except (OSError, ValueError, AttributeError, ImportError):
+        return -1
+    if not cores:
+        return -1
+    return cores[next(_numa_core_counter) % len(cores)]
 
 class _CaptureBase(BifrostObject):
+    # Note: Holds on to the sequence callback (and so its trampolines)
+    __slots__ = ('_sequence_callback', '_stop')
     @staticmethod
     def _flatten_value(value):
         try:
-            value = reduce(lambda x,y: x*y, value, 1 if value else 0)
+            value = prod(value) if value else 0
         except TypeError:
             pass
         return value
@@ -102,29 +167,95 @@ class _CaptureBase(BifrostObject):
     def __exit__(self, type, value, tb):
         self.end()
     def recv(self) -> _th.BFcapture_enum:
+        """Receive packets until a span is filled or the socket times out.
+
+        Note:  libbifrost is loaded as a ctypes.CDLL, so the GIL is released
+               for the whole blocking call and captures running in separate
+               threads proceed concurrently.  The only Python code run during
+               recv is the sequence callback, which ctypes re-acquires the
+               GIL for, and only when a sequence starts or changes."""
         status = _bf.BFpacketcapture_status()
         _check(_bf.bfPacketCaptureRecv(self.obj, status))
         return status.value
+    def recv_with_view(self, callback: Callable[[memoryview,_th.BFcapture_enum],None]) -> _th.BFcapture_enum:
+        """Receive like recv() but also call callback(view, status) for each
+        span committed to the output ring by this call, where view is a
+        zero-copy memoryview of the span.  The views are only valid until the
+        next call to recv/recv_with_view/flush/end."""
+        data = (ctypes.c_void_p * 2)()
+        nbyte = (_bf.BFsize * 2)()
+        nspan = ctypes.c_int(0)
+        status = _bf.BFpacketcapture_status()
+        _check(_bf.bfPacketCaptureRecvView(self.obj, data, nbyte, nspan, status))
+        for i in range(nspan.value):
+            view = (ctypes.c_ubyte * nbyte[i]).from_address(data[i])
+            callback(memoryview(view).cast('B'), status.value)
+        return status.value
+    def capture_forever(self, on_event: Optional[Callable[[_th.BFcapture_enum],Optional[bool]]]=None) -> _th.BFcapture_enum:
+        """Run the receive loop in C until stop() is called, on_event returns
+        True, or the capture is interrupted or fails.  on_event(status) is
+        only called for statuses other than BF_CAPTURE_CONTINUED; if it is
+        None the loop also stops at BF_CAPTURE_ENDED.  An exception raised by
+        on_event stops the loop and is re-raised here.  Returns the last
+        status."""
+        self._stop = ctypes.c_int(0)
+        errors = []
+        def trampoline(status, user):
+            # Note: ctypes would only print the traceback and return 0
+            try:
+                return int(bool(on_event(status)))
+            except BaseException as e:
+                errors.append(e)
+                return 1
+        if on_event is None:
+            event_cb = _bf.BFpacketcapture_event_callback()
+        else:
+            event_cb = _bf.BFpacketcapture_event_callback(trampoline)
+        status = _bf.BFpacketcapture_status()
+        _check(_bf.bfPacketCaptureRun(self.obj, event_cb, None,
+                                      self._stop, status))
+        if errors:
+            raise errors[0]
+        return status.value
+    def stop(self):
+        """Ask a running capture_forever() to return after the current
+        receive completes."""
+        stop = getattr(self, '_stop', None)
+        if stop is not None:
+            stop.value = 1
     def flush(self):
         _check(_bf.bfPacketCaptureFlush(self.obj))
     def end(self):
         _check(_bf.bfPacketCaptureEnd(self.obj))
 
 class UDPCapture(_CaptureBase):
+    """Captures packets from a UDP socket into a ring.  If core is 'auto',
+    the capture thread is bound to a core on the same NUMA node as the NIC
+    that the socket is bound to (where this can be determined)."""
+    __slots__ = ()
     def __init__(self, fmt: str, sock: UDPSocket, ring: Union[Ring,Ring2],
                  nsrc: int, src0: int, max_payload_size: int, buffer_ntime: int,
                  slot_ntime: int, sequence_callback: PacketCaptureCallback,
-                 core: Optional[int]=None):
+                 core: Optional[Union[int,str]]=None,
+                 busy_poll_us: Optional[int]=None):
         nsrc = self._flatten_value(nsrc)
         if core is None:
             core = -1
+        elif core == 'auto':
+            # Note: Picks a core on the NIC's NUMA node, if there is one
+            core = _numa_core_for_sock(sock)
+        if busy_poll_us is not None:
+            # Note: Raising this above net.core.busy_read needs CAP_NET_ADMIN
+            sock.busy_poll = busy_poll_us
         BifrostObject.__init__(
             self, _bf.bfUdpCaptureCreate, _bf.bfPacketCaptureDestroy,
             fmt.encode(), sock.fileno(), ring.obj, nsrc, src0,
             max_payload_size, buffer_ntime, slot_ntime,
             sequence_callback.obj, core)
+        self._sequence_callback = sequence_callback
 
 class UDPSniffer(_CaptureBase):
+    __slots__ = ()
     def __init__(self, fmt: str, sock: UDPSocket, ring: Union[Ring,Ring2],
                  nsrc: int, src0: int, max_payload_size: int, buffer_ntime: int,
                  slot_ntime: int, sequence_callback: PacketCaptureCallback,
@@ -137,21 +268,49 @@ class UDPSniffer(_CaptureBase):
             fmt.encode(), sock.fileno(), ring.obj, nsrc, src0,
             max_payload_size, buffer_ntime, slot_ntime,
             sequence_callback.obj, core)
+        self._sequence_callback = sequence_callback
 
-class UDPVerbsCapture(_CaptureBase):
+class UDPMmapSniffer(_CaptureBase):
+    """Like UDPSniffer but reads packets straight out of a kernel-filled
+    TPACKET_V3 ring rather than copying each one with recvfrom.  The socket
+    must be set up with UDPSocket.sniff().  Linux only."""
+    __slots__ = ()
     def __init__(self, fmt: str, sock: UDPSocket, ring: Union[Ring,Ring2],
                  nsrc: int, src0: int, max_payload_size: int, buffer_ntime: int,
                  slot_ntime: int, sequence_callback: PacketCaptureCallback,
                  core: Optional[int]=None):
+        nsrc = self._flatten_value(nsrc)
+        if core is None:
+            core = -1
+        BifrostObject.__init__(
+            self, _bf.bfUdpMmapSnifferCreate, _bf.bfPacketCaptureDestroy,
+            fmt.encode(), sock.fileno(), ring.obj, nsrc, src0,
+            max_payload_size, buffer_ntime, slot_ntime,
+            sequence_callback.obj, core)
+        self._sequence_callback = sequence_callback
+
+class UDPVerbsCapture(_CaptureBase):
+    """Like UDPCapture but receives packets through ibverbs.  core='auto'
+    behaves as for UDPCapture."""
+    __slots__ = ()
+    def __init__(self, fmt: str, sock: UDPSocket, ring: Union[Ring,Ring2],
+                 nsrc: int, src0: int, max_payload_size: int, buffer_ntime: int,
+                 slot_ntime: int, sequence_callback: PacketCaptureCallback,
+                 core: Optional[Union[int,str]]=None):
         if core is None:
             core = -1
+        elif core == 'auto':
+            # Note: Picks a core on the NIC's NUMA node, if there is one
+            core = _numa_core_for_sock(sock)
         BifrostObject.__init__(
             self, _bf.bfUdpVerbsCaptureCreate, _bf.bfPacketCaptureDestroy,
             fmt.encode(), sock.fileno(), ring.obj, nsrc, src0,
             max_payload_size, buffer_ntime, slot_ntime,
             sequence_callback.obj, core)
+        self._sequence_callback = sequence_callback
 
 class DiskReader(_CaptureBase):
+    __slots__ = ('_position',)
     def __init__(self, fmt: str, fh: IOBase, ring: Union[Ring,Ring2],
                  nsrc: int, src0: int, buffer_nframe: int, slot_nframe: int,
                  sequence_callback: PacketCaptureCallback,
@@ -164,13 +323,16 @@ class DiskReader(_CaptureBase):
             fmt.encode(), fh.fileno(), ring.obj, nsrc, src0,
             buffer_nframe, slot_nframe,
             sequence_callback.obj, core)
+        self._sequence_callback = sequence_callback
+        # Note: Reused by seek/tell to avoid allocating on every call
+        self._position = ctypes.c_ulong(0)
         # Make sure we start in the same place in the file
         self.seek(fh.tell(), _bf.BF_WHENCE_SET)
     def seek(self, offset: int, whence: _th.BFwhence_enum=_bf.BF_WHENCE_CUR):
-        position = ctypes.c_ulong(0)
-        _check(_bf.bfPacketCaptureSeek(self.obj, offset, whence, position))
-        return position.value
+        self._position.value = 0
+        _check(_bf.bfPacketCaptureSeek(self.obj, offset, whence, self._position))
+        return self._position.value
     def tell(self) -> int:
-        position = ctypes.c_ulong(0)
-        _check(_bf.bfPacketCaptureTell(self.obj, position))
-        return position.value
+        self._position.value = 0
+        _check(_bf.bfPacketCaptureTell(self.obj, self._position))
+        return self._position.value
@@ -85,6 +85,21 @@ class UDPTransmit(_WriterBase):
             fmt.encode(), sock.fileno(), core)
 
 
+class UDPZCTransmit(_WriterBase):
+    """UDP packet writer that sends with MSG_ZEROCOPY (Linux >= 4.14).  The
+    kernel reads the packet headers and payloads directly from memory
+    instead of copying them; each send() waits for the kernel to release
+    the buffers before returning, and raises an error if the kernel stalls
+    for more than ~10 s (in which case the next send() waits again before
+    touching any buffers)."""
+    def __init__(self, fmt: str, sock: UDPSocket, core: Optional[int]=None):
+        if core is None:
+            core = -1
+        BifrostObject.__init__(
+            self, _bf.bfUdpZcTransmitCreate, _bf.bfPacketWriterDestroy,
+            fmt.encode(), sock.fileno(), core)
+
+
 class UDPVerbsTransmit(_WriterBase):
     def __init__(self, fmt: str, sock: UDPSocket, core: Optional[int]=None):
         if core is None:
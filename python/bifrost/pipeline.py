@@ -220,12 +220,14 @@ class PipelineInitError(Exception):
 
 class Pipeline(BlockScope):
     instance_count = 0
-    def __init__(self, name: str=None, **kwargs):
+    def __init__(self, name: str=None, fuse_producers: bool=False, **kwargs):
         if name is None:
             name = f"Pipeline_{Pipeline.instance_count}"
             Pipeline.instance_count += 1
         super(Pipeline, self).__init__(name=name, **kwargs)
         self.blocks = []
+        # Note: Fusing rewires the pipeline graph, so it is only done on request
+        self.fuse_producers = fuse_producers
         self.shutdown_timeout = 5.
         self.all_blocks_finished_initializing_event = threading.Event()
         self.block_init_queue = queue.Queue()
@@ -246,7 +248,15 @@ class Pipeline(BlockScope):
                     f"The following block failed to initialize: {block.name}")
         # Tell blocks that they can begin data processing
         self.all_blocks_finished_initializing_event.set()
+    def fuse_blocks(self) -> None:
+        # Give each block the chance to fold its work into the block that
+        #   feeds it, which removes a full pass over the data
+        for block in list(self.blocks):
+            if block.fuse_with_producer(self.blocks):
+                self.blocks.remove(block)
     def run(self) -> None:
+        if self.fuse_producers:
+            self.fuse_blocks()
         # Launch blocks as threads
         self.threads = [threading.Thread(target=block.run, name=block.name)
                         for block in self.blocks]
@@ -302,6 +312,12 @@ def get_ring(block_or_ring: Union["Block", Ring]) -> Ring:
     except AttributeError:
         return block_or_ring
 
+def base_ring(ring: Ring) -> Ring:
+    """Return the Ring that a (possibly nested) ring view refers to"""
+    while ring.base is not None:
+        ring = ring.base
+    return ring
+
 def block_view(block: "Block", header_transform: Callable) -> "Block":
     """View a block with modified output headers
 
@@ -355,6 +371,31 @@ class Block(BlockScope):
         self.shutdown_event.set()
     def create_ring(self, *args, **kwargs) -> Ring:
         return Ring(*args, owner=self, **kwargs)
+    def fuse_with_producer(self, blocks: List["Block"]) -> bool:
+        """Called by Pipeline.run() before any blocks are launched if the
+        pipeline was created with fuse_producers=True.  Blocks that can hand
+        their work off to the block that feeds them should do so here and
+        return True, after which they are removed from the pipeline."""
+        return False
+    def bypass(self, blocks: List["Block"]) -> bool:
+        """Connect the readers of this block's output directly to its
+        input.  This is only possible if nothing reads the output through a
+        ring view, and returns False (leaving the pipeline unchanged) if that
+        is not the case."""
+        iring, oring = self.irings[0], self.orings[0]
+        readers = [block for block in blocks
+                   if any(base_ring(r) is oring for r in block.irings)]
+        for block in readers:
+            if any(r is not oring and base_ring(r) is oring
+                   for r in block.irings):
+                return False
+        for block in readers:
+            block.irings = [iring if r is oring else r for r in block.irings]
+            if getattr(block, 'iring', None) is oring:
+                block.iring = iring
+            rnames = {f"ring{i}": r.name for i, r in enumerate(block.irings)}
+            block.in_proclog.update(rnames)
+        return True
     def run(self) -> None:
         #affinity.set_openmp_cores(cpus) # TODO
         core = self.core
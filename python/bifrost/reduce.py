@@ -29,15 +29,70 @@ from bifrost.libbifrost import _bf, _th, _check
 from bifrost.ndarray import asarray
 from bifrost.ndarray import ndarray
 
+import numpy as np
+
+from typing import Union
+
 from bifrost import telemetry
 telemetry.track_module()
 
-def reduce(idata: ndarray, odata: ndarray, op: str='sum') -> ndarray:
-    try:
-        op = getattr(_th.BFreduce_enum, op)
-    except AttributeError:
+# Note: Resolved once here rather than with getattr on every call
+_OP_TABLE = {name: int(value)
+             for name, value in _th.BFreduce_enum.__members__.items()}
+# Note: Short op names (e.g., 'pwrsum') keyed by enum value
+_OP_NAMES = {value: name for name, value in _OP_TABLE.items()
+             if not name.startswith('BF_')}
+
+def _reduce_numpy(idata, odata, op):
+    # Reduces system-space arrays on the CPU with the same semantics as
+    #   bfReduce: exactly one axis shrinks, by an integer factor
+    axes = [d for d in range(idata.ndim) if odata.shape[d] < idata.shape[d]]
+    if idata.ndim != odata.ndim or len(axes) != 1 or \
+       any(o > i for o, i in zip(odata.shape, idata.shape)):
+        raise ValueError("Invalid reduce shapes: %s -> %s" % (idata.shape, odata.shape))
+    axis = axes[0]
+    factor, rem = divmod(idata.shape[axis], odata.shape[axis])
+    if rem:
+        raise ValueError("Output axis %i does not divide input axis" % axis)
+    x = np.asarray(idata)
+    x = x.reshape(x.shape[:axis] + (odata.shape[axis], factor) + x.shape[axis+1:])
+    x = x.astype(np.result_type(x.dtype, np.float32), copy=False)
+    if op.startswith('pwr'):
+        x = x.real*x.real + x.imag*x.imag if np.iscomplexobj(x) else x*x
+        op = op[3:]
+    if op == 'min':
+        result = x.min(axis=axis+1)
+    elif op == 'max':
+        result = x.max(axis=axis+1)
+    else:
+        result = x.sum(axis=axis+1)
+        if op == 'mean':
+            result *= 1. / factor
+        elif op == 'stderr':
+            result *= 1. / np.sqrt(factor)
+    odata[...] = result
+    return odata
+
+def reduce(idata: ndarray, odata: ndarray,
+           op: Union[str,_th.BFreduce_enum]='sum') -> ndarray:
+    """Reduce idata into odata along the one axis where their shapes
+    differ.  op may be a name such as 'sum' or 'pwrmean', or an already
+    resolved BFreduce_enum/int value, which skips the name lookup."""
+    if isinstance(op, int):
+        op_enum = op if op in _OP_NAMES else None
+    else:
+        op_enum = _OP_TABLE.get(op)
+    if op_enum is None:
         raise ValueError("Invalid reduce op: " + str(op))
-    _check(_bf.bfReduce(asarray(idata).as_BFarray(),
-                        asarray(odata).as_BFarray(),
-                        op))
+    idata = asarray(idata)
+    odata_bf = asarray(odata)
+    # Note: bfReduce only supports CUDA-accessible data (and is absent from
+    #         CPU-only builds), so plain numeric host arrays are handled here
+    if idata.bf.space == 'system' and odata_bf.bf.space == 'system' and \
+       not idata.dtype.fields and not odata_bf.dtype.fields:
+        _reduce_numpy(idata, odata_bf, _OP_NAMES[op_enum])
+        return odata
+    _check(_bf.bfReduce(idata.as_BFarray(),
+                        odata_bf.as_BFarray(),
+                        op_enum))
     return odata
@@ -26,12 +26,12 @@
 # (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
-from bifrost.libbifrost import _bf, _check, _get, BifrostObject, _string2space, _space2string, EndOfDataStop
+from bifrost.libbifrost import _bf, _check, _get, _checked, _getter, BifrostObject, _string2space, _space2string, EndOfDataStop
 from bifrost.DataType import DataType
 from bifrost.ndarray import ndarray, _address_as_buffer
 
 import ctypes
-import string
+import re
 import numpy as np
 from uuid import uuid4
 
@@ -40,13 +40,56 @@ from typing import List, Optional, Tuple, Union
 from bifrost import telemetry
 telemetry.track_module()
 
+# Note: Matches every character that is not valid in a ring name
+_SLUG_RE = re.compile(r'[^-_.() A-Za-z0-9]')
+
+# Note: Shared, immutable stand-in for the header of sequences that have none
+_EMPTY_RO_HDR = np.empty(0, dtype=np.uint8)
+_EMPTY_RO_HDR.flags['WRITEABLE'] = False
+
+# Note: The calls made for every sequence and span have their status checked
+#         by ctypes (see _checked/_getter) rather than by _check/_get
+_bfRingWritingEnded = _getter(_bf.bfRingWritingEnded)
+_bfRingSequenceGetName = _getter(_bf.bfRingSequenceGetName)
+_bfRingSequenceGetTimeTag = _getter(_bf.bfRingSequenceGetTimeTag)
+_bfRingSequenceGetNRinglet = _getter(_bf.bfRingSequenceGetNRinglet)
+_bfRingSequenceGetHeaderSize = _getter(_bf.bfRingSequenceGetHeaderSize)
+_bfRingSequenceGetHeader = _getter(_bf.bfRingSequenceGetHeader)
+_bfRingSequenceBegin = _checked(_bf.bfRingSequenceBegin)
+_bfRingSequenceEnd = _checked(_bf.bfRingSequenceEnd)
+_bfRingSequenceOpen = _checked(_bf.bfRingSequenceOpen)
+# Note: ReadSequence encodes the name itself, so it is passed as a plain C
+#         string rather than through ctypesgen's String conversion
+_bfRingSequenceOpen.argtypes = [ctypes.c_char_p if i == 2 else t
+                                for i, t in enumerate(_bfRingSequenceOpen.argtypes)]
+_bfRingSequenceOpenLatest = _checked(_bf.bfRingSequenceOpenLatest)
+_bfRingSequenceOpenEarliest = _checked(_bf.bfRingSequenceOpenEarliest)
+_bfRingSequenceOpenAt = _checked(_bf.bfRingSequenceOpenAt)
+_bfRingSequenceClose = _checked(_bf.bfRingSequenceClose)
+_bfRingSpanGetInfo = _checked(_bf.bfRingSpanGetInfo)
+_bfRingSpanReserve = _checked(_bf.bfRingSpanReserve)
+_bfRingSpanCommit = _checked(_bf.bfRingSpanCommit)
+_bfRingSpanRelease = _checked(_bf.bfRingSpanRelease)
+_bfRingSpanIteratorCreate = _checked(_bf.bfRingSpanIteratorCreate)
+_bfRingSpanIteratorGetSpan = _checked(_bf.bfRingSpanIteratorGetSpan)
+_bfRingSpanIteratorDestroy = _checked(_bf.bfRingSpanIteratorDestroy)
+
+def _itemsize(dtype) -> int:
+    # Note: Strings go through DataType because Bifrost and Numpy disagree
+    #         on names like 'i8'; Numpy dtypes and scalar types do not
+    #         need the full DataType parse
+    if dtype is np.uint8:
+        return 1
+    if isinstance(dtype, (np.dtype, type)):
+        return np.dtype(dtype).itemsize
+    return DataType(dtype).itemsize
+
 def _slugify(name):
-    valid_chars = "-_.() %s%s" % (string.ascii_letters, string.digits)
-    valid_chars = frozenset(valid_chars)
-    return ''.join([c for c in name if c in valid_chars])
+    return _SLUG_RE.sub('', name)
 
 class Ring(BifrostObject):
-    def __init__(self, space: str='system', name: Optional[str]=None, core: Optional[int]=None):
+    def __init__(self, space: str='system', name: Optional[str]=None, core: Optional[int]=None,
+                 write_combined: bool=False, numa_node: Optional[int]=None):
         if name is None:
             name = str(uuid4())
         name = _slugify(name)
@@ -61,24 +104,77 @@ class Ring(BifrostObject):
                                               core) )
             except RuntimeError:
                 pass
+        if numa_node is not None:
+            # Note: Overrides the NUMA node implied by core for the ring memory
+            try:
+                _check( _bf.bfRingSetNumaNode(self.obj,
+                                              numa_node) )
+            except RuntimeError:
+                pass
+        # Note: Mirrors the ring's BF_MALLOC_* flags so that resize() only
+        #         has to call into the library when they change
+        self._malloc_flags = _bf.BF_MALLOC_DEFAULT
+        if write_combined:
+            # Note: Only for cuda_host rings that the CPU writes but never reads
+            if space.value != _bf.BF_SPACE_CUDA_HOST:
+                raise ValueError("write_combined requires space='cuda_host'")
+            _check( _bf.bfRingSetMallocFlags(self.obj,
+                                             _bf.BF_MALLOC_WRITE_COMBINED) )
+            self._malloc_flags = _bf.BF_MALLOC_WRITE_COMBINED
+        # Note: These are fixed once the ring is created, so they are only
+        #         queried once.  The space is needed for every span, but the
+        #         name and core are rarely used and so are fetched lazily.
+        self._space = _space2string(space.value)
+        self._name = None
+        self._core = None
     def resize(self, contiguous_span: int, total_span: Optional[int]=None, nringlet: int=1,
-               buffer_factor: int=4) -> None:
+               buffer_factor: int=4, eager: bool=False,
+               hugepages: bool=False) -> None:
+        """Ensure the ring can hold the requested spans.  If eager is True, a
+        newly-allocated system-space buffer has all of its pages faulted in
+        before it is used.  If hugepages is True, a newly-allocated
+        system-space buffer is (where supported) backed by huge pages to
+        reduce TLB misses when streaming through large rings."""
         if total_span is None:
             total_span = contiguous_span * buffer_factor
+        self._set_malloc_flags(eager, hugepages)
         _check( _bf.bfRingResize(self.obj,
                                  contiguous_span,
                                  total_span,
                                  nringlet) )
+    def _set_malloc_flags(self, eager: bool, hugepages: bool) -> None:
+        flags = self._malloc_flags
+        new_flags = flags & ~(_bf.BF_MALLOC_PREFAULT | _bf.BF_MALLOC_HUGEPAGE)
+        if eager:
+            new_flags |= _bf.BF_MALLOC_PREFAULT
+        if hugepages:
+            new_flags |= _bf.BF_MALLOC_HUGEPAGE
+        if new_flags != flags:
+            _check( _bf.bfRingSetMallocFlags(self.obj, new_flags) )
+            self._malloc_flags = new_flags
     @property
     def name(self) -> str:
-        n = _get(_bf.bfRingGetName, self.obj)
-        return n.decode()
+        if self._name is None:
+            self._name = _get(_bf.bfRingGetName, self.obj).decode()
+        return self._name
     @property
     def space(self) -> str:
-        return _space2string(_get(_bf.bfRingGetSpace, self.obj))
+        return self._space
     @property
     def core(self) -> int:
-        return _get(_bf.bfRingGetAffinity, self.obj)
+        if self._core is None:
+            self._core = _get(_bf.bfRingGetAffinity, self.obj)
+        return self._core
+    @property
+    def numa_node(self) -> int:
+        return _get(_bf.bfRingGetNumaNode, self.obj)
+    @property
+    def _contiguous_span(self) -> int:
+        _check(_bf.bfRingLock(self.obj))
+        try:
+            return _get(_bf.bfRingLockedGetContiguousSpan, self.obj)
+        finally:
+            _check(_bf.bfRingUnlock(self.obj))
     #def begin_sequence(self, name, header="", nringlet=1):
     #    return Sequence(ring=self, name=name, header=header, nringlet=nringlet)
     #def end_sequence(self, sequence):
@@ -96,8 +192,8 @@ class Ring(BifrostObject):
     def end_writing(self) -> None:
         _check( _bf.bfRingEndWriting(self.obj) )
     def writing_ended(self) -> bool:
-        return _get( _bf.bfRingWritingEnded, self.obj )
-    def open_sequence(self, name: str, guarantee: bool=True) -> "ReadSequence":
+        return _bfRingWritingEnded(self.obj)
+    def open_sequence(self, name: Union[str,bytes], guarantee: bool=True) -> "ReadSequence":
         return ReadSequence(self, name=name, guarantee=guarantee)
     def open_sequence_at(self, time_tag: int, guarantee: bool=True) -> "ReadSequence":
         return ReadSequence(self, which='at', time_tag=time_tag, guarantee=guarantee)
@@ -109,13 +205,12 @@ class Ring(BifrostObject):
     def read(self, whence: str='earliest', guarantee: bool=True) -> "ReadSequence":
         with ReadSequence(self, which=whence, guarantee=guarantee) as cur_seq:
             while True:
-                try:
-                    yield cur_seq
-                    cur_seq.increment()
-                except EndOfDataStop:
+                yield cur_seq
+                if not cur_seq.try_increment():
                     return
 
 class RingWriter(object):
+    __slots__ = ('ring',)
     def __init__(self, ring: Ring):
         self.ring = ring
         self.ring._begin_writing()
@@ -130,57 +225,77 @@ class RingWriter(object):
 
 class SequenceBase(object):
     """Python object for a ring's sequence (data unit)"""
+    __slots__ = ('_ring', '_header_cache', '_base_obj_cache', 'obj')
     def __init__(self, ring: Ring):
         self._ring = ring
+        self._header_cache = None
+        self._base_obj_cache = None
     @property
     def _base_obj(self):
-        return ctypes.cast(self.obj, _bf.BFsequence)
+        # Note: self.obj is fixed once the sequence is opened, so the cast
+        #         handle is created on first use and then reused
+        if self._base_obj_cache is None:
+            self._base_obj_cache = ctypes.cast(self.obj, _bf.BFsequence)
+        return self._base_obj_cache
     @property
     def ring(self) -> Ring:
         return self._ring
     @property
     def name(self) -> str:
-        n = _get(_bf.bfRingSequenceGetName, self._base_obj)
+        n = _bfRingSequenceGetName(self._base_obj)
         return n.decode()
     @property
     def time_tag(self) -> int:
-        return _get(_bf.bfRingSequenceGetTimeTag, self._base_obj)
+        return _bfRingSequenceGetTimeTag(self._base_obj)
     @property
     def nringlet(self) -> int:
-        return _get(_bf.bfRingSequenceGetNRinglet, self._base_obj)
+        return _bfRingSequenceGetNRinglet(self._base_obj)
     @property
     def header_size(self) -> int:
-        return _get(_bf.bfRingSequenceGetHeaderSize, self._base_obj)
+        return _bfRingSequenceGetHeaderSize(self._base_obj)
     @property
     def _header_ptr(self):
-        return _get(_bf.bfRingSequenceGetHeader, self._base_obj)
+        return _bfRingSequenceGetHeader(self._base_obj)
     @property # TODO: Consider not making this a property
     def header(self) -> np.ndarray:
+        # Note: A sequence's header never changes, so the read-only view is
+        #         built once; ReadSequence.increment() drops it
+        if self._header_cache is not None:
+            return self._header_cache
         size = self.header_size
         if size == 0:
             # WAR for hdr_buffer_ptr.contents crashing when size == 0
-            hdr_array = np.empty(0, dtype=np.uint8)
+            hdr_array = _EMPTY_RO_HDR
+        else:
+            hdr_buffer = _address_as_buffer(self._header_ptr, size, readonly=True)
+            hdr_array = np.frombuffer(hdr_buffer, dtype=np.uint8)
             hdr_array.flags['WRITEABLE'] = False
-            return hdr_array
-        hdr_buffer = _address_as_buffer(self._header_ptr, size, readonly=True)
-        hdr_array = np.frombuffer(hdr_buffer, dtype=np.uint8)
-        hdr_array.flags['WRITEABLE'] = False
+        self._header_cache = hdr_array
         return hdr_array
 
 class WriteSequence(SequenceBase):
+    __slots__ = ()
     def __init__(self, ring: Ring, name: str="", time_tag: int=-1, header: str="", nringlet: int=1):
         SequenceBase.__init__(self, ring)
-        # TODO: Allow header to be a string, buffer, or numpy array
-        header_size = len(header)
-        if isinstance(header, np.ndarray):
-            header = header.ctypes.data
-        elif isinstance(header, str):
+        # Note: The size is taken after encoding, since len() of a str counts
+        #         characters rather than bytes
+        if isinstance(header, str):
             header = header.encode()
+        if isinstance(header, bytes):
+            header_size = len(header)
+        elif isinstance(header, np.ndarray):
+            header_size = header.nbytes
+            header = header.ctypes.data
+        else:
+            # Other buffers (bytearray, memoryview, ...) are passed without copying
+            header_buf = np.frombuffer(header, dtype=np.uint8)
+            header_size = header_buf.nbytes
+            header = header_buf.ctypes.data
         #print("hdr:", header_size, type(header))
         name = str(name)
         offset_from_head = 0
         self.obj = _bf.BFwsequence()
-        _check(_bf.bfRingSequenceBegin(
+        _bfRingSequenceBegin(
             self.obj,
             ring.obj,
             name.encode(),
@@ -188,32 +303,48 @@ class WriteSequence(SequenceBase):
             header_size,
             header,
             nringlet,
-            offset_from_head))
+            offset_from_head)
     def __enter__(self):
         return self
     def __exit__(self, type, value, tb):
         self.end()
     def end(self) -> None:
         offset_from_head = 0
-        _check(_bf.bfRingSequenceEnd(self.obj, offset_from_head))
+        _bfRingSequenceEnd(self.obj, offset_from_head)
     def reserve(self, size: int, nonblocking: bool=False) -> "WriteSpan":
         return WriteSpan(self.ring, size, nonblocking)
+    def write_array(self, arr: np.ndarray, gulp_size: int) -> None:
+        """Copy a C-contiguous array (laid out as [nringlet][...]) into the
+        ring in spans of gulp_size bytes per ringlet, without returning to
+        Python between spans"""
+        if not arr.flags['C_CONTIGUOUS']:
+            raise ValueError("Array must be C-contiguous")
+        nringlet = self.nringlet
+        if arr.nbytes % nringlet != 0:
+            raise ValueError("Array size is not a multiple of the number of ringlets")
+        space = arr.bf.space if isinstance(arr, ndarray) else 'system'
+        _check(_bf.bfRingSequenceWrite(self.obj, arr.ctypes.data,
+                                       _string2space(space),
+                                       arr.nbytes // nringlet, gulp_size))
 
 class ReadSequence(SequenceBase):
-    def __init__(self, ring: Ring, which: str='specific', name: str="",
+    __slots__ = ()
+    def __init__(self, ring: Ring, which: str='specific', name: Union[str,bytes]="",
                  time_tag: Optional[int]=None, other_obj: Optional[SequenceBase]=None,
                  guarantee: bool=True):
         SequenceBase.__init__(self, ring)
         self._ring = ring
         self.obj = _bf.BFrsequence()
         if which == 'specific':
-            _check(_bf.bfRingSequenceOpen(self.obj, ring.obj, name, guarantee))
+            if isinstance(name, str):
+                name = name.encode()
+            _bfRingSequenceOpen(self.obj, ring.obj, name, guarantee)
         elif which == 'latest':
-            _check(_bf.bfRingSequenceOpenLatest(self.obj, ring.obj, guarantee))
+            _bfRingSequenceOpenLatest(self.obj, ring.obj, guarantee)
         elif which == 'earliest':
-            _check(_bf.bfRingSequenceOpenEarliest(self.obj, ring.obj, guarantee))
+            _bfRingSequenceOpenEarliest(self.obj, ring.obj, guarantee)
         elif which == 'at':
-            _check(_bf.bfRingSequenceOpenAt(self.obj, ring.obj, time_tag, guarantee))
+            _bfRingSequenceOpenAt(self.obj, ring.obj, time_tag, guarantee)
         #elif which == 'next':
         #    self._check( self.lib.bfRingSequenceOpenNext(pointer(self.obj), other_obj) )
         else:
@@ -223,69 +354,183 @@ class ReadSequence(SequenceBase):
     def __exit__(self, type, value, tb):
         self.close()
     def close(self) -> None:
-        _check(_bf.bfRingSequenceClose(self.obj))
+        _bfRingSequenceClose(self.obj)
     #def __next__(self):
     #    return self.next()
     #def next(self):
     #    return ReadSequence(self._ring, which='next', other_obj=self.obj)
     def increment(self) -> None:
         #self._check( self.lib.bfRingSequenceNext(pointer(self.obj)) )
-        _check(_bf.bfRingSequenceNext(self.obj))
+        if not self.try_increment():
+            raise EndOfDataStop('BF_STATUS_END_OF_DATA')
+    def try_increment(self) -> bool:
+        """Advance to the next sequence, returning False (rather than raising
+        EndOfDataStop) once the end of the data has been reached"""
+        status = _bf.bfRingSequenceNext(self.obj)
+        if status == _bf.BF_STATUS_END_OF_DATA:
+            return False
+        _check(status)
+        self._header_cache = None
+        return True
     def acquire(self, offset: int, size: int) -> "ReadSpan":
         return ReadSpan(self, offset, size)
+    def try_acquire(self, offset: int, size: int) -> Optional["ReadSpan"]:
+        """Acquire a span, returning None (rather than raising EndOfDataStop)
+        once the end of the data has been reached"""
+        span = ReadSpan.__new__(ReadSpan)
+        status = span._acquire(self, offset, size)
+        if status == _bf.BF_STATUS_END_OF_DATA:
+            return None
+        _check(status)
+        span._cache_info()
+        return span
     def read(self, span_size: int, stride: Optional[int]=None, begin: int=0) -> "ReadSpan":
         if stride is None:
             stride = span_size
+        # Note: Consecutive spans are released and acquired by a C iterator
+        #         so that each one costs a single call, and the end of the
+        #         data is detected from the status code rather than by
+        #         raising and catching an exception on every span
+        it = _bf.BFrspaniter()
+        _bfRingSpanIteratorCreate(it, self.obj, begin, span_size, stride)
+        try:
+            while True:
+                info = _bf.BFspan_info()
+                status = _bf.bfRingSpanIteratorNext(it, info)
+                if status == _bf.BF_STATUS_END_OF_DATA:
+                    return
+                _check(status)
+                with _IteratedReadSpan(self, it, info) as ispan:
+                    yield ispan
+        finally:
+            _bfRingSpanIteratorDestroy(it)
+    def read_batch(self, span_size: int, n: int=16, stride: Optional[int]=None,
+                   begin: int=0) -> "ReadSpan":
+        """Like read(), but acquires up to n spans at once as a single
+        contiguous span and yields read-only views into it.
+
+        This amortizes the acquire/release calls over the batch at the cost
+        of waiting for the whole batch to be written before the first span
+        is yielded.  The batch is capped to the ring's contiguous span."""
+        for batch in self.read_span_batches(span_size, n, stride, begin):
+            for ispan in batch:
+                yield ispan
+    def read_span_batches(self, span_size: int, n: int=16, stride: Optional[int]=None,
+                          begin: int=0) -> "SpanBatch":
+        """Like read_batch(), but yields each batch as a SpanBatch whose
+        span metadata is held in Numpy arrays"""
+        if stride is None:
+            stride = span_size
+        nbatch = max(1, min(n, (self._ring._contiguous_span - span_size) // stride + 1))
+        batch_size = (nbatch - 1) * stride + span_size
+        starts = np.arange(nbatch, dtype=np.int64) * stride
         offset = begin
+        # Note: The batch is acquired as one span (rather than as nbatch
+        #         separate spans) because the sequence's guarantee only
+        #         protects data from the most recently acquired span onwards
         while True:
-            try:
-                with self.acquire(offset, span_size) as ispan:
-                    yield ispan
-                offset += stride
-            except EndOfDataStop:
+            ispan = self.try_acquire(offset, batch_size)
+            if ispan is None:
                 return
+            with ispan:
+                info = ispan._info
+                avail_begin = int(info.offset)
+                avail_end   = avail_begin + int(info.size)
+                sub_begins = offset + starts
+                sub_begins = sub_begins[sub_begins < avail_end]
+                sub_ends   = np.minimum(sub_begins + span_size, avail_end)
+                sub_begins = np.maximum(sub_begins, avail_begin)
+                sub_ends   = np.maximum(sub_ends, sub_begins)
+                yield SpanBatch(ispan, sub_begins, sub_ends - sub_begins)
+            if avail_end < offset + batch_size:
+                # The sequence ended part way through the batch
+                return
+            offset += nbatch * stride
+
+class SpanBatch(object):
+    """Consecutive spans that share one acquired ReadSpan, with their
+    metadata stored as arrays (one entry per span) so that it can be
+    processed without creating a Python object per span.  It is only
+    valid until the next batch is requested."""
+    __slots__ = ('span', 'offsets', 'sizes', 'strides', 'data_ptrs', 'nringlet')
+    def __init__(self, span: "ReadSpan", offsets: np.ndarray, sizes: np.ndarray):
+        info = span._info
+        self.span      = span
+        self.offsets   = offsets
+        self.sizes     = sizes
+        self.strides   = np.full(len(offsets), int(info.stride), dtype=np.int64)
+        self.data_ptrs = ((info.data or 0) - int(info.offset) + offsets).astype(np.uint64)
+        self.nringlet  = int(info.nringlet)
+    def __len__(self):
+        return len(self.offsets)
+    def __getitem__(self, i: int) -> "_ReadSpanView":
+        pinfo = self.span._info
+        info = _bf.BFspan_info()
+        info.ring     = pinfo.ring
+        info.data     = int(self.data_ptrs[i])
+        info.size     = int(self.sizes[i])
+        info.stride   = pinfo.stride
+        info.offset   = int(self.offsets[i])
+        info.nringlet = pinfo.nringlet
+        return _ReadSpanView(self.span.ring, info)
+    def __iter__(self):
+        for i in range(len(self.offsets)):
+            yield self[i]
 
 class SpanBase(object):
+    __slots__ = ('_ring', 'writeable', '_default_view', '_info', 'obj')
     def __init__(self, ring: Ring, writeable: bool):
         self._ring = ring
         self.writeable = writeable
+        self._default_view = None
     @property
     def _base_obj(self):
         return ctypes.cast(self.obj, _bf.BFspan)
+    def _cache_info(self):
+        # Note: A span's geometry is fixed once it is reserved/acquired, so
+        #         it is fetched with a single call
+        self._info = _bf.BFspan_info()
+        _bfRingSpanGetInfo(self._base_obj, self._info)
     @property
     def ring(self) -> Ring:
         return self._ring
     @property
     def size(self) -> int:
-        return _get(_bf.bfRingSpanGetSize, self._base_obj)
+        return int(self._info.size)
     @property
     def stride(self) -> int:
-        return _get(_bf.bfRingSpanGetStride, self._base_obj)
+        return int(self._info.stride)
     @property
     def offset(self) -> int:
-        return _get(_bf.bfRingSpanGetOffset, self._base_obj)
+        return int(self._info.offset)
     @property
     def nringlet(self) -> int:
-        return _get(_bf.bfRingSpanGetNRinglet, self._base_obj)
+        return int(self._info.nringlet)
     @property
     def _data_ptr(self):
-        return _get(_bf.bfRingSpanGetData, self._base_obj)
+        return self._info.data
     @property
     def data(self) -> ndarray:
-        return self.data_view()
+        # Note: The span's memory does not move while it is held, so the
+        #         default view is built once and dropped on close/release
+        if self._default_view is None:
+            self._default_view = self.data_view()
+        return self._default_view
     def data_view(self, dtype: Union[str,np.dtype]=np.uint8,
                   shape: Union[int,List[int],Tuple[int]]=-1) -> ndarray:
-        itemsize = DataType(dtype).itemsize
-        assert( self.size   % itemsize == 0 )
-        assert( self.stride % itemsize == 0 )
-        data_ptr = self._data_ptr
-        span_size  = self.size
-        nringlet   = self.nringlet
+        itemsize = _itemsize(dtype)
+        info = self._info
+        span_size  = int(info.size)
+        stride     = int(info.stride)
+        nringlet   = int(info.nringlet)
+        assert( span_size % itemsize == 0 )
+        assert( stride    % itemsize == 0 )
+        data_ptr = info.data
         # TODO: We should really map the actual ring memory space and index
         #         it with offset rather than mapping from the current pointer.
         _shape   = (nringlet, span_size // itemsize)
-        strides = (self.stride, itemsize) if nringlet > 1 else None
-        space   = self.ring.space
+        strides = (stride, itemsize) if nringlet > 1 else None
+        space   = self._ring._space
         
         data_array = ndarray(shape=_shape, strides=strides,
                              buffer=data_ptr, dtype=dtype,
@@ -304,13 +549,15 @@ class SpanBase(object):
     #    return self._sequence
 
 class WriteSpan(SpanBase):
+    __slots__ = ('commit_size',)
     def __init__(self,
                  ring: Ring,
                  size: int,
                  nonblocking: bool=False):
         SpanBase.__init__(self, ring, writeable=True)
         self.obj = _bf.BFwspan()
-        _check(_bf.bfRingSpanReserve(self.obj, ring.obj, size, nonblocking))
+        _bfRingSpanReserve(self.obj, ring.obj, size, nonblocking)
+        self._cache_info()
         self.commit_size = size
     def commit(self, size: int) -> None:
         self.commit_size = size
@@ -319,16 +566,57 @@ class WriteSpan(SpanBase):
     def __exit__(self, type, value, tb):
         self.close()
     def close(self) -> None:
-        _check(_bf.bfRingSpanCommit(self.obj, self.commit_size))
+        self._default_view = None
+        _bfRingSpanCommit(self.obj, self.commit_size)
 
 class ReadSpan(SpanBase):
+    __slots__ = ()
     def __init__(self, sequence: ReadSequence, offset: int, size: int):
+        _check(self._acquire(sequence, offset, size))
+        self._cache_info()
+    def _acquire(self, sequence: ReadSequence, offset: int, size: int) -> int:
         SpanBase.__init__(self, sequence.ring, writeable=False)
         self.obj = _bf.BFrspan()
-        _check(_bf.bfRingSpanAcquire(self.obj, sequence.obj, offset, size))
+        return _bf.bfRingSpanAcquire(self.obj, sequence.obj, offset, size)
+    def __enter__(self):
+        return self
+    def __exit__(self, type, value, tb):
+        self.release()
+    def release(self) -> None:
+        self._default_view = None
+        _bfRingSpanRelease(self.obj)
+
+class _IteratedReadSpan(ReadSpan):
+    """ReadSpan acquired (and later released) by a span iterator, as yielded
+    by ReadSequence.read.  It is only valid until the next one is requested."""
+    __slots__ = ('_iter', '_obj')
+    def __init__(self, sequence: ReadSequence, it: _bf.BFrspaniter,
+                 info: _bf.BFspan_info):
+        SpanBase.__init__(self, sequence.ring, writeable=False)
+        self._iter = it
+        self._obj = None
+        self._info = info
+    @property
+    def obj(self) -> _bf.BFrspan:
+        if self._obj is None:
+            self._obj = _bf.BFrspan()
+            _bfRingSpanIteratorGetSpan(self._iter, self._obj)
+        return self._obj
+    def release(self) -> None:
+        # Note: The iterator releases the span when it acquires the next one
+        self._default_view = None
+
+class _ReadSpanView(SpanBase):
+    """Read-only view of part of a larger ReadSpan, as yielded by
+    ReadSequence.read_batch.  It is only valid until the next batch is
+    requested."""
+    __slots__ = ()
+    def __init__(self, ring: Ring, info: _bf.BFspan_info):
+        SpanBase.__init__(self, ring, writeable=False)
+        self._info = info
     def __enter__(self):
         return self
     def __exit__(self, type, value, tb):
         self.release()
     def release(self) -> None:
-        _check(_bf.bfRingSpanRelease(self.obj))
+        self._default_view = None
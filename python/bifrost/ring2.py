@@ -28,22 +28,36 @@
 # TODO: Some of this code has gotten a bit hacky
 #         Also consider merging some of the logic into the backend
 
-from bifrost.libbifrost import _bf, _check, _get, BifrostObject, _string2space, EndOfDataStop
+from bifrost.libbifrost import _bf, _check, _get, _checked, _getter, BifrostObject, _string2space, EndOfDataStop
 from bifrost.DataType import DataType
-from bifrost.ndarray import ndarray, _address_as_buffer
-from copy import copy, deepcopy
-from functools import reduce
+from bifrost.ndarray import ndarray, _address_as_buffer, _wrap_address
+from functools import lru_cache
+
+try:
+    from math import prod
+except ImportError:
+    # Python < 3.8
+    from functools import reduce
+    from operator import mul
+    def prod(iterable, start=1):
+        return reduce(mul, iterable, start)
 
 import ctypes
-import string
+import itertools
+import operator
+import re
 import warnings
 import numpy as np
 
 try:
-    import simplejson as json
+    import orjson
 except ImportError:
-    warnings.warn("Install simplejson for better performance", RuntimeWarning)
-    import json
+    orjson = None
+    try:
+        import simplejson as json
+    except ImportError:
+        warnings.warn("Install orjson for better performance", RuntimeWarning)
+        import json
 
 from collections.abc import Iterable
 from typing import Any, Callable, Dict, List, Optional, Tuple, Union
@@ -51,10 +65,81 @@ from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 from bifrost import telemetry
 telemetry.track_module()
 
+# Note: The calls made for every gulp have their status checked by ctypes
+#         (see _checked/_getter) rather than by a separate _check/_get call
+_bfRingSequenceNext = _checked(_bf.bfRingSequenceNext)
+_bfRingSpanReserve  = _checked(_bf.bfRingSpanReserve)
+_bfRingSpanCommit   = _checked(_bf.bfRingSpanCommit)
+_bfRingSpanAcquire  = _checked(_bf.bfRingSpanAcquire)
+_bfRingSpanRelease  = _checked(_bf.bfRingSpanRelease)
+# Note: This takes the read/write span handle directly, without a cast to BFspan
+_bfRingSpanGetInfo  = _checked(_bf.bfRingSpanGetInfo,
+                               [ctypes.c_void_p, ctypes.POINTER(_bf.BFspan_info)])
+_bfRingSpanGetSizeOverwritten = _getter(_bf.bfRingSpanGetSizeOverwritten)
+_bfRingSpanIteratorCreate  = _checked(_bf.bfRingSpanIteratorCreate)
+_bfRingSpanIteratorNext    = _checked(_bf.bfRingSpanIteratorNext)
+_bfRingSpanIteratorGetSpan = _checked(_bf.bfRingSpanIteratorGetSpan)
+_bfRingSpanIteratorDestroy = _checked(_bf.bfRingSpanIteratorDestroy)
+
+# Note: Headers are stored in the ring as UTF-8 encoded JSON
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+    def _json_dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=_ORJSON_OPTIONS)
+    _json_loads = orjson.loads
+else:
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode()
+    def _json_loads(data: Any) -> Any:
+        return json.loads(bytes(data))
+
+@lru_cache(maxsize=64)
+def _ring_dtype(dtype: str) -> DataType:
+    # Note: DataType instances are never modified in place, so sequences
+    #         with the same data type can share one
+    return DataType(dtype)
+
+# Note: Matches every character that is not valid in a ring name
+_SLUG_RE = re.compile(r'[^-_.() A-Za-z0-9]')
+
 def _slugify(name):
-    valid_chars = "-_.() %s%s" % (string.ascii_letters, string.digits)
-    valid_chars = frozenset(valid_chars)
-    return ''.join([c for c in name if c in valid_chars])
+    return _SLUG_RE.sub('', name)
+
+class _Tensor(object):
+    """Ring geometry derived from a sequence's '_tensor' header entry"""
+    __slots__ = ('dtype', 'ringlet_shape', 'nringlet',
+                 'frame_shape', 'frame_nbyte', 'dtype_nbyte', 'frame_strides',
+                 'dtype_np')
+    def __init__(self, dtype: DataType, ringlet_shape: List[int], nringlet: int,
+                 frame_shape: List[int], frame_nbyte: int, dtype_nbyte: int):
+        self.dtype         = dtype
+        self.ringlet_shape = ringlet_shape
+        self.nringlet      = nringlet
+        self.frame_shape   = frame_shape
+        self.frame_nbyte   = frame_nbyte
+        self.dtype_nbyte   = dtype_nbyte
+        # Note: Strides of the frame axis and the axes within a frame are the
+        #         same for every span in the sequence, so compute them once
+        self.frame_strides = _accumulate_strides(dtype_nbyte, frame_shape)
+        self.dtype_np      = np.dtype(dtype.as_numpy_dtype())
+    def __getitem__(self, key: str) -> Any:
+        # Note: Retained for callers that still index this like a dict
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+    def as_dict(self) -> Dict[str,Any]:
+        return {key: getattr(self, key) for key in self.__slots__}
+
+def _accumulate_strides(inner_stride: int, shape: List[int]) -> Tuple[int]:
+    """Returns the strides of a C-contiguous block of the given shape plus
+    one outer axis, where inner_stride is the stride of the last axis
+    E.g., (4, [2,3]) -> (24, 12, 4)
+    """
+    strides = [inner_stride]
+    for dim in reversed(shape):
+        strides.append(dim * strides[-1])
+    strides.reverse()
+    return tuple(strides)
 
 # TODO: Should probably move this elsewhere (e.g., utils)
 def split_shape(shape: Union[List[int],Tuple[int]]) -> Tuple[List[int], List[int]]:
@@ -69,8 +154,23 @@ def split_shape(shape: Union[List[int],Tuple[int]]) -> Tuple[List[int], List[int
         ringlet_shape.append(dim)
     raise ValueError("No time dimension (-1) found in shape")
 
+class _Composed(object):
+    """A chain of unary functions, applied in order in a single call"""
+    __slots__ = ('fns',)
+    def __init__(self, fns: Tuple[Callable]):
+        self.fns = fns
+    def __call__(self, x: Any) -> Any:
+        for fn in self.fns:
+            x = fn(x)
+        return x
+
 def compose_unary_funcs(f: Callable, g: Callable) -> Callable:
-    return lambda x: f(g(x))
+    """Returns the composition f(g(x))"""
+    # Note: Chains of compositions (e.g., views of views) are flattened so
+    #         that calling the result does not nest one call per link
+    fns = g.fns if isinstance(g, _Composed) else (g,)
+    fns += f.fns if isinstance(f, _Composed) else (f,)
+    return _Composed(fns)
 
 def ring_view(ring: "Ring", header_transform: Callable) -> "Ring":
     new_ring = ring.view()
@@ -83,7 +183,8 @@ def ring_view(ring: "Ring", header_transform: Callable) -> "Ring":
 
 class Ring(BifrostObject):
     instance_count = 0
-    def __init__(self, space: str='system', name: Optional[str]=None, owner: Optional[Any]=None, core: Optional[int]=None):
+    def __init__(self, space: str='system', name: Optional[str]=None, owner: Optional[Any]=None, core: Optional[int]=None,
+                 write_combined: bool=False, numa_node: Optional[int]=None):
         # If this is non-None, then the object is wrapping a base Ring instance
         self.base = None
         self.is_view = False   # This gets set to True by use of .view()
@@ -100,21 +201,64 @@ class Ring(BifrostObject):
                                               core) )
             except RuntimeError:
                 pass
+        if numa_node is not None:
+            # Note: Overrides the NUMA node implied by core for the ring memory
+            try:
+                _check( _bf.bfRingSetNumaNode(self.obj,
+                                              numa_node) )
+            except RuntimeError:
+                pass
+        # Note: Mirrors the ring's BF_MALLOC_* flags so that resize() only
+        #         has to call into the library when they change
+        self._malloc_flags = _bf.BF_MALLOC_DEFAULT
+        if write_combined:
+            # Note: Only for cuda_host rings that the CPU writes but never reads
+            if self.space != 'cuda_host':
+                raise ValueError("write_combined requires space='cuda_host'")
+            _check( _bf.bfRingSetMallocFlags(self.obj,
+                                             _bf.BF_MALLOC_WRITE_COMBINED) )
+            self._malloc_flags = _bf.BF_MALLOC_WRITE_COMBINED
         self.owner = owner
         self.header_transform = None
     def __del__(self):
         if self.base is not None and not self.is_view:
             BifrostObject.__del__(self)
     def view(self) -> "Ring":
-        new_ring = copy(self)
+        # Note: This is a shallow copy that shares the underlying C ring
+        new_ring = object.__new__(type(self))
+        new_ring.__dict__.update(self.__dict__)
+        new_ring._obj_basename = self._obj_basename
+        new_ring.obj           = self.obj
+        new_ring._destructor   = self._destructor
         new_ring.base = self
         new_ring.is_view = True
         return new_ring
-    def resize(self, contiguous_bytes: int, total_bytes: Optional[int]=None, nringlet: int=1) -> None:
+    def resize(self, contiguous_bytes: int, total_bytes: Optional[int]=None, nringlet: int=1,
+               eager: bool=False, hugepages: bool=False) -> None:
+        """Ensure the ring can hold the requested spans.  If eager is True, a
+        newly-allocated system-space buffer has all of its pages faulted in
+        before it is used.  If hugepages is True, a newly-allocated
+        system-space buffer is (where supported) backed by huge pages to
+        reduce TLB misses when streaming through large rings."""
+        self._set_malloc_flags(eager, hugepages)
         _check( _bf.bfRingResize(self.obj,
                                  contiguous_bytes,
                                  total_bytes,
                                  nringlet) )
+    def _set_malloc_flags(self, eager: bool, hugepages: bool) -> None:
+        # Note: Views share the C ring, so the flags are tracked on the base
+        ring = self
+        while ring.is_view:
+            ring = ring.base
+        flags = ring._malloc_flags
+        new_flags = flags & ~(_bf.BF_MALLOC_PREFAULT | _bf.BF_MALLOC_HUGEPAGE)
+        if eager:
+            new_flags |= _bf.BF_MALLOC_PREFAULT
+        if hugepages:
+            new_flags |= _bf.BF_MALLOC_HUGEPAGE
+        if new_flags != flags:
+            _check( _bf.bfRingSetMallocFlags(self.obj, new_flags) )
+            ring._malloc_flags = new_flags
     @property
     def name(self) -> str:
         n = _get(_bf.bfRingGetName, self.obj)
@@ -122,6 +266,9 @@ class Ring(BifrostObject):
     @property
     def core(self) -> int:
         return _get(_bf.bfRingGetAffinity, self.obj)
+    @property
+    def numa_node(self) -> int:
+        return _get(_bf.bfRingGetNumaNode, self.obj)
     def begin_writing(self) -> "RingWriter":
         return RingWriter(self)
     def _begin_writing(self):
@@ -167,83 +314,107 @@ class SequenceBase(object):
         self._ring = ring
         self._header = None
         self._tensor = None
+        self._base_obj_cache = None
+        # Note: Scratch space for querying the spans of this sequence
+        self._span_info = _bf.BFspan_info()
+        self._clear_properties()
+    def _clear_properties(self):
+        # Note: These are fixed for the lifetime of a sequence, so they are
+        #         only queried once (and again after an increment)
+        self._name        = None
+        self._time_tag    = None
+        self._nringlet    = None
+        self._header_size = None
+        self._header_ptr_cache = None
     @property
     def _base_obj(self):
-        return ctypes.cast(self.obj, _bf.BFsequence)
+        if self._base_obj_cache is None:
+            self._base_obj_cache = ctypes.cast(self.obj, _bf.BFsequence)
+        return self._base_obj_cache
     @property
     def ring(self) -> Ring:
         return self._ring
     @property
     def name(self) -> str:
-        n = _get(_bf.bfRingSequenceGetName, self._base_obj)
-        return n.decode()
+        if self._name is None:
+            self._name = _get(_bf.bfRingSequenceGetName, self._base_obj).decode()
+        return self._name
     @property
     def time_tag(self) -> int:
-        return _get(_bf.bfRingSequenceGetTimeTag, self._base_obj)
+        if self._time_tag is None:
+            self._time_tag = _get(_bf.bfRingSequenceGetTimeTag, self._base_obj)
+        return self._time_tag
     @property
     def nringlet(self) -> int:
-        return _get(_bf.bfRingSequenceGetNRinglet, self._base_obj)
+        if self._nringlet is None:
+            self._nringlet = _get(_bf.bfRingSequenceGetNRinglet, self._base_obj)
+        return self._nringlet
     @property
     def header_size(self) -> int:
-        return _get(_bf.bfRingSequenceGetHeaderSize, self._base_obj)
+        if self._header_size is None:
+            self._header_size = _get(_bf.bfRingSequenceGetHeaderSize, self._base_obj)
+        return self._header_size
     @property
     def _header_ptr(self):
-        return _get(_bf.bfRingSequenceGetHeader, self._base_obj)
+        if self._header_ptr_cache is None:
+            self._header_ptr_cache = _get(_bf.bfRingSequenceGetHeader, self._base_obj)
+        return self._header_ptr_cache
     @property
-    def tensor(self) -> Dict[str,Any]: # TODO: This shouldn't be public
+    def tensor(self) -> _Tensor: # TODO: This shouldn't be public
         if self._tensor is not None:
             return self._tensor
         header = self.header
         shape = header['_tensor']['shape']
         ringlet_shape, frame_shape = split_shape(shape)
-        nringlet       = reduce(lambda x, y: x * y, ringlet_shape, 1)
-        frame_nelement = reduce(lambda x, y: x * y, frame_shape,   1)
-        dtype = header['_tensor']['dtype']
-        nbit = DataType(dtype).itemsize_bits
-        assert(nbit % 8 == 0)
+        nringlet       = prod(ringlet_shape)
+        frame_nelement = prod(frame_shape)
+        dtype = _ring_dtype(header['_tensor']['dtype'])
+        nbit = dtype.itemsize_bits
+        if nbit & 7:
+            raise ValueError(f"Ring data type must be a whole number of bytes, not {nbit} bits")
         frame_nbyte = frame_nelement * nbit // 8
-        self._tensor = {}
-        self._tensor['dtype']         = DataType(dtype)
-        self._tensor['ringlet_shape'] = ringlet_shape
-        self._tensor['nringlet']      = nringlet
-        self._tensor['frame_shape']   = frame_shape
-        self._tensor['frame_nbyte']   = frame_nbyte
-        self._tensor['dtype_nbyte']   = nbit // 8
+        self._tensor = _Tensor(dtype=dtype,
+                               ringlet_shape=ringlet_shape,
+                               nringlet=nringlet,
+                               frame_shape=frame_shape,
+                               frame_nbyte=frame_nbyte,
+                               dtype_nbyte=nbit // 8)
         return self._tensor
     @property
     def header(self) -> Dict[str,Any]:
-        if self._header is not None:
-            return self._header
+        if self._header is None:
+            self._header = self._parse_header()
+        return self._header
+    def _parse_header(self) -> Dict[str,Any]:
+        """Returns a newly-parsed copy of the sequence header"""
         size = self.header_size
         if size == 0:
             # WAR for hdr_buffer_ptr.contents crashing when size == 0
-            hdr_array = np.empty(0, dtype=np.uint8)
-            hdr_array.flags['WRITEABLE'] = False
-            return json.loads(hdr_array.tobytes())
+            return {}
+        # Note: orjson parses the buffer in place; the fallbacks copy it once
         hdr_buffer = _address_as_buffer(self._header_ptr, size, readonly=True)
-        hdr_array = np.frombuffer(hdr_buffer, dtype=np.uint8)
-        hdr_array.flags['WRITEABLE'] = False
-        self._header = json.loads(hdr_array.tobytes())
-        return self._header
+        return _json_loads(hdr_buffer)
 
 class WriteSequence(SequenceBase):
     def __init__(self, ring: Ring, header: Dict[str,Any], gulp_nframe: int, buf_nframe: int):
         SequenceBase.__init__(self, ring)
         self._header = header
         # This allows passing DataType instances instead of string types
-        header['_tensor']['dtype'] = str(header['_tensor']['dtype'])
-        header_str = json.dumps(header)
-        header_size = len(header_str)
+        dtype = header['_tensor']['dtype']
+        if not isinstance(dtype, str):
+            header['_tensor']['dtype'] = str(dtype)
+        # Note: This is already UTF-8 encoded and is passed to the backend as-is
+        hstr = _json_dumps(header)
+        header_size = len(hstr)
         tensor = self.tensor
         # **TODO: Consider moving this into bfRingSequenceBegin
-        self.ring.resize(gulp_nframe * tensor['frame_nbyte'],
-                         buf_nframe * tensor['frame_nbyte'],
-                         tensor['nringlet'])
+        self.ring.resize(gulp_nframe * tensor.frame_nbyte,
+                         buf_nframe * tensor.frame_nbyte,
+                         tensor.nringlet)
         offset_from_head = 0
         # TODO: How to allow time_tag to be optional? Probably need to plumb support through to backend.
         self.obj = _bf.BFwsequence()
         hname = header['name'].encode()
-        hstr = header_str.encode()
         _check(_bf.bfRingSequenceBegin(
             self.obj,
             ring.obj,
@@ -251,8 +422,11 @@ class WriteSequence(SequenceBase):
             header['time_tag'],
             header_size,
             hstr,
-            tensor['nringlet'],
+            tensor.nringlet,
             offset_from_head))
+        # Note: These are known already, so there is no need to query them
+        self._name        = hname.decode()
+        self._header_size = header_size
     def __enter__(self):
         return self
     def __exit__(self, type, value, tb):
@@ -271,8 +445,11 @@ class ReadSequence(SequenceBase):
         self._ring = ring
         # A function for transforming the header before it's read
         self.header_transform = header_transform
+        self._transformed_header = None
         self.obj = _bf.BFrsequence()
         if which == 'specific':
+            if isinstance(name, str):
+                name = name.encode()
             _check(_bf.bfRingSequenceOpen(self.obj, ring.obj, name, guarantee))
         elif which == 'at':
             assert(time_tag is not None)
@@ -291,57 +468,79 @@ class ReadSequence(SequenceBase):
     def close(self) -> None:
         _check(_bf.bfRingSequenceClose(self.obj))
     def increment(self) -> None:
-        _check(_bf.bfRingSequenceNext(self.obj))
+        _bfRingSequenceNext(self.obj)
         # Must invalidate cached header and tensor because this is now
         #   a new sequence.
         self._header = None
         self._tensor = None
+        self._transformed_header = None
+        self._clear_properties()
     def acquire(self, frame_offset: int, nframe: int) -> "ReadSpan":
         return ReadSpan(self, frame_offset, nframe)
     def read(self, nframe: int, stride: Optional[int]=None, begin: int=0) -> "ReadSpan":
         if stride is None:
             stride = nframe
-        offset = begin
-        while True:
-            try:
-                with self.acquire(offset, nframe) as ispan:
-                    yield ispan
-                    offset += stride
-            except EndOfDataStop:
-                return
+        # Note: Consecutive spans are released and acquired by a C iterator
+        #         so that moving on to the next one costs a single call
+        frame_nbyte = self.tensor.frame_nbyte
+        it = _bf.BFrspaniter()
+        _bfRingSpanIteratorCreate(it, self.obj, begin * frame_nbyte,
+                                  nframe * frame_nbyte, stride * frame_nbyte)
+        try:
+            offset = begin
+            while True:
+                try:
+                    ispan = _IteratedReadSpan(self, it, offset, nframe)
+                except EndOfDataStop:
+                    return
+                yield ispan
+                offset += stride
+        finally:
+            _bfRingSpanIteratorDestroy(it)
     def resize(self, gulp_nframe: int, buf_nframe: Optional[int]=None, buffer_factor: Optional[int]=None) -> None:
         if buf_nframe is None:
             if buffer_factor is None:
                 buffer_factor = 3
             buf_nframe = int(np.ceil(gulp_nframe * buffer_factor))
         tensor = self.tensor
-        return self._ring.resize(gulp_nframe * tensor['frame_nbyte'],
-                                 buf_nframe * tensor['frame_nbyte'])
+        return self._ring.resize(gulp_nframe * tensor.frame_nbyte,
+                                 buf_nframe * tensor.frame_nbyte)
     @property
     def header(self) -> Dict[str,Any]:
-        hdr = super(ReadSequence, self).header
-        if self.header_transform is not None:
-            hdr = self.header_transform(deepcopy(hdr))
+        if self.header_transform is None:
+            return super(ReadSequence, self).header
+        if self._transformed_header is None:
+            # Note: The transform may modify the header in place, so it is
+            #         given a freshly-parsed copy rather than a deepcopy of
+            #         the cached one
+            hdr = self.header_transform(self._parse_header())
             if hdr is None:
                 raise ValueError("Header transform returned None")
-        return hdr
+            self._transformed_header = hdr
+        return self._transformed_header
+
+_ACCUMULATE_OPS = {'+':   operator.add,
+                   '*':   operator.mul,
+                   'min': min,
+                   'max': max}
 
 def accumulate(vals: Iterable, op: str='+', init: Optional=None, reverse: bool=False) -> List:
-    if   op == '+':   op = lambda a, b: a + b
-    elif op == '*':   op = lambda a, b: a * b
-    elif op == 'min': op = lambda a, b: min(a, b)
-    elif op == 'max': op = lambda a, b: max(a, b)
-    else: raise ValueError(f"Invalid operation '{op}'")
-    results = []
+    try:
+        op = _ACCUMULATE_OPS[op]
+    except KeyError:
+        raise ValueError(f"Invalid operation '{op}'")
     if reverse:
         vals = reversed(list(vals))
-    for i, val in enumerate(vals):
-        if i == 0:
-            results.append(val if init is None else init)
-        else:
-            results.append(op(results[-1], val))
+    vals = iter(vals)
+    try:
+        first = next(vals)
+    except StopIteration:
+        return []
+    if init is not None:
+        first = init
+    results = list(itertools.accumulate(itertools.chain((first,), vals), op))
     if reverse:
-        results = list(reversed(results))
+        results.reverse()
     return results
 
 class SpanBase(object):
@@ -349,13 +548,25 @@ class SpanBase(object):
         self._ring     = ring
         self._sequence = sequence
         self.writeable = writeable
-        self._data = None
-    def _set_base_obj(self, obj):
-        self._base_obj = ctypes.cast(obj, _bf.BFspan)
-        self._cache_info()
+        self._data    = None
+        self._shape   = None
+        self._strides = None
     def _cache_info(self):
-        self._info = _bf.BFspan_info()
-        _check(_bf.bfRingSpanGetInfo(self._base_obj, self._info))
+        info = self._sequence._span_info
+        _bfRingSpanGetInfo(self.obj, info)
+        self._set_info(info)
+    def _set_info(self, info: _bf.BFspan_info):
+        # Note: A span's geometry is fixed once it is reserved/acquired, so
+        #         it is converted to plain ints here rather than re-read from
+        #         the ctypes struct by every property access
+        # **TODO: Change back-end to use long instead of uint64_t
+        self._size_bytes   = int(info.size)
+        self._stride_bytes = int(info.stride)
+        self._byte_offset  = int(info.offset)
+        self._nringlet     = int(info.nringlet)
+        self._data_ptr     = info.data
+        self._frame_nbyte  = self._sequence.tensor.frame_nbyte
+        self._nframe       = self._size_bytes // self._frame_nbyte
     @property
     def ring(self) -> Ring:
         return self._ring
@@ -363,19 +574,11 @@ class SpanBase(object):
     def sequence(self) -> SequenceBase:
         return self._sequence
     @property
-    def tensor(self) -> Dict[str,Any]:
+    def tensor(self) -> _Tensor:
         return self._sequence.tensor
     @property
-    def _size_bytes(self):
-        # **TODO: Change back-end to use long instead of uint64_t
-        return int(self._info.size)
-    @property
-    def _stride_bytes(self):
-        # **TODO: Change back-end to use long instead of uint64_t
-        return int(self._info.stride)
-    @property
     def frame_nbyte(self) -> int:
-        return self._sequence.tensor['frame_nbyte']
+        return self._frame_nbyte
     @property
     def frame_offset(self) -> int:
         
@@ -387,66 +590,51 @@ class SpanBase(object):
         #            However, this should only be done for ReadSpans, as
         #              WriteSpans should always be aligned with a frame.
         
-        # **TODO: Change back-end to use long instead of uint64_t
-        byte_offset = int(self._info.offset)
-        assert(byte_offset % self.frame_nbyte == 0)
-        return byte_offset // self.frame_nbyte
-    @property
-    def _nringlet(self):
-        # **TODO: Change back-end to use long instead of uint64_t
-        return int(self._info.nringlet)
-    @property
-    def _data_ptr(self):
-        return self._info.data
+        byte_offset = self._byte_offset
+        assert(byte_offset % self._frame_nbyte == 0)
+        return byte_offset // self._frame_nbyte
     @property
     def nframe(self) -> int:
-        size_bytes = self._size_bytes
-        assert(size_bytes % self.sequence.tensor['frame_nbyte'] == 0)
-        nframe  = size_bytes // self.sequence.tensor['frame_nbyte']
-        return nframe
+        assert(self._size_bytes % self._frame_nbyte == 0)
+        return self._nframe
     @property
     def shape(self) -> Union[List[int],Tuple[int]]:
-        shape = (self._sequence.tensor['ringlet_shape'] +
-                 [self.nframe] +
-                 self._sequence.tensor['frame_shape'])
-        return shape
+        # Note: The geometry cannot change for the lifetime of the span, so
+        #         shape and strides are only built on first access
+        if self._shape is None:
+            self._shape = tuple(self._sequence.tensor.ringlet_shape +
+                                [self.nframe] +
+                                self._sequence.tensor.frame_shape)
+        return self._shape
     @property
-    def strides(self) -> List[int]:
-        tensor = self._sequence.tensor
-        strides = [tensor['dtype_nbyte']]
-        for dim in reversed(tensor['frame_shape']):
-            strides.append(dim * strides[-1])
-        if len(tensor['ringlet_shape']) > 0:
-            strides.append(self._stride_bytes) # First ringlet dimension
-        for dim in reversed(tensor['ringlet_shape'][1:]):
-            strides.append(dim * strides[-1])
-        strides = list(reversed(strides))
-        return strides
+    def strides(self) -> Union[List[int],Tuple[int]]:
+        if self._strides is None:
+            tensor = self._sequence.tensor
+            strides = tensor.frame_strides
+            if len(tensor.ringlet_shape) > 0:
+                # Note: The first ringlet dimension is strided by the span
+                strides = _accumulate_strides(self._stride_bytes,
+                                              tensor.ringlet_shape[1:]) + strides
+            self._strides = strides
+        return self._strides
     @property
     def dtype(self) -> Union[str,np.dtype]:
-        return self._sequence.tensor['dtype']
+        return self._sequence.tensor.dtype
     @property
     def data(self) -> ndarray:
-
-        # TODO: This function used to be super slow due to pyclibrary calls
-        #         Check whether it still is!
-
         if self._data is not None:
             return self._data
-        data_ptr = self._data_ptr
-
-        space = self.ring.space
         # **TODO: Need to integrate support for endianness and conjugatedness
         #         Also need support in headers for units of the actual values,
         #           in addition to the axis scales.
-        data_array = ndarray(space=space,
-                             shape=self.shape,
-                             strides=self.strides,
-                             buffer=data_ptr,
-                             dtype=self.dtype)
-        data_array.flags['WRITEABLE'] = self.writeable
-        
-        return data_array
+        # Note: The span layout is already known here, so the array is
+        #         wrapped directly rather than via the general ndarray()
+        tensor = self._sequence.tensor
+        self._data = _wrap_address(self._data_ptr, self.ring.space,
+                                   self.shape, self.strides,
+                                   tensor.dtype, tensor.dtype_np,
+                                   readonly=not self.writeable)
+        return self._data
 
 class WriteSpan(SpanBase):
     def __init__(self,
@@ -455,10 +643,10 @@ class WriteSpan(SpanBase):
                  nframe: int,
                  nonblocking: bool=False):
         SpanBase.__init__(self, ring, sequence, writeable=True)
-        nbyte = nframe * self._sequence.tensor['frame_nbyte']
+        nbyte = nframe * self._sequence.tensor.frame_nbyte
         self.obj = _bf.BFwspan()
-        _check(_bf.bfRingSpanReserve(self.obj, ring.obj, nbyte, nonblocking))
-        self._set_base_obj(self.obj)
+        _bfRingSpanReserve(self.obj, ring.obj, nbyte, nonblocking)
+        self._cache_info()
         # Note: We default to 0 instead of nframe so that we don't accidentally
         #         commit bogus data if a block throws an exception.
         self.commit_nframe = 0
@@ -472,32 +660,55 @@ class WriteSpan(SpanBase):
     def __exit__(self, type, value, tb):
         self.close()
     def close(self) -> None:
-        commit_nbyte = self.commit_nframe * self._sequence.tensor['frame_nbyte']
-        _check(_bf.bfRingSpanCommit(self.obj, commit_nbyte))
+        commit_nbyte = self.commit_nframe * self._sequence.tensor.frame_nbyte
+        _bfRingSpanCommit(self.obj, commit_nbyte)
+        self._data = None
 
 class ReadSpan(SpanBase):
     def __init__(self, sequence: ReadSequence, frame_offset: int, nframe: int):
         SpanBase.__init__(self, sequence.ring, sequence, writeable=False)
         tensor = sequence.tensor
         self.obj = _bf.BFrspan()
-        _check(_bf.bfRingSpanAcquire(
+        _bfRingSpanAcquire(
             self.obj,
             sequence.obj,
-            frame_offset * tensor['frame_nbyte'],
-            nframe * tensor['frame_nbyte']))
-        self._set_base_obj(self.obj)
+            frame_offset * tensor.frame_nbyte,
+            nframe * tensor.frame_nbyte)
+        self._cache_info()
         self.nframe_skipped = min(self.frame_offset - frame_offset, nframe)
         self.requested_frame_offset = frame_offset
     @property
     def nframe_overwritten(self) -> int:
-        nbyte_overwritten = ctypes.c_ulong()
-        _check(_bf.bfRingSpanGetSizeOverwritten(self.obj, nbyte_overwritten))
-        nbyte_overwritten = nbyte_overwritten.value
-        assert(nbyte_overwritten  % self.frame_nbyte == 0)
-        return nbyte_overwritten // self.frame_nbyte
+        nbyte_overwritten = _bfRingSpanGetSizeOverwritten(self.obj)
+        assert(nbyte_overwritten % self._frame_nbyte == 0)
+        return nbyte_overwritten // self._frame_nbyte
     def __enter__(self):
         return self
     def __exit__(self, type, value, tb):
         self.release()
     def release(self) -> None:
-        _check(_bf.bfRingSpanRelease(self.obj))
+        _bfRingSpanRelease(self.obj)
+        self._data = None
+
+class _IteratedReadSpan(ReadSpan):
+    """ReadSpan acquired (and later released) by a span iterator, as yielded
+    by ReadSequence.read.  It is only valid until the next one is requested."""
+    def __init__(self, sequence: ReadSequence, it: _bf.BFrspaniter,
+                 frame_offset: int, nframe: int):
+        SpanBase.__init__(self, sequence.ring, sequence, writeable=False)
+        self._iter = it
+        self._obj = None
+        info = sequence._span_info
+        _bfRingSpanIteratorNext(it, info)
+        self._set_info(info)
+        self.nframe_skipped = min(self.frame_offset - frame_offset, nframe)
+        self.requested_frame_offset = frame_offset
+    @property
+    def obj(self) -> _bf.BFrspan:
+        if self._obj is None:
+            self._obj = _bf.BFrspan()
+            _bfRingSpanIteratorGetSpan(self._iter, self._obj)
+        return self._obj
+    def release(self) -> None:
+        # Note: The iterator releases the span when it acquires the next one
+        self._data = None
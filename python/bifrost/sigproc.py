@@ -55,7 +55,6 @@ data:          [time][pol][nbit] (General case: [time][if/pol][chan][nbit])
 import struct
 import warnings
 import numpy as np
-from collections import defaultdict
 import os
 
 from typing import IO, Optional
@@ -64,150 +63,183 @@ from bifrost import telemetry
 telemetry.track_module()
 
 #header parameter names which precede strings
-_STRING_VALUES = ['source_name',
-                  'rawdatafile']
+_STRING_VALUES = frozenset(['source_name',
+                            'rawdatafile'])
 #header parameter names which precede doubles
-_DOUBLE_VALUES = ['az_start',
-                  'za_start',
-                  'src_raj',
-                  'src_dej',
-                  'tstart',
-                  'tsamp',
-                  'period',
-                  'fch1',
-                  'foff',
-                  'refdm']
+_DOUBLE_VALUES = frozenset(['az_start',
+                            'za_start',
+                            'src_raj',
+                            'src_dej',
+                            'tstart',
+                            'tsamp',
+                            'period',
+                            'fch1',
+                            'foff',
+                            'refdm'])
 #header parameter names which precede integers
-_INTEGER_VALUES = ['nchans',
-                   'telescope_id',
-                   'machine_id',
-                   'data_type',
-                   'ibeam',
-                   'nbeams',
-                   'nbits',
-                   'barycentric',
-                   'pulsarcentric',
-                   'nbins',
-                   'nsamples',
-                   'nifs',
-                   'npuls']
+_INTEGER_VALUES = frozenset(['nchans',
+                             'telescope_id',
+                             'machine_id',
+                             'data_type',
+                             'ibeam',
+                             'nbeams',
+                             'nbits',
+                             'barycentric',
+                             'pulsarcentric',
+                             'nbins',
+                             'nsamples',
+                             'nifs',
+                             'npuls'])
 #this header parameter precedes a character
-_CHARACTER_VALUES = ['signed']
+_CHARACTER_VALUES = frozenset(['signed'])
 
 #the data_type parameter names' translation
-_DATA_TYPES = defaultdict(lambda: 'unknown',
-                          {0: 'raw data',
-                           1: 'filterbank',
-                           2: 'time series',
-                           3: 'pulse profile',
-                           4: 'amplitude spectrum',
-                           5: 'complex spectrum',
-                           6: 'dedispersed subbands'})
+_DATA_TYPES = {0: 'raw data',
+               1: 'filterbank',
+               2: 'time series',
+               3: 'pulse profile',
+               4: 'amplitude spectrum',
+               5: 'complex spectrum',
+               6: 'dedispersed subbands'}
 #the telescope_id parameter names' translation
-_TELESCOPES = defaultdict(lambda: 'unknown',
-                          {0:  'Fake',
-                           1:  'Arecibo',
-                           2:  'Ooty',
-                           3:  'Nancay',
-                           4:  'Parkes',
-                           5:  'Jodrell', # 'Lovell',
-                           6:  'GBT',
-                           7:  'GMRT',
-                           8:  'Effelsberg',
-                           9: 'Effelsberg LOFAR',
-                           11: 'Unknown',
-                           12: 'MWA',
-                           20: 'CHIME',
-                           52: 'LWA-OV',
-                           53: 'LWA-SV',
-                           64: 'MeerKAT',
-                           65: 'KAT-7',
-                           82: 'eMerlin'})
+_TELESCOPES = {0:  'Fake',
+               1:  'Arecibo',
+               2:  'Ooty',
+               3:  'Nancay',
+               4:  'Parkes',
+               5:  'Jodrell', # 'Lovell',
+               6:  'GBT',
+               7:  'GMRT',
+               8:  'Effelsberg',
+               9: 'Effelsberg LOFAR',
+               11: 'Unknown',
+               12: 'MWA',
+               20: 'CHIME',
+               52: 'LWA-OV',
+               53: 'LWA-SV',
+               64: 'MeerKAT',
+               65: 'KAT-7',
+               82: 'eMerlin'}
  
 
 #the machine_id parameter names' translation
-_MACHINES = defaultdict(lambda: 'unknown',
-                        {0:  'FAKE',
-                         1:  'PSPM',
-                         2:  'WAPP',
-                         3:  'AOFTM',
-                         4:  'BPP',
-                         5:  'OOTY',
-                         6:  'SCAMP',
-                         7:  'GMRTFB',
-                         8:  'PULSAR2000',
-                         9:  'UNKNOWN',
-                         20: 'CHIME',
-                         52: 'LWA-DP',
-                         53: 'LWA-ADP'})
+_MACHINES = {0:  'FAKE',
+             1:  'PSPM',
+             2:  'WAPP',
+             3:  'AOFTM',
+             4:  'BPP',
+             5:  'OOTY',
+             6:  'SCAMP',
+             7:  'GMRTFB',
+             8:  'PULSAR2000',
+             9:  'UNKNOWN',
+             20: 'CHIME',
+             52: 'LWA-DP',
+             53: 'LWA-ADP'}
 
-def _header_write_string(file_object, key):
-    """Writes a single key name to the header,
+#precompiled formats for the header length prefixes and values
+_INT_STRUCT = struct.Struct('=i')
+_DOUBLE_STRUCT = struct.Struct('=d')
+_CHARACTER_STRUCT = struct.Struct('=b')
+#header parameter names mapped to the format of the value that follows
+_VALUE_STRUCTS = dict([(key, _DOUBLE_STRUCT) for key in _DOUBLE_VALUES] +
+                      [(key, _INT_STRUCT) for key in _INTEGER_VALUES] +
+                      [(key, _CHARACTER_STRUCT) for key in _CHARACTER_VALUES])
+#initial number of bytes to read when parsing a header
+_HEADER_READ_SIZE = 1024
+#length-prefixed string formats, keyed by string length
+_STRING_STRUCTS = {}
+
+def _string_struct(length):
+    """Returns the (cached) format for a length-prefixed string"""
+    string_struct = _STRING_STRUCTS.get(length)
+    if string_struct is None:
+        string_struct = struct.Struct('=i%is' % length)
+        _STRING_STRUCTS[length] = string_struct
+    return string_struct
+
+def _header_write_string(buf, key):
+    """Appends a single key name to the header buffer,
     which will be followed by the value"""
-    file_object.write(struct.pack('=i', len(key)))
-    file_object.write(key.encode())
+    key = key.encode()
+    buf += _string_struct(len(key)).pack(len(key), key)
 
-def _header_write_value(file_object, key, value):
-    """Writes a single parameter value to the header"""
+def _header_write_value(buf, key, value):
+    """Appends a single parameter value to the header buffer"""
     if isinstance(value, int):
-        fmt = '=i'
+        value_struct = _INT_STRUCT
     elif isinstance(value, float):
-        fmt = '=d'
+        value_struct = _DOUBLE_STRUCT
     elif key == 'signed':
-        fmt = '=b'
+        value_struct = _CHARACTER_STRUCT
     else:
         raise TypeError("Invalid value type")
-    _header_write_string(file_object, key)
-    file_object.write(struct.pack(fmt, value))
+    _header_write_string(buf, key)
+    buf += value_struct.pack(value)
 
-def _header_read_one_parameter(file_object):
-    """Reads a single key name from the header"""
-    length = struct.unpack('=i', file_object.read(4))[0]
+def _header_read_one_parameter(buf, offset):
+    """Reads a single key name from a header buffer, returning it
+    along with the offset just past it"""
+    length = _INT_STRUCT.unpack_from(buf, offset)[0]
+    offset += 4
     if length <= 0 or length >= 80:
-        return None
-    s = file_object.read(length)
-    return s.decode()
+        return None, offset
+    if offset + length > len(buf):
+        raise struct.error("header buffer too short")
+    s = buf[offset:offset + length]
+    return s.decode(), offset + length
 
 def _write_header(hdr, file_object):
     """write the entire header to the current position of a file"""
-    _header_write_string(file_object, "HEADER_START")
+    # Note: The header is built up in memory and written out in one go
+    buf = bytearray()
+    _header_write_string(buf, "HEADER_START")
     for key, val in hdr.items():
         if key in _STRING_VALUES:
-            _header_write_string(file_object, key)
-            _header_write_string(file_object, val)
+            _header_write_string(buf, key)
+            _header_write_string(buf, val)
         elif key in _DOUBLE_VALUES:
-            _header_write_value(file_object, key, float(val))
+            _header_write_value(buf, key, float(val))
         elif key in _INTEGER_VALUES:
-            _header_write_value(file_object, key, int(val))
+            _header_write_value(buf, key, int(val))
         elif key == "header_size":
             pass
         else:
             #raise KeyError(f"Unknown sigproc header key: {key}")
             warnings.warn(f"Unknown sigproc header key: '{key}'", RuntimeWarning)
-    _header_write_string(file_object, "HEADER_END")
+    _header_write_string(buf, "HEADER_END")
+    file_object.write(buf)
 
-def _read_header(file_object):
-    """Get the entire header from a file, and return as dictionary"""
-    file_object.seek(0)
-    if _header_read_one_parameter(file_object) != "HEADER_START":
-        file_object.seek(0)
+def _parse_header(buf):
+    """Parse an entire header held in buf, and return as dictionary"""
+    key, offset = _header_read_one_parameter(buf, 0)
+    if key != "HEADER_START":
         raise ValueError("Missing HEADER_START")
+    unpack_int = _INT_STRUCT.unpack_from
+    nbyte = len(buf)
     expecting = None
     header = {}
     while True:
-        key = _header_read_one_parameter(file_object)
+        # Note: This is _header_read_one_parameter inlined to save a call per key
+        length = unpack_int(buf, offset)[0]
+        offset += 4
+        if length <= 0 or length >= 80:
+            key = None
+        else:
+            if offset + length > nbyte:
+                raise struct.error("header buffer too short")
+            key = buf[offset:offset + length].decode()
+            offset += length
         if key is None:
             raise ValueError("Failed to parse header")
         elif key == 'HEADER_END':
             break
         elif key in _STRING_VALUES:
             expecting = key
-        elif key in _DOUBLE_VALUES:
-            header[key] = struct.unpack('=d', file_object.read(8))[0]
-        elif key in _INTEGER_VALUES:
-            header[key] = struct.unpack('=i', file_object.read(4))[0]
-        elif key in _CHARACTER_VALUES:
-            header[key] = struct.unpack('=b', file_object.read(1))[0]
+        elif key in _VALUE_STRUCTS:
+            value_struct = _VALUE_STRUCTS[key]
+            header[key] = value_struct.unpack_from(buf, offset)[0]
+            offset += value_struct.size
         elif expecting is not None:
             header[expecting] = key
             expecting = None
@@ -215,48 +247,48 @@ def _read_header(file_object):
             warnings.warn(f"Unknown header key: '{key}'", RuntimeWarning)
     if 'nchans' not in header:
         header['nchans'] = 1
-    header['header_size'] = file_object.tell()
+    header['header_size'] = offset
     return header
 
-def seek_to_data(file_object: IO[bytes]) -> None:
-    """Go the the location in the file where the data begins"""
+def _read_header(file_object):
+    """Get the entire header from a file, and return as dictionary"""
     file_object.seek(0)
-    if _header_read_one_parameter(file_object) != "HEADER_START":
-        file_object.seek(0)
-        raise ValueError("Missing HEADER_START")
-    expecting = None
-    header = {}
+    buf = file_object.read(_HEADER_READ_SIZE)
     while True:
-        key = _header_read_one_parameter(file_object)
-        if key is None:
-            raise ValueError("Failed to parse header")
-        elif key == 'HEADER_END':
+        try:
+            header = _parse_header(buf)
             break
-        elif key in _STRING_VALUES:
-            expecting = key
-        elif key in _DOUBLE_VALUES:
-            header[key] = struct.unpack('=d', file_object.read(8))[0]
-        elif key in _INTEGER_VALUES:
-            header[key] = struct.unpack('=i', file_object.read(4))[0]
-        elif key in _CHARACTER_VALUES:
-            header[key] = struct.unpack('=b', file_object.read(1))[0]
-        elif expecting is not None:
-            header[expecting] = key
-            expecting = None
-        else:
-            warnings.warn(f"Unknown header key: '{key}'", RuntimeWarning)
-    return
+        except struct.error:
+            # Note: The header is larger than what has been read so far
+            more = file_object.read(len(buf))
+            if not more:
+                raise
+            buf += more
+        except ValueError:
+            file_object.seek(0)
+            raise
+    file_object.seek(header['header_size'])
+    return header
+
+def seek_to_data(file_object: IO[bytes]) -> None:
+    """Go the the location in the file where the data begins"""
+    _read_header(file_object)
 
 def pack(data: np.ndarray, nbit: int) -> np.ndarray:
     """downgrade data from 8bits to nbits (per value)"""
-    data = data.flatten()
+    data = data.ravel()
     if 8 % nbit != 0:
         raise ValueError("unpack: nbit must divide into 8")
     if data.dtype not in (np.uint8, np.int8):
         raise TypeError("unpack: dtype must be 8-bit")
-    outdata = np.zeros(data.size // (8 // nbit)).astype('uint8')
-    for index in range(1, 8 // nbit):
-        outdata += data[index::8 // nbit] // (2**nbit)**index
+    pack_factor = 8 // nbit
+    # Note: Values are taken from the high bits (as returned by unpack) and
+    #         packed least-significant-bit-first to match unpack
+    nvalue = data.size - data.size % pack_factor
+    data = data[:nvalue].view(np.uint8).reshape(-1, pack_factor) >> (8 - nbit)
+    outdata = data[:, 0].copy()
+    for index in range(1, pack_factor):
+        outdata |= data[:, index] << (index * nbit)
     return outdata
 
 def _write_data(data: np.ndarray, nbit: int, file_object: IO[bytes]):
@@ -266,6 +298,16 @@ def _write_data(data: np.ndarray, nbit: int, file_object: IO[bytes]):
         data = pack(data, nbit)
     data.tofile(file_object)
 
+def _build_unpack1_table():
+    """Builds a table of the 1-bit unpacked values of every possible byte,
+    each shifted into the high bit of its output byte, as 64-bit words"""
+    packed = np.arange(256, dtype=np.uint8)
+    values = np.empty((256, 8), dtype=np.uint8)
+    for index in range(8):
+        values[:, index] = ((packed >> index) & 1) << 7
+    return values.view(np.uint64).ravel()
+_UNPACK1_TABLE = _build_unpack1_table()
+
 # TODO: Move this elsewhere?
 def unpack(data: np.ndarray, nbit: int) -> np.ndarray:
     """upgrade data from nbits to 8bits"""
@@ -275,27 +317,27 @@ def unpack(data: np.ndarray, nbit: int) -> np.ndarray:
         raise ValueError("unpack: nbit must divide into 8")
     if data.dtype not in (np.uint8, np.int8):
         raise TypeError("unpack: dtype must be 8-bit")
+    # Note: The bit-spreading is done in place on a single upcast copy so
+    #         that the masked intermediates reuse the same buffer
     if nbit == 8:
         return data
     elif nbit == 4:
         # Note: This technique assumes LSB-first ordering
-        tmpdata = data.astype(np.int16)
-        tmpdata = (tmpdata | (tmpdata <<  8)) & 0x0F0F
-        tmpdata = tmpdata << 4 # Shift into high bits to avoid needing to sign extend
-        updata = tmpdata
+        updata = data.view(np.uint8).astype(np.int16)
+        updata |= updata << 4
+        updata &= 0x0F0F
+        updata <<= 4 # Shift into high bits to avoid needing to sign extend
     elif nbit == 2:
-        tmpdata = data.astype(np.int32)
-        tmpdata = (tmpdata | (tmpdata << 16)) & 0x000F000F
-        tmpdata = (tmpdata | (tmpdata <<  8)) & 0x03030303
-        tmpdata = tmpdata << 6 # Shift into high bits to avoid needing to sign extend
-        updata = tmpdata
+        updata = data.view(np.uint8).astype(np.int32)
+        updata |= updata << 12
+        updata &= 0x000F000F
+        updata |= updata << 6
+        updata &= 0x03030303
+        updata <<= 6 # Shift into high bits to avoid needing to sign extend
     elif nbit == 1:
-        tmpdata = data.astype(np.int64)
-        tmpdata = (tmpdata | (tmpdata << 32)) & 0x0000000F0000000F
-        tmpdata = (tmpdata | (tmpdata << 16)) & 0x0003000300030003
-        tmpdata = (tmpdata | (tmpdata <<  8)) & 0x0101010101010101
-        tmpdata = tmpdata << 7 # Shift into high bits to avoid needing to sign extend
-        updata = tmpdata
+        # Note: A single gather of 8 output bytes per input byte is faster
+        #         than the three spreading stages needed for 1-bit data
+        updata = np.take(_UNPACK1_TABLE, data.view(np.uint8))
     return updata.view(data.dtype)
 
 class SigprocSettings(object):
@@ -333,6 +375,15 @@ class SigprocFile(SigprocSettings):
         self.file_object = None
         self.mode = ''
         self.data = np.array([])
+    @property
+    def data(self) -> np.ndarray:
+        """the locally stored data"""
+        return self._data
+    @data.setter
+    def data(self, value: np.ndarray) -> None:
+        self._data = value
+        # Note: append_data grows _data inside this over-allocated buffer
+        self._data_buffer = None
     def open(self, filename: str, mode: str) -> "SigprocFile":
         """open the filename, and read the header and data from it"""
         if 'b' not in mode:
@@ -353,10 +404,9 @@ class SigprocFile(SigprocSettings):
         self.close()
     def _find_nframe_from_file(self):
         self.read_header()
-        curpos = self.file_object.tell()
-        self.file_object.seek(0, 2) # Seek to end of file
+        file_size = os.fstat(self.file_object.fileno()).st_size
         frame_bits = self.header['nifs'] * self.header['nchans'] * self.header['nbits']
-        nframe = (self.file_object.tell() - curpos) * 8 // frame_bits
+        nframe = (file_size - self.header['header_size']) * 8 // frame_bits
         return nframe
     def get_nframe(self) -> int:
         """calculate the number of frames from the data"""
@@ -373,7 +423,9 @@ class SigprocFile(SigprocSettings):
     def read_data(self, start: Optional[int]=None, end: Optional[int]=None) -> np.ndarray:
         """read data from file and store it locally"""
         nframe = self._find_nframe_from_file()
-        seek_to_data(self.file_object)
+        # Note: The header has just been parsed, so there is no need to go
+        #         through seek_to_data and parse it again
+        self.file_object.seek(self.header['header_size'])
         read_start = 0
         end_read = nframe * self.nifs * self.nchans
         if start is not None:
@@ -408,9 +460,19 @@ class SigprocFile(SigprocSettings):
         if any(character in self.mode for character in 'w+a'):
             _write_data(input_data, self.nbits, self.file_object)
         if self.data.size > 0:
-            self.data = np.append(self.data.flatten(), input_data.flatten())
+            nframe = self.get_nframe()
+            dtype = np.result_type(self.data, input_data)
         else:
-            self.data = input_data.flatten()
-        nframe = self.get_nframe()
-        frame_shape = (nframe, self.nifs, self.nchans)
-        self.data = np.reshape(self.data, frame_shape)
+            nframe = 0
+            dtype = input_data.dtype
+        # Note: The buffer grows geometrically so that repeated appends do
+        #         not copy all of the previously appended data every time
+        buf = self._data_buffer
+        if buf is None or buf.shape[0] < nframe + input_frames \
+           or buf.shape[1:] != input_shape[1:] or buf.dtype != dtype:
+            capacity = max(2 * nframe, nframe + input_frames)
+            buf = np.empty((capacity,) + input_shape[1:], dtype=dtype)
+            buf[:nframe] = np.reshape(self.data, (nframe,) + input_shape[1:])
+        buf[nframe:nframe + input_frames] = input_data
+        self.data = buf[:nframe + input_frames]
+        self._data_buffer = buf
@@ -53,170 +53,210 @@ data:          [time][pol][nbit] (General case: [time][if/pol][chan][nbit])
 # See here for details of the different data formats:
 #   https://github.com/SixByNine/sigproc
 
+import os
 import struct
 import warnings
 import numpy as np
-from collections import defaultdict
 
 from typing import Any, Dict, IO, Optional
 
 from bifrost import telemetry
 telemetry.track_module()
 
-_string_values = ['source_name',
-                  'rawdatafile']
-_double_values = ['az_start',
-                  'za_start',
-                  'src_raj',
-                  'src_dej',
-                  'tstart',
-                  'tsamp',
-                  'period',
-                  'fch1',
-                  'foff',
-                  'refdm']
-_integer_values = ['nchans',
-                   'telescope_id',
-                   'machine_id',
-                   'data_type',
-                   'ibeam',
-                   'nbeams',
-                   'nbits',
-                   'barycentric',
-                   'pulsarcentric',
-                   'nbins',
-                   'nsamples',
-                   'nifs',
-                   'npuls']
-_character_values = ['signed']
+_string_values = frozenset(['source_name',
+                            'rawdatafile'])
+_double_values = frozenset(['az_start',
+                            'za_start',
+                            'src_raj',
+                            'src_dej',
+                            'tstart',
+                            'tsamp',
+                            'period',
+                            'fch1',
+                            'foff',
+                            'refdm'])
+_integer_values = frozenset(['nchans',
+                             'telescope_id',
+                             'machine_id',
+                             'data_type',
+                             'ibeam',
+                             'nbeams',
+                             'nbits',
+                             'barycentric',
+                             'pulsarcentric',
+                             'nbins',
+                             'nsamples',
+                             'nifs',
+                             'npuls'])
+_character_values = frozenset(['signed'])
 
 # Note: 1, 2 and 6 are basically the same thing:
 # nchan=1 &&  refdm => time series
 # nchan>1 &&  refdm => dedispersed time series
 # nchan>1 && !refdm => filterbank
 #   So, only 'pulse profile' requires special handling (and note that it's not a streaming format)
-_data_types = defaultdict(lambda: 'unknown',
-                          {0: 'raw data',
-                           1: 'filterbank',            # [time,pol,chan]
-                           2: 'time series',           # [time,pol] (refdm)
-                           3: 'pulse profile',         # [pol,chan,bin] (nbins, period, optional npuls)
-                           4: 'amplitude spectrum',    # ???
-                           5: 'complex spectrum',      # ???
-                           6: 'dedispersed subbands'}) # [time,pol,subband] (refdm; basically part-way between filterbank and time-series)
-_telescopes = defaultdict(lambda: 'unknown',
-                          {0:  'Fake',
-                           1:  'Arecibo',
-                           2:  'Ooty',
-                           3:  'Nancay',
-                           4:  'Parkes',  # TODO: Should be 7?
-                           5:  'Jodrell', # 'Lovell',
-                           6:  'GBT',
-                           7:  'GMRT',
-                           8:  'Effelsberg',
-                           9:  'Effelsberg LOFAR',
-                           11: 'Unknown',
-                           12: 'MWA',
-                           20: 'CHIME',
-                           10: 'UTR-2',
-                           11: 'LOFAR',
-                           52: 'LWA-OV',
-                           53: 'LWA-SV',
-                           64: 'MeerKAT',
-                           65: 'KAT-7',
-                           82: 'eMerlin'})
-_machines   = defaultdict(lambda: 'unknown',
-                          {0:  'FAKE',
-                           1:  'PSPM',
-                           2:  'WAPP',
-                           3:  'AOFTM',
-                           4:  'BPP', # aka BCPM1
-                           5:  'OOTY', # TODO: Should be 3?
-                           6:  'SCAMP',
-                           7:  'GMRTFB', # aka GBT Pulsar Spigot, SPIGOT
-                           8:  'PULSAR2000',
-                           9:  'UNKNOWN',
-                           20: 'CHIME',
-                           11: 'BG/P',
-                           12: "PDEV",
-                           20: 'GUPPI',
-                           52: 'LWA-DP',
-                           53: 'LWA-ADP'})
+_data_types = {0: 'raw data',
+               1: 'filterbank',            # [time,pol,chan]
+               2: 'time series',           # [time,pol] (refdm)
+               3: 'pulse profile',         # [pol,chan,bin] (nbins, period, optional npuls)
+               4: 'amplitude spectrum',    # ???
+               5: 'complex spectrum',      # ???
+               6: 'dedispersed subbands'}  # [time,pol,subband] (refdm; basically part-way between filterbank and time-series)
+_telescopes = {0:  'Fake',
+               1:  'Arecibo',
+               2:  'Ooty',
+               3:  'Nancay',
+               4:  'Parkes',  # TODO: Should be 7?
+               5:  'Jodrell', # 'Lovell',
+               6:  'GBT',
+               7:  'GMRT',
+               8:  'Effelsberg',
+               9:  'Effelsberg LOFAR',
+               11: 'Unknown',
+               12: 'MWA',
+               20: 'CHIME',
+               10: 'UTR-2',
+               11: 'LOFAR',
+               52: 'LWA-OV',
+               53: 'LWA-SV',
+               64: 'MeerKAT',
+               65: 'KAT-7',
+               82: 'eMerlin'}
+_machines   = {0:  'FAKE',
+               1:  'PSPM',
+               2:  'WAPP',
+               3:  'AOFTM',
+               4:  'BPP', # aka BCPM1
+               5:  'OOTY', # TODO: Should be 3?
+               6:  'SCAMP',
+               7:  'GMRTFB', # aka GBT Pulsar Spigot, SPIGOT
+               8:  'PULSAR2000',
+               9:  'UNKNOWN',
+               20: 'CHIME',
+               11: 'BG/P',
+               12: "PDEV",
+               20: 'GUPPI',
+               52: 'LWA-DP',
+               53: 'LWA-ADP'}
+
+# Header values that have a name translation when printed
+_named_values = {'data_type':    _data_types,
+                 'telescope_id': _telescopes,
+                 'machine_id':   _machines}
+
+_int_struct = struct.Struct('=i')
+_double_struct = struct.Struct('=d')
+_character_struct = struct.Struct('=b')
+# Header parameter names mapped to the format of the value that follows
+_value_structs = dict([(key, _double_struct) for key in _double_values] +
+                      [(key, _int_struct) for key in _integer_values] +
+                      [(key, _character_struct) for key in _character_values])
+# Initial number of bytes to read when parsing a header
+_header_read_size = 1024
+# Length-prefixed string formats, keyed by string length
+_string_structs = {}
 
 def id2telescope(id_: int) -> str:
-    return _telescopes[id_]
+    return _telescopes.get(id_, 'unknown')
 def telescope2id(name: str) -> int:
     # TODO: Would be better to use a pre-made reverse lookup dict
     return list(_telescopes.keys())[list(_telescopes.values()).index(name)]
 def id2machine(id_: int) -> str:
-    return _machines[id_]
+    return _machines.get(id_, 'unknown')
 def machine2id(name: str) -> int:
     # TODO: Would be better to use a pre-made reverse lookup dict
     return list(_machines.keys())[list(_machines.values()).index(name)]
 
-def _header_write_string(f, key):
-    f.write(struct.pack('=i', len(key)))
-    f.write(key.encode())
-def _header_write(f, key, value, fmt=None):
-    if fmt is not None:
+def _format_header_value(key, val):
+    if key in _named_values:
+        return f"{val} ({_named_values[key].get(val, 'unknown')})"
+    return val
+
+def _string_struct(length):
+    string_struct = _string_structs.get(length)
+    if string_struct is None:
+        string_struct = struct.Struct('=i%is' % length)
+        _string_structs[length] = string_struct
+    return string_struct
+def _header_write_string(buf, key):
+    key = key.encode()
+    buf += _string_struct(len(key)).pack(len(key), key)
+def _header_write(buf, key, value, value_struct=None):
+    if value_struct is not None:
         pass
     elif isinstance(value, int):
-        fmt = '=i'
+        value_struct = _int_struct
     elif isinstance(value, float):
-        fmt = '=d'
+        value_struct = _double_struct
     #elif key == 'signed':
-    #    fmt = '=b'
+    #    value_struct = _character_struct
     else:
         raise TypeError("Invalid value type")
-    _header_write_string(f, key)
-    f.write(struct.pack(fmt, value))
+    _header_write_string(buf, key)
+    buf += value_struct.pack(value)
 
-def _header_read(f):
-    length = struct.unpack('=i', f.read(4))[0]
+def _header_read(buf, offset):
+    length = _int_struct.unpack_from(buf, offset)[0]
+    offset += 4
     if length < 0 or length >= 80:
-        return None
-    s = f.read(length)
-    return s.decode()
+        return None, offset
+    if offset + length > len(buf):
+        raise struct.error("header buffer too short")
+    s = buf[offset:offset + length]
+    return s.decode(), offset + length
 
 def write_header(hdr: Dict[str,Any], f: IO[bytes]):
-    _header_write_string(f, "HEADER_START")
+    # Note: The header is built up in memory and written out in one go
+    buf = bytearray()
+    _header_write_string(buf, "HEADER_START")
     for key, val in hdr.items():
         if val is None:
             # Do not write keys with no value
             continue
         if key in _string_values:
-            _header_write_string(f, key)
-            _header_write_string(f, val)
+            _header_write_string(buf, key)
+            _header_write_string(buf, val)
         elif key in _double_values:
-            _header_write(f, key, float(val))
+            _header_write(buf, key, float(val))
         elif key in _integer_values:
-            _header_write(f, key, int(val))
+            _header_write(buf, key, int(val))
         elif key in _character_values:
-            _header_write(f, key, int(val), fmt='=b')
+            _header_write(buf, key, int(val), value_struct=_character_struct)
         else:
             #raise KeyError(f"Unknown sigproc header key: {key}")
             warnings.warn(f"Unknown sigproc header key: '{key}'", RuntimeWarning)
-    _header_write_string(f, "HEADER_END")
+    _header_write_string(buf, "HEADER_END")
+    f.write(buf)
 
-def _read_header(f):
-    if _header_read(f) != "HEADER_START":
-        #f.seek(0)
+def _parse_header(buf):
+    key, offset = _header_read(buf, 0)
+    if key != "HEADER_START":
         raise ValueError("Missing HEADER_START")
+    unpack_int = _int_struct.unpack_from
+    nbyte = len(buf)
     expecting = None
     header = {}
     while True:
-        key = _header_read(f)
+        # Note: This is _header_read inlined to save a call per key
+        length = unpack_int(buf, offset)[0]
+        offset += 4
+        if length < 0 or length >= 80:
+            key = None
+        else:
+            if offset + length > nbyte:
+                raise struct.error("header buffer too short")
+            key = buf[offset:offset + length].decode()
+            offset += length
         if key is None:
             raise ValueError("Failed to parse header")
         elif key == 'HEADER_END':
             break
         elif key in _string_values:
             expecting = key
-        elif key in _double_values:
-            header[key] = struct.unpack('=d', f.read(8))[0]
-        elif key in _integer_values:
-            header[key] = struct.unpack('=i', f.read(4))[0]
-        elif key in _character_values:
-            header[key] = struct.unpack('=b', f.read(1))[0]
+        elif key in _value_structs:
+            value_struct = _value_structs[key]
+            header[key] = value_struct.unpack_from(buf, offset)[0]
+            offset += value_struct.size
         elif expecting is not None:
             header[expecting] = key
             expecting = None
@@ -224,7 +264,26 @@ def _read_header(f):
             warnings.warn(f"Unknown header key: '{key}'", RuntimeWarning)
     if 'nchans' not in header:
         header['nchans'] = 1
-    header['header_size'] = f.tell()
+    header['header_size'] = offset
+    return header
+
+def _read_header(f):
+    # Note: The header is parsed from one buffered read rather than with a
+    #         read() per key; the file is left positioned at the data
+    start = f.tell()
+    buf = f.read(_header_read_size)
+    while True:
+        try:
+            header = _parse_header(buf)
+            break
+        except struct.error:
+            # The header is larger than what has been read so far
+            more = f.read(len(buf))
+            if not more:
+                raise
+            buf += more
+    header['header_size'] += start
+    f.seek(header['header_size'])
     #frame_bits = header['nifs'] * header['nchans'] * header['nbits']
     #if 'nsamples' not in header or header['nsamples'] == 0:
     #    f.seek(0, 2) # Seek to end of file
@@ -232,6 +291,39 @@ def _read_header(f):
     #    f.seek(header['header_size'], 0) # Seek back to end of header
     return header
 
+def _unpack_table(nbit, dtype):
+    """Builds a table of the unpacked values of every possible packed byte,
+    with each entry stored as one (8 // nbit)-byte word"""
+    pack_factor = 8 // nbit
+    packed = np.arange(256, dtype=np.uint8)
+    values = np.empty((256, pack_factor), dtype=np.uint8)
+    for i in range(pack_factor):
+        # Note: This technique assumes least-significant-bit-first ordering
+        values[:, i] = (packed >> (i * nbit)) << (8 - nbit)
+    # Shift back down from the high bits to induce sign-extension
+    values = values.view(dtype) >> (8 - nbit)
+    word_dtype = {1: np.uint64, 2: np.uint32, 4: np.uint16}[nbit]
+    return values.view(word_dtype).ravel()
+# Note: Unpacking is a single gather from these tables, which replaces the
+#         shift/OR/mask stages and their temporaries
+_unpack_tables = {(nbit, np.dtype(dtype)): _unpack_table(nbit, dtype)
+                  for nbit in (1, 2, 4)
+                  for dtype in (np.uint8, np.int8)}
+def _unpack_from_table(data, nbit):
+    table = _unpack_tables[(nbit, data.dtype)]
+    return np.take(table, data.view(np.uint8)).view(data.dtype)
+def _unpack4(data):
+    return _unpack_from_table(data, 4)
+def _unpack2(data):
+    return _unpack_from_table(data, 2)
+def _unpack1(data):
+    return _unpack_from_table(data, 1)
+# Note: These skip unpack's argument checks, so SigprocFile binds the one it
+#         needs when the file is opened
+_unpackers = {1: _unpack1,
+              2: _unpack2,
+              4: _unpack4}
+
 # TODO: Move this elsewhere?
 def unpack(data: np.ndarray, nbit: int) -> np.ndarray:
     if nbit > 8:
@@ -242,38 +334,23 @@ def unpack(data: np.ndarray, nbit: int) -> np.ndarray:
         raise TypeError("unpack: dtype must be 8-bit")
     if nbit == 8:
         return data
-    elif nbit == 4:
-        # Note: This technique assumes least-significant-bit-first ordering
-        x = data.astype(np.int16)
-        x = (x | (x <<  4)) & 0x0F0F
-        x = x << 4 # Shift into high bits to induce sign-extension
-        return x.view(data.dtype) >> 4
-    elif nbit == 2:
-        x = data.astype(np.int32)
-        x = (x | (x << 12)) & 0x000F000F
-        x = (x | (x <<  6)) & 0x03030303
-        x = x << 6 # Shift into high bits to induce sign-extension
-        return x.view(data.dtype) >> 6
-    elif nbit == 1:
-        x = data.astype(np.int64)
-        x = (x | (x << 28)) & 0x0000000F0000000F
-        x = (x | (x << 14)) & 0x0003000300030003
-        x = (x | (x <<  7)) & 0x0101010101010101
-        x = x << 7 # Shift into high bits to induce sign-extension
-        return x.view(data.dtype) >> 7
-    else:
+    try:
+        return _unpackers[nbit](data)
+    except KeyError:
         raise ValueError(f"unpack: unexpected nbit! ({nbit})")
 
 # TODO: Add support for writing
 #       Add support for data_type != filterbank
 class SigprocFile(object):
     def __init__(self, filename: Optional[str]=None):
+        self._str_cache = None
         if filename is not None:
             self.open(filename)
     def open(self, filename: str) -> "SigprocFile":
         # Note: If nbit < 8, pack_factor = 8 // nbit and the last dimension
         #         is divided by pack_factor, with dtype set to uint8.
         self.f = open(filename, 'rb')
+        self._frame_map_cache = None
         self.header = _read_header(self.f)
         self.header_size = self.header['header_size']
         self.frame_shape = (self.header['nifs'], self.header['nchans'])
@@ -308,6 +385,9 @@ class SigprocFile(object):
             #                    self.frame_shape[1]//pack_factor)
             ##self.frame_shape[-1] //= pack_factor
             self.dtype = None
+            if self.nbit not in _unpackers:
+                raise ValueError(f"Unsupported nbit ({self.nbit})")
+            self._unpack = _unpackers[self.nbit]
         self.frame_size = self.frame_shape[0] * self.frame_shape[1]
         #self.frame_nbyte = self.frame_size*self.dtype().itemsize
         self.buf = np.empty(4096, np.uint8)
@@ -315,6 +395,7 @@ class SigprocFile(object):
         self.frame_nbyte = self.frame_nbit // 8
         return self
     def close(self) -> None:
+        self._frame_map_cache = None
         self.f.close()
     def __enter__(self):
         return self
@@ -333,13 +414,12 @@ class SigprocFile(object):
         return self.header['tsamp'] * self.nframe()
     def nframe(self) -> int:
         if 'nsamples' not in self.header or self.header['nsamples'] == 0:
-            curpos = self.f.tell()
-            self.f.seek(0, 2) # Seek to end of file
+            # Note: fstat gives the file size without moving the file position
+            file_size = os.fstat(self.f.fileno()).st_size
             frame_bits = self.header['nifs'] * self.header['nchans'] * self.header['nbits']
-            nframe = ((self.f.tell() - self.header['header_size']) *
+            nframe = ((file_size - self.header['header_size']) *
                       8 // frame_bits)
             self.header['nsamples'] = nframe
-            self.f.seek(curpos, 0) # Seek back to where we were
         return self.header['nsamples']
     def read(self, nframe_or_start: int, end: Optional[int]=None) -> np.ndarray:
         if end is not None:
@@ -359,47 +439,86 @@ class SigprocFile(object):
                                  f"(idx={nframe}, nbit={self.nbit})")
             #data = np.fromfile(self.f, np.uint8,
             #                   nframe * self.frame_size * self.nbit // 8)
-            #requested_nbyte = nframe * self.frame_nbyte
-            requested_nbyte = nframe * self.frame_nbyte * self.nbit // 8
+            # Note: frame_nbit already includes nbit, and the buffer contents
+            #         are overwritten, so it is not resized with np.resize
+            requested_nbyte = nframe * self.frame_nbit // 8
             if self.buf.nbytes != requested_nbyte:
-                self.buf = np.resize(self.buf, requested_nbyte)
+                self.buf = np.empty(requested_nbyte, np.uint8)
             nbyte = self.f.readinto(self.buf)
             if nbyte * 8 % self.frame_nbit != 0:
                 raise IOError("File read returned incomplete frame (truncated file?)")
-            if nbyte < self.buf.nbytes:
-                self.buf = np.resize(self.buf, nbyte)
-            nframe = nbyte * 8 // (self.frame_size * self.nbit)
-            data = self.buf
-            data = unpack(data, self.nbit)
+            nframe = nbyte * 8 // self.frame_nbit
+            data = self.buf[:nbyte]
+            data = self._unpack(data)
             data = data.reshape((nframe,) + self.frame_shape)
         else:
-            data = np.fromfile(self.f, self.dtype, nframe * self.frame_size)
-            if data.size % self.frame_size != 0:
+            # Note: Reading straight into the output avoids the extra
+            #         allocation and file position syncing of np.fromfile
+            data = np.empty((nframe,) + self.frame_shape, self.dtype)
+            nbyte = self.f.readinto(data)
+            if nbyte % self.frame_nbyte != 0:
                 raise IOError("File read returned incomplete frame (truncated file?)")
-            nframe = data.size // self.frame_size
+            nframe = nbyte // self.frame_nbyte
+            data = data[:nframe]
         data = data.reshape((nframe,) + self.frame_shape)
         return data
+    def read_channels_f32(self, nframe_or_start: int, end: Optional[int]=None) -> np.ndarray:
+        """Reads frames as for read(), but returns them as float32 with time
+        as the fastest-varying axis, i.e., with shape (nifs, nchans, nframe)"""
+        data = self.read(nframe_or_start, end)
+        out = np.empty(self.frame_shape + (data.shape[0],), np.float32)
+        # Note: A single transposing copy does both the conversion and the
+        #         reordering, leaving each channel contiguous in time
+        np.copyto(out, data.transpose(1, 2, 0))
+        return out
     def readinto(self, buf: Any) -> int:
         """Fills buf with raw bytes straight from the file"""
         return self.f.readinto(buf)
     def __str__(self):
-        hmod = self.header.copy()
-        d = hmod['data_type']
-        hmod['data_type'] = f"{d} ({_data_types[d]})"
-        t = hmod['telescope_id']
-        hmod['telescope_id'] = f"{t} ({_telescopes[t]})"
-        m = hmod['machine_id']
-        hmod['machine_id']   = f"{m} ({_machines[m]})"
-        return '\n'.join(['% 16s: %s' % (key, val)
-                          for (key, val) in hmod.items()])
+        # Note: The text is cached against a snapshot of the header rather
+        #         than invalidated on assignment because the header can also
+        #         be changed in place (e.g., by nframe())
+        snapshot = tuple(self.header.items())
+        if self._str_cache is None or self._str_cache[0] != snapshot:
+            # Note: A list rather than a generator because str.join builds
+            #         one from its argument anyway
+            text = '\n'.join(['% 16s: %s' % (key, _format_header_value(key, val))
+                              for key, val in snapshot])
+            self._str_cache = (snapshot, text)
+        return self._str_cache[1]
+    def _frame_map(self) -> Optional[np.ndarray]:
+        """Returns a read-only memory map of all whole frames in the file,
+        or None if the data are packed or there are no frames"""
+        if self.nbit < 8:
+            return None
+        nbyte = os.fstat(self.f.fileno()).st_size - self.header_size
+        nframe = nbyte // self.frame_nbyte
+        frames = self._frame_map_cache
+        if frames is None or frames.shape[0] != nframe:
+            # Note: The map is remade if the file has grown since it was made
+            if nframe <= 0:
+                return None
+            frames = np.asarray(np.memmap(self.f, dtype=self.dtype, mode='r',
+                                          offset=self.header_size,
+                                          shape=(nframe,) + self.frame_shape))
+            self._frame_map_cache = frames
+        return frames
     def __getitem__(self, key):
         if isinstance(key, type("")): # Header key lookup
             return self.header[key]
         elif isinstance(key, int): # Extract one time slice
+            # Note: Indexing is served as a view of the memory map when
+            #         possible, avoiding a seek, a read and a new array
+            frames = self._frame_map()
+            if frames is not None:
+                return frames[key]
             return self.read(key, key + 1)[0]
         elif isinstance(key, slice): # 1D slice
             start = key.start if key.start is not None else  0
             stop  = key.stop  if key.stop  is not None else -1
+            frames = self._frame_map()
+            if frames is not None:
+                return frames[start:None if stop == -1 else stop:key.step]
             data = self.read(start, stop)
             #data = self.read(stop) if start == 0 else \
             #       self.read(start, key.stop)
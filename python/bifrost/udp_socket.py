@@ -62,3 +62,9 @@ class UDPSocket(BifrostObject):
     @promisc.setter
     def promisc(self, state):
         _check( _bf.bfUdpSocketSetPromiscuous(self.obj, state) )
+    @property
+    def busy_poll(self):
+        return _get(_bf.bfUdpSocketGetBusyPoll, self.obj)
+    @busy_poll.setter
+    def busy_poll(self, usecs):
+        _check( _bf.bfUdpSocketSetBusyPoll(self.obj, usecs) )
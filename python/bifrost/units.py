@@ -25,16 +25,29 @@
 # (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
-import pint
-
 from typing import Union
 
 from bifrost import telemetry
 telemetry.track_module()
 
-ureg = pint.UnitRegistry()
+# Note: Importing pint and building its unit registry dominates the time
+#         taken to import bifrost, so both are deferred until first use
+_ureg = None
+def _get_ureg():
+    global _ureg
+    if _ureg is None:
+        import pint
+        _ureg = pint.UnitRegistry()
+    return _ureg
+
+def __getattr__(name):
+    if name == 'ureg':
+        return _get_ureg()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def convert_units(value: Union[int,float], old_units:str, new_units:str) -> Union[int,float]:
+    import pint
+    ureg = _get_ureg()
     old_quantity = value * ureg.parse_expression(old_units)
     try:
         new_quantity = old_quantity.to(new_units)
@@ -44,7 +57,7 @@ def convert_units(value: Union[int,float], old_units:str, new_units:str) -> Unio
 
 # TODO: May need something more flexible, like a Units wrapper class with __str__
 def transform_units(units: str, exponent: Union[int,float]) -> str:
-    old_quantity = ureg.parse_expression(units)
+    old_quantity = _get_ureg().parse_expression(units)
     new_quantity = old_quantity**exponent
     new_units_str = '{:P~}'.format(new_quantity.units)
     return new_units_str
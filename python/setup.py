@@ -28,21 +28,20 @@
 
 from setuptools import setup, Extension, find_packages
 import os
+import re
 import sys
+import ast
 import glob
 
 # Parse version file to extract __version__ value
 bifrost_version_file = 'bifrost/version/__init__.py'
+_VERSION_RE = re.compile(r'^__version__\s*=\s*(.+)$', re.M)
 try:
     with open(bifrost_version_file, 'r') as version_file:
-        for line in version_file:
-            line = line.strip()
-            if len(line) == 0 or line[0] == '#':
-                continue
-            if '__version__' in line:
-                __version__ = line.split('=', 1)[1].strip()
-                __version__ = ''.join([c for c in __version__
-                                       if c.isalnum() or c in ".-_"])
+        match = _VERSION_RE.search(version_file.read())
+    if match is None:
+        raise RuntimeError("Could not find __version__ in %s" % bifrost_version_file)
+    __version__ = ast.literal_eval(match.group(1).strip())
 except IOError:
     if 'clean' in sys.argv[1:]:
         sys.exit(0)
@@ -53,7 +52,7 @@ except IOError:
     raise
 
 # Build up a list of scripts to install
-scripts = glob.glob(os.path.join('..', 'tools', '*.py'))
+scripts = sorted(glob.iglob(os.path.join('..', 'tools', '*.py')))
 
 setup(name='bifrost',
       version=__version__,
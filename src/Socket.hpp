@@ -311,6 +311,25 @@ public:
 	}
 	void set_promiscuous(int state);
 	int get_promiscuous();
+	void set_busy_poll(int usecs) {
+#ifdef SO_BUSY_POLL
+		this->set_option(SO_BUSY_POLL, usecs);
+#ifdef SO_PREFER_BUSY_POLL
+		// Note: Best effort; only available on Linux >= 5.11
+		int prefer = (usecs > 0);
+		::setsockopt(_fd, SOL_SOCKET, SO_PREFER_BUSY_POLL, &prefer, sizeof(prefer));
+#endif
+#else
+		check_error(-1, "set busy poll: unsupported on this OS");
+#endif
+	}
+	int get_busy_poll() {
+#ifdef SO_BUSY_POLL
+		return this->get_option<int>(SO_BUSY_POLL);
+#else
+		return 0;
+#endif
+	}
 	
 private:
 	void open(sa_family_t family, int protocol=0);
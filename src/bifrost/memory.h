@@ -48,7 +48,17 @@ typedef enum BFspace_ {
 	BF_SPACE_CUDA_MANAGED = 4  // cudaMallocManaged
 } BFspace;
 
+typedef enum BFmallocflags_ {
+	BF_MALLOC_DEFAULT        = 0,
+	BF_MALLOC_WRITE_COMBINED = 1 << 0, // cuda_host only; fast H2D, slow host reads
+	BF_MALLOC_PORTABLE       = 1 << 1, // cuda_host only; pinned for all contexts
+	BF_MALLOC_PREFETCH       = 1 << 2, // cuda_managed only; prefetch to the device
+	BF_MALLOC_PREFAULT       = 1 << 3, // system only; touch every page up front
+	BF_MALLOC_HUGEPAGE       = 1 << 4  // system only; back with huge pages if possible
+} BFmallocflags;
+
 BFstatus bfMalloc(void** ptr, BFsize size, BFspace space);
+BFstatus bfMallocEx(void** ptr, BFsize size, BFspace space, unsigned flags);
 BFstatus bfFree(void* ptr, BFspace space);
 
 BFstatus bfGetSpace(const void* ptr, BFspace* space);
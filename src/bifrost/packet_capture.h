@@ -98,6 +98,10 @@ typedef enum BFpacketcapture_status_ {
         BF_CAPTURE_ERROR
 } BFpacketcapture_status;
 
+// Called by bfPacketCaptureRun for every status other than
+//   BF_CAPTURE_CONTINUED; returning non-zero stops the run
+typedef int (*BFpacketcapture_event_callback)(BFpacketcapture_status, void*);
+
 BFstatus bfDiskReaderCreate(BFpacketcapture* obj,
                             const char*      format,
                             int              fd,
@@ -130,6 +134,17 @@ BFstatus bfUdpSnifferCreate(BFpacketcapture* obj,
                             BFsize           slot_ntime,
                             BFpacketcapture_callback sequence_callback,
                             int              core);
+BFstatus bfUdpMmapSnifferCreate(BFpacketcapture* obj,
+                                const char*      format,
+                                int              fd,
+                                BFring           ring,
+                                BFsize           nsrc,
+                                BFsize           src0,
+                                BFsize           max_payload_size,
+                                BFsize           buffer_ntime,
+                                BFsize           slot_ntime,
+                                BFpacketcapture_callback sequence_callback,
+                                int              core);
 BFstatus bfUdpVerbsCaptureCreate(BFpacketcapture* obj,
                                  const char*      format,
                                  int              fd,
@@ -144,6 +159,22 @@ BFstatus bfUdpVerbsCaptureCreate(BFpacketcapture* obj,
 BFstatus bfPacketCaptureDestroy(BFpacketcapture obj);
 BFstatus bfPacketCaptureRecv(BFpacketcapture         obj,
                              BFpacketcapture_status* result);
+// Note: data/nbyte must have room for 2 entries; on return they describe
+//         the *nspan spans committed to the ring by this call, which remain
+//         valid until the next receive
+BFstatus bfPacketCaptureRecvView(BFpacketcapture         obj,
+                                 const void**            data,
+                                 BFsize*                 nbyte,
+                                 int*                    nspan,
+                                 BFpacketcapture_status* result);
+// Note: Calls recv until *stop becomes non-zero, on_event returns non-zero,
+//         or the capture is interrupted or fails; *result is the last status
+//       If on_event is NULL the run also stops once the data end
+BFstatus bfPacketCaptureRun(BFpacketcapture                obj,
+                            BFpacketcapture_event_callback on_event,
+                            void*                          user,
+                            int const*                     stop,
+                            BFpacketcapture_status*        result);
 BFstatus bfPacketCaptureFlush(BFpacketcapture obj);
 BFstatus bfPacketCaptureSeek(BFpacketcapture obj,
                              BFoffset        offset,
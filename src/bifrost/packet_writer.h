@@ -62,6 +62,10 @@ BFstatus bfUdpTransmitCreate(BFpacketwriter* obj,
                              const char*     format,
                              int             fd,
                              int             core);
+BFstatus bfUdpZcTransmitCreate(BFpacketwriter* obj,
+                               const char*     format,
+                               int             fd,
+                               int             core);
 BFstatus bfUdpVerbsTransmitCreate(BFpacketwriter* obj,
                                   const char*     format,
                                   int             fd,
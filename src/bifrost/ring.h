@@ -67,6 +67,7 @@ typedef struct BFwsequence_impl*   BFwsequence;
 typedef struct BFspan_impl*        BFspan;
 typedef struct BFrspan_impl*       BFrspan;
 typedef struct BFwspan_impl*       BFwspan;
+typedef struct BFrspaniter_impl*   BFrspaniter;
 
 // TODO: bfCudaEnabled
 
@@ -104,6 +105,25 @@ BFstatus bfRingSetAffinity(BFring ring, int  core);
  *        set to a value of -1.
  */
 BFstatus bfRingGetAffinity(BFring ring, int* core);
+/*! \p bfRingSetNumaNode causes subsequent ring memory allocations to be bound
+ *       to the specified NUMA node, overriding any node implied by
+ *       \p bfRingSetAffinity.
+ * \param node Index of the desired NUMA node. A value of -1 reverts to
+ *          using the node of the core set by \p bfRingSetAffinity (if any).
+ */
+BFstatus bfRingSetNumaNode(BFring ring, int  node);
+/*! \p bfRingGetNumaNode returns the NUMA node specified by a prior call to
+ *     \p bfRingSetNumaNode, or -1 if it has not been called.
+ */
+BFstatus bfRingGetNumaNode(BFring ring, int* node);
+/*! \p bfRingSetMallocFlags sets the BF_MALLOC_* hints used for subsequent
+ *       ring memory allocations (see \p bfMallocEx).
+ * \param flags Bitwise OR of BFmallocflags values. BF_MALLOC_WRITE_COMBINED
+ *          suits cuda_host rings that are written by the CPU and only read
+ *          by the GPU, as CPU reads from such memory are very slow.
+ */
+BFstatus bfRingSetMallocFlags(BFring ring, unsigned  flags);
+BFstatus bfRingGetMallocFlags(BFring ring, unsigned* flags);
 
 //BFsize   bfRingGetNRinglet(BFring ring);
 // TODO: BFsize bfRingGetSizeBytes
@@ -196,6 +216,17 @@ BFstatus bfRingSpanReserve(BFwspan* span,
                            BFbool   nonblocking);
 BFstatus bfRingSpanCommit(BFwspan span,
                           BFsize  size);
+/*! \p bfRingSequenceWrite copies \p size bytes per ringlet from \p data
+ *       into the ring, reserving and committing one span per \p gulp_size
+ *       bytes.
+ * \param data Source buffer laid out as [nringlet][size].
+ * \param space Memory space of \p data.
+ */
+BFstatus bfRingSequenceWrite(BFwsequence sequence,
+                             void const* data,
+                             BFspace     space,
+                             BFsize      size,
+                             BFsize      gulp_size);
 // Read span
 BFstatus bfRingSpanAcquire(BFrspan*    span,
                            BFrsequence sequence,
@@ -226,6 +257,25 @@ typedef struct BFspan_info_ {
 } BFspan_info;
 BFstatus bfRingSpanGetInfo(BFspan span, BFspan_info* span_info);
 
+// Read span iterator
+/*! \p bfRingSpanIteratorNext releases the previously-acquired span (if any)
+ *       and acquires the next one, \p stride bytes further on, returning
+ *       its details in \p span_info. BF_STATUS_END_OF_DATA is returned once
+ *       the end of the sequence is reached.
+ */
+BFstatus bfRingSpanIteratorCreate(BFrspaniter* iter,
+                                  BFrsequence  sequence,
+                                  BFoffset     begin,
+                                  BFsize       size,
+                                  BFsize       stride);
+BFstatus bfRingSpanIteratorNext(BFrspaniter iter, BFspan_info* span_info);
+/*! \p bfRingSpanIteratorGetSpan returns the span most recently acquired by
+ *       \p bfRingSpanIteratorNext. The span remains owned by the iterator
+ *       and is only valid until the next call to \p bfRingSpanIteratorNext.
+ */
+BFstatus bfRingSpanIteratorGetSpan(BFrspaniter iter, BFrspan* span);
+BFstatus bfRingSpanIteratorDestroy(BFrspaniter iter);
+
 #ifdef __cplusplus
 } // extern "C"
 #endif
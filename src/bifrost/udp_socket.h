@@ -48,6 +48,8 @@ BFstatus bfUdpSocketSetTimeout(BFudpsocket obj, double secs);
 BFstatus bfUdpSocketGetTimeout(BFudpsocket obj, double* secs);
 BFstatus bfUdpSocketSetPromiscuous(BFudpsocket obj, int promisc);
 BFstatus bfUdpSocketGetPromiscuous(BFudpsocket obj, int* promisc);
+BFstatus bfUdpSocketSetBusyPoll(BFudpsocket obj, int usecs);
+BFstatus bfUdpSocketGetBusyPoll(BFudpsocket obj, int* usecs);
 BFstatus bfUdpSocketGetMTU(BFudpsocket obj, int* mtu);
 BFstatus bfUdpSocketGetFD(BFudpsocket obj, int* fd);
 
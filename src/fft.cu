@@ -44,6 +44,7 @@
 #include "ShapeIndexer.cuh"
 #include "ArrayIndexer.cuh"
 #include <thrust/device_vector.h>
+#include <cstring>
 #include <thrust/host_vector.h>
 #if defined(BF_GPU_EXP_PINNED_ALLOC) && BF_GPU_EXP_PINNED_ALLOC
 #include <thrust/system/cuda/experimental/pinned_allocator.h>
@@ -66,6 +67,8 @@ class BFfft_impl {
 	std::vector<int> _axes;
 	bool             _do_fftshift;
 	bool             _using_load_callback;
+	bool             _callback_data_valid;
+	CallbackData     _callback_data;
 	thrust::device_vector<char> _dv_tmp_storage;
 	thrust::device_vector<CallbackData> _dv_callback_data;
 #if defined(BF_GPU_EXP_PINNED_ALLOC) && BF_GPU_EXP_PINNED_ALLOC
@@ -99,7 +102,7 @@ public:
 	                 size_t         tmp_storage_size);
 };
 
-BFfft_impl::BFfft_impl() {
+BFfft_impl::BFfft_impl() : _callback_data_valid(false) {
 	BF_CHECK_CUFFT_EXCEPTION( cufftCreate(&_handle) );
 }
 BFfft_impl::~BFfft_impl() {
@@ -242,6 +245,7 @@ BFstatus BFfft_impl::init(BFarray const* in,
 	_do_fftshift = do_fftshift;
 	_dv_callback_data.resize(1);
 	_hv_callback_data.resize(1);
+	_callback_data_valid = false;
 	CallbackData* callback_data = thrust::raw_pointer_cast(&_dv_callback_data[0]);
 	BF_CHECK( set_fft_load_callback(in->dtype, _nbit, _handle, _do_fftshift,
 	                                callback_data, &_using_load_callback) );
@@ -270,12 +274,11 @@ BFstatus BFfft_impl::execute_impl(BFarray const* in,
 	void* idata = in->data;
 	void* odata = out->data;
 	
-	// TODO: This sync is needed to ensure that the previous h2d copy of
-	//         h_callback_data has finished before we overwrite it.
-	//         We could potentially use a CUDA event as a lighter-weight
-	//           solution.
-	cudaStreamSynchronize(g_cuda_stream);
-	CallbackData* h_callback_data = thrust::raw_pointer_cast(&_hv_callback_data[0]);
+	// Note: Built on the stack (zeroed so that it can be compared bytewise)
+	//         and only uploaded when it differs from what is on the device
+	CallbackData callback_data;
+	::memset(&callback_data, 0, sizeof(CallbackData));
+	CallbackData* h_callback_data = &callback_data;
 	// WAR for CUFFT insisting that pointer be aligned to sizeof(cufftComplex)
 	int alignment = (_nbit == 32 ?
 	                 sizeof(cufftComplex) :
@@ -303,9 +306,23 @@ BFstatus BFfft_impl::execute_impl(BFarray const* in,
 			 in->shape[_axes[d]]);
 	}
 	
-	CallbackData* d_callback_data = thrust::raw_pointer_cast(&_dv_callback_data[0]);
-	cudaMemcpyAsync(d_callback_data, h_callback_data, sizeof(CallbackData),
-	                cudaMemcpyHostToDevice, g_cuda_stream);
+	if( _using_load_callback &&
+	    (!_callback_data_valid ||
+	     ::memcmp(&_callback_data, h_callback_data, sizeof(CallbackData)) != 0) ) {
+		// TODO: This sync is needed to ensure that the previous h2d copy of
+		//         the pinned callback data has finished before we overwrite
+		//         it. We could potentially use a CUDA event as a
+		//         lighter-weight solution.
+		cudaStreamSynchronize(g_cuda_stream);
+		_hv_callback_data[0] = callback_data;
+		CallbackData* d_callback_data = thrust::raw_pointer_cast(&_dv_callback_data[0]);
+		cudaMemcpyAsync(d_callback_data,
+		                thrust::raw_pointer_cast(&_hv_callback_data[0]),
+		                sizeof(CallbackData),
+		                cudaMemcpyHostToDevice, g_cuda_stream);
+		_callback_data        = callback_data;
+		_callback_data_valid  = true;
+	}
 	
 	BF_ASSERT((uintptr_t)idata % alignment == 0, BF_STATUS_UNSUPPORTED_STRIDE);
 	BF_ASSERT((uintptr_t)odata % alignment == 0, BF_STATUS_UNSUPPORTED_STRIDE);
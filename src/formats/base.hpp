@@ -36,7 +36,7 @@
 
 #if defined BF_SSE_ENABLED && BF_SSE_ENABLED
 
-#include <xmmintrin.h>
+#include <emmintrin.h>   // SSE2, includes xmmintrin.h
 
 #endif
 
@@ -87,6 +87,40 @@ struct __attribute__((aligned(64))) aligned512_type {
 	uint8_t data[64];
 };
 
+// Copies n contiguous 256-bit elements into (32-byte aligned) ring memory
+//   using non-temporal stores where available.  Captured data are not read
+//   again before the span is committed, so there is no point in pulling the
+//   destination into the cache.
+inline void stream_copy256(aligned256_type*         __restrict__ dst,
+                           const unaligned256_type* __restrict__ src,
+                           int                                   n) {
+	int i = 0;
+#if defined BF_AVX512_ENABLED && BF_AVX512_ENABLED
+	if( ((uintptr_t)dst & 63) == 0 ) {
+		for( ; i+2<=n; i+=2 ) {
+			__m512i mtemp = _mm512_loadu_si512(reinterpret_cast<const void*>(src+i));
+			_mm512_stream_si512(reinterpret_cast<__m512i*>(dst+i), mtemp);
+		}
+	}
+#endif
+	for( ; i<n; ++i ) {
+#if defined BF_AVX_ENABLED && BF_AVX_ENABLED
+		__m256i mtemp = _mm256_loadu_si256(reinterpret_cast<const __m256i*>(src+i));
+		_mm256_stream_si256(reinterpret_cast<__m256i*>(dst+i), mtemp);
+#elif defined BF_SSE_ENABLED && BF_SSE_ENABLED
+		const __m128i* dsrc = reinterpret_cast<const __m128i*>(src+i);
+		__m128i*       ddst = reinterpret_cast<__m128i*>(dst+i);
+		_mm_stream_si128(ddst,   _mm_loadu_si128(dsrc));
+		_mm_stream_si128(ddst+1, _mm_loadu_si128(dsrc+1));
+#else
+		::memcpy(&dst[i], &src[i], sizeof(aligned256_type));
+#endif
+	}
+#if defined BF_SSE_ENABLED && BF_SSE_ENABLED
+	_mm_sfence();
+#endif
+}
+
 
 struct PacketDesc {
 	uint64_t       seq;
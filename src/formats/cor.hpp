@@ -132,11 +132,7 @@ public:
 	    int bl_server = pkt->src;
 	    int nchan = pkt->nchan;
 	    
-	    int chan = 0;
-	    for( ; chan<nchan; ++chan ) {
-		    ::memcpy(&out[bl_server*nchan + chan], &in[chan], sizeof(otype));
-		    //out[bl_server*nchan + chan] = in[chan];
-	    }
+	    stream_copy256(&out[bl_server*nchan], in, nchan);
     }
 	
     inline void blank_out_source(uint8_t* data,
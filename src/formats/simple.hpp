@@ -87,11 +87,8 @@ public:
 	    itype const* __restrict__ in  = (itype const*)pkt->payload_ptr;
 	    otype*       __restrict__ out = (otype*      )&obufs[obuf_idx][obuf_offset];
 	
-	    int chan = 0;
 	    int nelem = 256;
-	    for( ; chan<nelem; ++chan ) {
-		    ::memcpy(&out[chan],&in[chan], sizeof(otype));
-	    }
+	    stream_copy256(out, in, nelem);
     }
 
     inline void blank_out_source(uint8_t* data,
@@ -65,15 +65,27 @@
 #include "ShapeIndexer.cuh"
 #include "trace.hpp"
 #include "Complex.hpp"
+#include "EnvVars.hpp"
 
 class BFlinalg_impl {
 	cublasHandle_t _cublas;
+	bool           _tf32;
 	// No copy-assign
 	BFlinalg_impl(BFlinalg_impl const& );
 	BFlinalg_impl& operator=(BFlinalg_impl const& );
 public:
-	BFlinalg_impl() {
+	BFlinalg_impl() : _tf32(false) {
 		BF_CHECK_CUBLAS_EXCEPTION(cublasCreate(&_cublas));
+#if defined(CUDA_VERSION) && CUDA_VERSION >= 11000
+		// Note: TF32 tensor cores trade mantissa bits (10 vs. 23) for
+		//         throughput, so they must be explicitly enabled
+		if( EnvVars::get("BF_LINALG_TF32", "0") != "0" &&
+		    get_cuda_device_cc() >= 80 ) {
+			_tf32 = true;
+			BF_CHECK_CUBLAS_EXCEPTION(
+				cublasSetMathMode(_cublas, CUBLAS_TF32_TENSOR_OP_MATH));
+		}
+#endif
 	}
 	~BFlinalg_impl() {
 		if( _cublas ) {
@@ -81,6 +93,7 @@ public:
 		}
 	}
 	cublasHandle_t cublas() const { return _cublas; }
+	bool           tf32()   const { return _tf32; }
 };
 
 BFstatus bfMatMul_aa_exec_nobatch(BFlinalg    handle,
@@ -435,6 +448,21 @@ BFstatus bfMatMul_ab_exec_nobatch(BFlinalg    handle,
 		BF_ASSERT(c_type == BF_DTYPE_CF32, BF_STATUS_UNSUPPORTED_DTYPE);
 		cuComplex alpha_cf = make_cuComplex(alpha, 0);
 		cuComplex beta_cf  = make_cuComplex(beta,  0);
+#if defined(CUDA_VERSION) && CUDA_VERSION >= 11000
+		if( handle->tf32() ) {
+			// Note: Cgemm3m does not use tensor cores, so go through GemmEx
+			BF_CHECK_CUBLAS(cublasGemmEx(handle->cublas(), trans_a, trans_b,
+			                             m, n, k,
+			                             &alpha_cf,
+			                             a_data, CUDA_C_32F, a_stride,
+			                             b_data, CUDA_C_32F, b_stride,
+			                             &beta_cf,
+			                             c_data, CUDA_C_32F, c_stride,
+			                             CUBLAS_COMPUTE_32F_FAST_TF32,
+			                             CUBLAS_GEMM_DEFAULT_TENSOR_OP));
+			break;
+		}
+#endif
 		if( get_cuda_device_cc() >= 50 ) {
 			BF_CHECK_CUBLAS(cublasCgemm3m(handle->cublas(), trans_a, trans_b,
 			                              m, n, k,
@@ -579,11 +607,31 @@ BFstatus bfMatMul_ab_exec_batch(BFlinalg    handle,
                                                            c_batchstride,
 							   nbatch,
                                                            CUBLAS_COMPUTE_32F,										                                           CUBLAS_GEMM_DEFAULT));
+		break;
 	}
         case BF_DTYPE_CF32: {
 		BF_ASSERT(c_type == BF_DTYPE_CF32, BF_STATUS_UNSUPPORTED_DTYPE);
 		const cuComplex   alpha_cf = make_cuComplex(alpha, 0);
 		const cuComplex   beta_cf  = make_cuComplex(beta,  0);
+#if defined(CUDA_VERSION) && CUDA_VERSION >= 11000
+		if( handle->tf32() ) {
+			BF_CHECK_CUBLAS(cublasGemmStridedBatchedEx(handle->cublas(),
+			                                           trans_a, trans_b,
+			                                           m, n, k,
+			                                           &alpha_cf,
+			                                           a_data, CUDA_C_32F,
+			                                           a_stride, a_batchstride,
+			                                           b_data, CUDA_C_32F,
+			                                           b_stride, b_batchstride,
+			                                           &beta_cf,
+			                                           c_data, CUDA_C_32F,
+			                                           c_stride, c_batchstride,
+			                                           nbatch,
+			                                           CUBLAS_COMPUTE_32F_FAST_TF32,
+			                                           CUBLAS_GEMM_DEFAULT_TENSOR_OP));
+			break;
+		}
+#endif
 		BF_CHECK_CUBLAS(cublasCgemm3mStridedBatched(handle->cublas(), 
                                                            trans_a, 
                                                            trans_b,
@@ -677,8 +725,9 @@ BFstatus bfMatMul_ab_exec(BFlinalg    handle,
 			stream));
 	}
 	
-	// TODO: Why does ci8 yield nans when we go into batched execution?
-	if( nbatch > 12 &&  a_type != BF_DTYPE_CI8 ) {
+	// Note: Above this many matrices a single strided-batched call beats
+	//         launching one gemm per matrix on child streams
+	if( nbatch > 12 ) {
 			BF_CHECK( bfMatMul_ab_exec_batch(handle, 
                                                          stream,
 							 trans_a, 
@@ -34,6 +34,7 @@
 #include "trace.hpp"
 
 #include <cstdlib> // For posix_memalign
+#include <sys/mman.h> // For madvise
 #include <cstring> // For memcpy
 #include <iostream>
 
@@ -42,6 +43,10 @@ static_assert(BF_IS_POW2(BF_ALIGNMENT), "BF_ALIGNMENT must be a power of 2");
 #undef BF_IS_POW2
 //static_assert(BF_ALIGNMENT >= 8,        "BF_ALIGNMENT must be >= 8");
 
+// Note: The x86-64 transparent huge page size; BF_MALLOC_HUGEPAGE allocations
+//         are aligned to this so that they can be fully backed by huge pages
+static const BFsize BF_HUGEPAGE_SIZE = 2*1024*1024;
+
 BFstatus bfGetSpace(const void* ptr, BFspace* space) {
 	BF_ASSERT(ptr, BF_STATUS_INVALID_POINTER);
 #if !defined BF_CUDA_ENABLED || !BF_CUDA_ENABLED
@@ -108,15 +113,35 @@ const char* bfGetSpaceString(BFspace space) {
 }
 
 BFstatus bfMalloc(void** ptr, BFsize size, BFspace space) {
+	return bfMallocEx(ptr, size, space, BF_MALLOC_DEFAULT);
+}
+BFstatus bfMallocEx(void** ptr, BFsize size, BFspace space, unsigned flags) {
 	//printf("bfMalloc(%p, %lu, %i)\n", ptr, size, space);
 	void* data;
 	switch( space ) {
 	case BF_SPACE_SYSTEM: {
-		//data = std::aligned_alloc(std::max(BF_ALIGNMENT,8), size);
-		int err = ::posix_memalign((void**)&data, std::max(BF_ALIGNMENT,8), size);
+		BFsize alignment = std::max(BF_ALIGNMENT,8);
+#ifdef MADV_HUGEPAGE
+		bool hugepage = (flags & BF_MALLOC_HUGEPAGE) && size >= BF_HUGEPAGE_SIZE;
+		if( hugepage ) {
+			alignment = std::max(alignment, BF_HUGEPAGE_SIZE);
+		}
+#endif
+		//data = std::aligned_alloc(alignment, size);
+		int err = ::posix_memalign((void**)&data, alignment, size);
 		BF_ASSERT(!err, BF_STATUS_MEM_ALLOC_FAILED);
 		//if( err ) data = nullptr;
 		//printf("bfMalloc --> %p\n", data);
+#ifdef MADV_HUGEPAGE
+		// Note: This is only a hint (e.g., THP may be disabled), so failures
+		//         are ignored. It must precede the first touch of the pages.
+		if( hugepage ) {
+			::madvise(data, size, MADV_HUGEPAGE);
+		}
+#endif
+		if( flags & BF_MALLOC_PREFAULT ) {
+			prefault_pages(data, size);
+		}
 		break;
 	}
 #if defined BF_CUDA_ENABLED && BF_CUDA_ENABLED
@@ -126,15 +151,33 @@ BFstatus bfMalloc(void** ptr, BFsize size, BFspace space) {
 		break;
 	}
 	case BF_SPACE_CUDA_HOST: {
-		unsigned flags = cudaHostAllocDefault;
-		BF_CHECK_CUDA(cudaHostAlloc((void**)&data, size, flags),
+		unsigned host_flags = cudaHostAllocDefault;
+		if( flags & BF_MALLOC_WRITE_COMBINED ) {
+			host_flags |= cudaHostAllocWriteCombined;
+		}
+		if( flags & BF_MALLOC_PORTABLE ) {
+			host_flags |= cudaHostAllocPortable;
+		}
+		BF_CHECK_CUDA(cudaHostAlloc((void**)&data, size, host_flags),
 		              BF_STATUS_MEM_ALLOC_FAILED);
 		break;
 	}
 	case BF_SPACE_CUDA_MANAGED: {
-		unsigned flags = cudaMemAttachGlobal;
-		BF_CHECK_CUDA(cudaMallocManaged((void**)&data, size, flags),
+		unsigned managed_flags = cudaMemAttachGlobal;
+		BF_CHECK_CUDA(cudaMallocManaged((void**)&data, size, managed_flags),
 		              BF_STATUS_MEM_ALLOC_FAILED);
+		if( flags & BF_MALLOC_PREFETCH ) {
+			// Note: This avoids page faults on first touch from the device.
+			//         It is only a hint, so failures (e.g., on devices
+			//         without concurrent managed access) are ignored.
+			int device;
+			if( cudaGetDevice(&device) != cudaSuccess ||
+			    cudaMemPrefetchAsync(data, size, device,
+			                         g_cuda_stream) != cudaSuccess ) {
+				// WAR to avoid the ignored failure showing up later
+				cudaGetLastError();
+			}
+		}
 		break;
 	}
 #endif
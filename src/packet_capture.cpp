@@ -371,6 +371,31 @@ BFstatus bfUdpSnifferCreate(BFpacketcapture* obj,
                                   BF_IO_SNIFFER);
 }
 
+BFstatus bfUdpMmapSnifferCreate(BFpacketcapture* obj,
+                                const char*      format,
+                                int              fd,
+                                BFring           ring,
+                                BFsize           nsrc,
+                                BFsize           src0,
+                                BFsize           max_payload_size,
+                                BFsize           buffer_ntime,
+                                BFsize           slot_ntime,
+                                BFpacketcapture_callback sequence_callback,
+                                int              core) {
+    return BFpacketcapture_create(obj,
+                                  format,
+                                  fd,
+                                  ring,
+                                  nsrc,
+                                  src0,
+                                  max_payload_size,
+                                  buffer_ntime,
+                                  slot_ntime,
+                                  sequence_callback,
+                                  core,
+                                  BF_IO_MMAP);
+}
+
 BFstatus bfUdpVerbsCaptureCreate(BFpacketcapture* obj,
                                  const char*      format,
                                  int              fd,
@@ -409,6 +434,56 @@ BFstatus bfPacketCaptureRecv(BFpacketcapture obj,
 	                   *result = BF_CAPTURE_ERROR);
 }
 
+BFstatus bfPacketCaptureRecvView(BFpacketcapture         obj,
+                                 const void**            data,
+                                 BFsize*                 nbyte,
+                                 int*                    nspan,
+                                 BFpacketcapture_status* result) {
+	BF_ASSERT(obj,    BF_STATUS_INVALID_HANDLE);
+	BF_ASSERT(data,   BF_STATUS_INVALID_POINTER);
+	BF_ASSERT(nbyte,  BF_STATUS_INVALID_POINTER);
+	BF_ASSERT(nspan,  BF_STATUS_INVALID_POINTER);
+	BF_ASSERT(result, BF_STATUS_INVALID_POINTER);
+	size_t size[2];
+	*nspan = 0;
+	BF_TRY_ELSE(*result = obj->recv_view(data, size, nspan),
+	            *result = BF_CAPTURE_ERROR);
+	for( int i=0; i<*nspan; ++i ) {
+		nbyte[i] = size[i];
+	}
+	return BF_STATUS_SUCCESS;
+}
+
+BFstatus bfPacketCaptureRun(BFpacketcapture                obj,
+                            BFpacketcapture_event_callback on_event,
+                            void*                          user,
+                            int const*                     stop,
+                            BFpacketcapture_status*        result) {
+	BF_ASSERT(obj,    BF_STATUS_INVALID_HANDLE);
+	BF_ASSERT(result, BF_STATUS_INVALID_POINTER);
+	BFpacketcapture_status status = BF_CAPTURE_NO_DATA;
+	// Note: *stop may be set from another thread, hence the atomic loads
+	while( !(stop && __atomic_load_n(stop, __ATOMIC_RELAXED)) ) {
+		BF_TRY_ELSE(status = obj->recv(),
+		            *result = BF_CAPTURE_ERROR);
+		if( status == BF_CAPTURE_INTERRUPTED || status == BF_CAPTURE_ERROR ) {
+			break;
+		}
+		if( status == BF_CAPTURE_CONTINUED ) {
+			continue;
+		}
+		if( on_event ) {
+			if( on_event(status, user) != 0 ) {
+				break;
+			}
+		} else if( status == BF_CAPTURE_ENDED ) {
+			break;
+		}
+	}
+	*result = status;
+	return BF_STATUS_SUCCESS;
+}
+
 BFstatus bfPacketCaptureFlush(BFpacketcapture obj) {
     BF_ASSERT(obj, BF_STATUS_INVALID_HANDLE);
     BF_TRY_RETURN(obj->flush());
@@ -40,11 +40,14 @@ using bifrost::ring::WriteSequence;
 #include "Socket.hpp"
 #include "formats/formats.hpp"
 #include "hw_locality.hpp"
+#include "utils.hpp"
 
 #include <arpa/inet.h>  // For ntohs
 #include <sys/socket.h> // For recvfrom
 
 #include <queue>
+#include <algorithm>
+#include <vector>
 #include <memory>
 #include <stdexcept>
 #include <cstdlib>      // For posix_memalign
@@ -52,6 +55,7 @@ using bifrost::ring::WriteSequence;
 #include <cstdint>
 
 #include <sys/types.h>
+#include <fcntl.h>      // For posix_fadvise
 #include <unistd.h>
 #include <fstream>
 #include <chrono>
@@ -168,16 +172,59 @@ public:
 };
 
 class DiskPacketReader : public PacketCaptureMethod {
+    // Note: Frames are read from the file in large chunks rather than with
+    //         one read() per frame
+    enum { CHUNK_SIZE = 4*1024*1024 };
+    AlignedBuffer<uint8_t> _chunk;
+    size_t                 _chunk_nvalid;
+    size_t                 _chunk_pos;
 public:
     DiskPacketReader(int fd, size_t pkt_size_max=9000, int core=-1)
-     : PacketCaptureMethod(fd, pkt_size_max, BF_IO_DISK, core) {}
+     : PacketCaptureMethod(fd, pkt_size_max, BF_IO_DISK, core),
+       _chunk(std::max(CHUNK_SIZE / pkt_size_max, (size_t)1)*pkt_size_max),
+       _chunk_nvalid(0), _chunk_pos(0) {
+#if defined __linux__ && __linux__
+        ::posix_fadvise(_fd, 0, 0, POSIX_FADV_SEQUENTIAL);
+#endif
+    }
     int recv_packet(uint8_t** pkt_ptr, int flags=0) {
-        *pkt_ptr = &_buf[0];
-        return ::read(_fd, &_buf[0], _buf.size());
+        size_t frame_size = _buf.size();
+        if( _chunk_nvalid - _chunk_pos < frame_size ) {
+            // Keep any partial frame and top up the chunk
+            size_t nleft = _chunk_nvalid - _chunk_pos;
+            ::memmove(&_chunk[0], &_chunk[_chunk_pos], nleft);
+            _chunk_pos    = 0;
+            _chunk_nvalid = nleft;
+            do {
+                ssize_t nread = ::read(_fd, &_chunk[_chunk_nvalid],
+                                       _chunk.size() - _chunk_nvalid);
+                if( nread < 0 && !_chunk_nvalid ) {
+                    return nread;
+                } else if( nread <= 0 ) {
+                    break;
+                }
+                _chunk_nvalid += nread;
+            } while( _chunk_nvalid < frame_size );
+        }
+        int nret = std::min(frame_size, _chunk_nvalid - _chunk_pos);
+        *pkt_ptr = &_chunk[_chunk_pos];
+        _chunk_pos += nret;
+        return nret;
     }
     inline const char* get_name() { return "disk_reader"; }
     inline BFoffset seek(BFoffset offset, BFiowhence whence=BF_WHENCE_CUR) {
-        return ::lseek64(_fd, offset, whence);
+        // Note: Positions are relative to the data handed out so far, not
+        //         to what has been read ahead into the chunk
+        int64_t nahead = _chunk_nvalid - _chunk_pos;
+        if( whence == BF_WHENCE_CUR && offset == 0 ) {
+            return ::lseek64(_fd, 0, SEEK_CUR) - nahead;
+        }
+        int64_t pos = offset;
+        if( whence == BF_WHENCE_CUR ) {
+            pos -= nahead;
+        }
+        _chunk_nvalid = _chunk_pos = 0;
+        return ::lseek64(_fd, pos, whence);
     }
 };
 
@@ -230,17 +277,53 @@ public:
 };
 #endif // BF_VMA_ENABLED
 
+#ifndef BF_UDP_RECV_BATCH
+#if defined __linux__ && __linux__
+// Note: Number of packets pulled from the socket per recvmmsg call
+#define BF_UDP_RECV_BATCH 32
+#else
+// Note: The macOS recvmmsg shim does not support MSG_WAITFORONE
+#define BF_UDP_RECV_BATCH 1
+#endif
+#endif
+
 class UDPPacketReceiver : public PacketCaptureMethod {
 #if BF_VMA_ENABLED
     VMAReceiver            _vma;
 #endif
+#if BF_UDP_RECV_BATCH > 1
+    size_t                 _batch_stride;
+    AlignedBuffer<uint8_t> _batch_buf;
+    std::vector<mmsghdr>   _msgs;
+    std::vector<iovec>     _iovs;
+    int                    _nbatch;
+    int                    _ibatch;
+#endif
 public:
     UDPPacketReceiver(int fd, size_t pkt_size_max=JUMBO_FRAME_SIZE, int core=-1)
         : PacketCaptureMethod(fd, pkt_size_max, BF_IO_UDP, core)
 #if BF_VMA_ENABLED
         , _vma(fd)
 #endif
-    {}
+#if BF_UDP_RECV_BATCH > 1
+        // Note: Each packet slot is kept aligned like _buf
+        , _batch_stride((pkt_size_max + _buf.alignment() - 1) /
+                        _buf.alignment() * _buf.alignment()),
+          _batch_buf(_batch_stride*BF_UDP_RECV_BATCH),
+          _msgs(BF_UDP_RECV_BATCH), _iovs(BF_UDP_RECV_BATCH),
+          _nbatch(0), _ibatch(0)
+#endif
+    {
+#if BF_UDP_RECV_BATCH > 1
+        ::memset(&_msgs[0], 0, sizeof(mmsghdr)*_msgs.size());
+        for( int i=0; i<BF_UDP_RECV_BATCH; ++i ) {
+            _iovs[i].iov_base = &_batch_buf[i*_batch_stride];
+            _iovs[i].iov_len  = _pkt_size_max;
+            _msgs[i].msg_hdr.msg_iov    = &_iovs[i];
+            _msgs[i].msg_hdr.msg_iovlen = 1;
+        }
+#endif
+    }
     inline int recv_packet(uint8_t** pkt_ptr, int flags=0) {
 
 #if BF_VMA_ENABLED
@@ -249,8 +332,27 @@ public:
             return _vma.recv_packet(&_buf[0], _buf.size(), pkt_ptr, flags);
         } else {
 #endif
+#if BF_UDP_RECV_BATCH > 1
+            // Note: Packets are received in batches to amortize the syscall
+            //         cost; MSG_WAITFORONE blocks (or times out) only until
+            //         the first packet of each batch arrives.  Returned
+            //         packets stay valid until the batch is used up.
+            if( _ibatch == _nbatch ) {
+                _ibatch = _nbatch = 0;
+                int nmsg = ::recvmmsg(_fd, &_msgs[0], _msgs.size(),
+                                      flags | MSG_WAITFORONE, 0);
+                if( nmsg <= 0 ) {
+                    return nmsg;
+                }
+                _nbatch = nmsg;
+            }
+            int i = _ibatch++;
+            *pkt_ptr = (uint8_t*)_iovs[i].iov_base;
+            return _msgs[i].msg_len;
+#else
             *pkt_ptr = &_buf[0];
             return ::recvfrom(_fd, &_buf[0], _buf.size(), flags, 0, 0);
+#endif
 #if BF_VMA_ENABLED
         }
 #endif
@@ -287,6 +389,131 @@ public:
     inline const char* get_name() { return "udp_sniffer"; }
 };
 
+#if defined __linux__ && __linux__
+#include <linux/if_packet.h>
+#include <sys/mman.h>
+#include <poll.h>
+
+// Note: This reads from a PACKET_RX_RING (TPACKET_V3) that the kernel fills
+//         directly, which avoids the per-packet copy and syscall of recvfrom.
+//         The socket must be a packet sniffing socket (see Socket::sniff).
+class UDPPacketMmapSniffer : public PacketCaptureMethod {
+    enum {
+        BLOCK_SIZE  = 4*1024*1024,
+        BLOCK_COUNT = 64,
+        FRAME_SIZE  = 2048,
+        RETIRE_MS   = 60
+    };
+    uint8_t*              _ring;
+    size_t                _ring_size;
+    int                   _iblock;
+    tpacket_block_desc*   _block;
+    tpacket3_hdr*         _frame;
+    uint32_t              _nframe_left;
+    inline tpacket_block_desc* get_block(int i) {
+        return (tpacket_block_desc*)(_ring + (size_t)i*BLOCK_SIZE);
+    }
+    inline void release_block() {
+        // Note: Hands the block back to the kernel
+        __sync_synchronize();
+        _block->hdr.bh1.block_status = TP_STATUS_KERNEL;
+        _block = 0;
+        _iblock = (_iblock + 1) % BLOCK_COUNT;
+    }
+    inline int wait_for_block() {
+        // Note: Honors the socket's receive timeout, like recvfrom does
+        timeval tv = {0, 0};
+        socklen_t tv_size = sizeof(tv);
+        int timeout_ms = -1;
+        if( ::getsockopt(_fd, SOL_SOCKET, SO_RCVTIMEO, &tv, &tv_size) == 0
+            && (tv.tv_sec || tv.tv_usec) ) {
+            timeout_ms = tv.tv_sec*1000 + tv.tv_usec/1000;
+        }
+        pollfd pfd;
+        pfd.fd      = _fd;
+        pfd.events  = POLLIN | POLLERR;
+        pfd.revents = 0;
+        int ret = ::poll(&pfd, 1, timeout_ms);
+        if( ret == 0 ) {
+            errno = EAGAIN;
+            return -1;
+        }
+        return ret;
+    }
+public:
+    UDPPacketMmapSniffer(int fd, size_t pkt_size_max=JUMBO_FRAME_SIZE, int core=-1)
+        : PacketCaptureMethod(fd, pkt_size_max, BF_IO_MMAP, core),
+          _ring(0), _ring_size((size_t)BLOCK_SIZE*BLOCK_COUNT), _iblock(0),
+          _block(0), _frame(0), _nframe_left(0) {
+        int version = TPACKET_V3;
+        if( ::setsockopt(_fd, SOL_PACKET, PACKET_VERSION,
+                         &version, sizeof(version)) < 0 ) {
+            throw std::runtime_error("Failed to set TPACKET_V3 on socket");
+        }
+        tpacket_req3 req;
+        ::memset(&req, 0, sizeof(req));
+        req.tp_block_size       = BLOCK_SIZE;
+        req.tp_block_nr         = BLOCK_COUNT;
+        req.tp_frame_size       = FRAME_SIZE;
+        req.tp_frame_nr         = (BLOCK_SIZE / FRAME_SIZE) * BLOCK_COUNT;
+        req.tp_retire_blk_tov   = RETIRE_MS;
+        if( ::setsockopt(_fd, SOL_PACKET, PACKET_RX_RING,
+                         &req, sizeof(req)) < 0 ) {
+            throw std::runtime_error("Failed to create packet RX ring");
+        }
+        void* ring = ::mmap(0, _ring_size, PROT_READ | PROT_WRITE,
+                            MAP_SHARED, _fd, 0);
+        if( ring == MAP_FAILED ) {
+            throw std::runtime_error("Failed to map packet RX ring");
+        }
+        _ring = (uint8_t*)ring;
+    }
+    ~UDPPacketMmapSniffer() {
+        if( _ring ) {
+            ::munmap(_ring, _ring_size);
+        }
+    }
+    inline int recv_packet(uint8_t** pkt_ptr, int flags=0) {
+        while( true ) {
+            if( !_nframe_left ) {
+                if( _block ) {
+                    this->release_block();
+                }
+                tpacket_block_desc* block = this->get_block(_iblock);
+                if( !(block->hdr.bh1.block_status & TP_STATUS_USER) ) {
+                    int ret = this->wait_for_block();
+                    if( ret < 0 ) {
+                        return ret;
+                    }
+                    continue;
+                }
+                __sync_synchronize();
+                _block       = block;
+                _nframe_left = block->hdr.bh1.num_pkts;
+                _frame       = (tpacket3_hdr*)((uint8_t*)block +
+                                               block->hdr.bh1.offset_to_first_pkt);
+                continue;
+            }
+            tpacket3_hdr* frame = _frame;
+            if( --_nframe_left ) {
+                _frame = (tpacket3_hdr*)((uint8_t*)_frame + _frame->tp_next_offset);
+            }
+            // Note: Skip anything that is not UDP (e.g., ICMP errors that
+            //         quote one of our packets) or is too short to hold the
+            //         IP+UDP headers
+            uint8_t* ip = (uint8_t*)frame + frame->tp_net;
+            int hdr_size = (ip[0] & 0x0F)*4 + 8;
+            if( frame->tp_snaplen <= (uint32_t)hdr_size || ip[9] != IPPROTO_UDP ) {
+                continue;
+            }
+            *pkt_ptr = ip + hdr_size;
+            return frame->tp_snaplen - hdr_size;
+        }
+    }
+    inline const char* get_name() { return "udp_mmap_sniffer"; }
+};
+#endif // __linux__
+
 #if defined BF_VERBS_ENABLED && BF_VERBS_ENABLED
 #include "ib_verbs.hpp"
 
@@ -488,6 +715,11 @@ private:
 	std::shared_ptr<WriteSequence>          _sequence;
 	size_t _ngood_bytes;
 	size_t _nmissing_bytes;
+	// Note: The spans committed by the current call to recv(), for
+	//         recv_view(); at most 2 bufs are open at once
+	const void* _commit_data[2];
+	size_t      _commit_size[2];
+	int         _ncommit;
 	
 	inline size_t bufsize(int payload_size=-1) {
 		if( payload_size == -1 ) {
@@ -528,6 +760,11 @@ private:
 		_nmissing_bytes += expected_bytes - _buf_ngood_bytes.front();
 		_buf_ngood_bytes.pop();
 		
+		if( _ncommit < 2 ) {
+			_commit_data[_ncommit] = _bufs.front()->data();
+			_commit_size[_ncommit] = _bufs.front()->size();
+			++_ncommit;
+		}
 		_bufs.front()->commit();
 		_bufs.pop();
 		_seq += _nseq_per_buf;
@@ -563,7 +800,7 @@ public:
 		  _seq(), _chan0(), _nchan(), _active(false),
 		  _ring(ring), _oring(_ring),
 		  // TODO: Add reset method for stats
-		  _ngood_bytes(0), _nmissing_bytes(0) {
+		  _ngood_bytes(0), _nmissing_bytes(0), _ncommit(0) {
         size_t contig_span  = this->bufsize(_capture->get_max_size());
 		// Note: 2 write bufs may be open for writing at one time
 		size_t total_span   = contig_span * 4;
@@ -604,6 +841,22 @@ public:
 		_oring.close();
 	}
 	BFpacketcapture_status recv();
+	// Like recv(), but also returns the (up to 2) spans committed to the
+	//   ring by this call, in order.  The data remain valid until the next
+	//   call.
+	inline BFpacketcapture_status recv_view(const void** data, size_t* size,
+	                                        int* nspan) {
+		BF_ASSERT_EXCEPTION(space_accessible_from(_ring.space(), BF_SPACE_SYSTEM),
+		                    BF_STATUS_UNSUPPORTED_SPACE);
+		_ncommit = 0;
+		BFpacketcapture_status ret = this->recv();
+		for( int i=0; i<_ncommit; ++i ) {
+			data[i] = _commit_data[i];
+			size[i] = _commit_size[i];
+		}
+		*nspan = _ncommit;
+		return ret;
+	}
 };
 
 class BFpacketcapture_simple_impl : public BFpacketcapture_impl {
@@ -1452,6 +1705,11 @@ BFstatus BFpacketcapture_create(BFpacketcapture* obj,
         method = new UDPPacketReceiver(fd, max_payload_size, core);
     } else if( backend == BF_IO_SNIFFER ) {
         method = new UDPPacketSniffer(fd, max_payload_size, core);
+#if defined __linux__ && __linux__
+    } else if( backend == BF_IO_MMAP ) {
+        BF_TRY_ELSE(method = new UDPPacketMmapSniffer(fd, max_payload_size, core),
+                    *obj = 0);
+#endif
 #if defined BF_VERBS_ENABLED && BF_VERBS_ENABLED
     } else if( backend == BF_IO_VERBS ) {
         method = new UDPVerbsReceiver(fd, max_payload_size, core);
@@ -59,6 +59,9 @@ BFstatus BFpacketwriter_impl::send(BFheaderinfo   info,
     int data_size = (BF_DTYPE_NBIT(in->dtype)/8) * _nsamples;
     int npackets = in->shape[0]*in->shape[1];
     
+    // Note: The headers from the last call may still be in flight
+    BF_TRY(_writer->wait_until_idle());
+    
     if( hdr_size != _last_size || npackets > _last_count ) {
       if( _pkt_hdrs ) {
         ::munlock(_pkt_hdrs, _last_count*_last_size*sizeof(char));
@@ -80,7 +83,8 @@ BFstatus BFpacketwriter_impl::send(BFheaderinfo   info,
         _framecount++;
     }
     
-    _writer->send(_pkt_hdrs, hdr_size, (char*) in->data, data_size, npackets);
+    BF_TRY_ELSE(_writer->send(_pkt_hdrs, hdr_size, (char*) in->data, data_size, npackets),
+                this->update_stats_log());
     this->update_stats_log();
     
     return BF_STATUS_SUCCESS;
@@ -154,6 +158,13 @@ BFstatus bfUdpTransmitCreate(BFpacketwriter* obj,
     return BFpacketwriter_create(obj, format, fd, core, BF_IO_UDP);
 }
 
+BFstatus bfUdpZcTransmitCreate(BFpacketwriter* obj,
+                               const char*     format,
+                               int             fd,
+                               int             core) {
+    return BFpacketwriter_create(obj, format, fd, core, BF_IO_UDP_ZC);
+}
+
 BFstatus bfUdpVerbsTransmitCreate(BFpacketwriter* obj,
                                   const char*     format,
                                   int             fd,
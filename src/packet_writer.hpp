@@ -110,6 +110,9 @@ public:
                                  int   flags=0) {
         return 0;
     }
+    // Blocks until the buffers passed to the previous send_packets call
+    //   can be reused
+    virtual void wait_until_idle() {}
     virtual const char* get_name()     { return "generic_writer"; }
     inline void set_rate(uint32_t rate_limit) { _limiter.set_rate(rate_limit); }
     inline uint32_t get_rate() { return _limiter.get_rate(); }
@@ -264,6 +267,98 @@ public:
     inline const char* get_name() { return "udp_transmit"; }
 };
 
+#if defined __linux__ && __linux__
+#include <linux/errqueue.h>
+#include <poll.h>
+
+#ifndef SO_ZEROCOPY
+#define SO_ZEROCOPY 60
+#endif
+#ifndef MSG_ZEROCOPY
+#define MSG_ZEROCOPY 0x4000000
+#endif
+
+// Note: Sends with MSG_ZEROCOPY so that the kernel reads the headers and data
+//         directly from user memory rather than copying them into skbs.  The
+//         buffers must stay untouched until the kernel is done with them.
+//         The data belong to the caller, who is free to reuse them once
+//         bfPacketWriterSend returns, so send_packets waits for the
+//         completion notifications before it returns.  If they stall the
+//         send fails, but the outstanding count is kept so that the next
+//         call (via wait_until_idle, before the headers are rewritten)
+//         waits for them again rather than reusing buffers still in flight.
+class UDPPacketZCSender : public UDPPacketSender {
+    uint64_t _npending;
+    void reap_completions() {
+        char control[128];
+        while( true ) {
+            msghdr msg = {};
+            msg.msg_control = control;
+            msg.msg_controllen = sizeof(control);
+            if( ::recvmsg(_fd, &msg, MSG_ERRQUEUE | MSG_DONTWAIT) == -1 ) {
+                if( errno == EINTR ) {
+                    continue;
+                }
+                BF_ASSERT_EXCEPTION(errno == EAGAIN || errno == EWOULDBLOCK,
+                                    BF_STATUS_DEVICE_ERROR);
+                return;
+            }
+            for(cmsghdr* cm=CMSG_FIRSTHDR(&msg); cm; cm=CMSG_NXTHDR(&msg, cm)) {
+                sock_extended_err* serr = (sock_extended_err*) CMSG_DATA(cm);
+                if( serr->ee_origin != SO_EE_ORIGIN_ZEROCOPY || serr->ee_errno != 0 ) {
+                    continue;
+                }
+                // Note: Notifications cover the inclusive range [ee_info, ee_data]
+                uint64_t ndone = (uint32_t) (serr->ee_data - serr->ee_info) + 1;
+                _npending -= std::min(ndone, _npending);
+            }
+        }
+    }
+public:
+    UDPPacketZCSender(int fd, size_t max_burst_size=BF_SEND_NPKTBURST, int core=-1)
+     : UDPPacketSender(fd, max_burst_size, core), _npending(0) {
+        int one = 1;
+        BF_ASSERT_EXCEPTION(::setsockopt(_fd, SOL_SOCKET, SO_ZEROCOPY,
+                                         &one, sizeof(one)) != -1,
+                            BF_STATUS_UNSUPPORTED);
+    }
+    void wait_until_idle() {
+        int nstall = 0;
+        while( _npending > 0 ) {
+            // Note: POLLERR is always reported, no need to ask for it
+            pollfd pfd = {_fd, 0, 0};
+            int ready = ::poll(&pfd, 1, 1000);
+            if( ready == -1 ) {
+                BF_ASSERT_EXCEPTION(errno == EINTR, BF_STATUS_DEVICE_ERROR);
+                continue;
+            }
+            if( ready == 0 ) {
+                // Note: The count is kept so the next call waits again
+                BF_ASSERT_EXCEPTION(++nstall < 10, BF_STATUS_DEVICE_ERROR);
+                continue;
+            }
+            nstall = 0;
+            this->reap_completions();
+        }
+    }
+    ssize_t send_packets(char* hdrs, 
+                         int   hdr_size,
+                         char* data, 
+                         int   data_size, 
+                         int   npackets,
+                         int   flags=0) {
+        ssize_t nsent = UDPPacketSender::send_packets(hdrs, hdr_size,
+                                                      data, data_size,
+                                                      npackets,
+                                                      flags | MSG_ZEROCOPY);
+        _npending += nsent;
+        this->wait_until_idle();
+        return nsent;
+    }
+    inline const char* get_name() { return "udp_zc_transmit"; }
+};
+#endif // __linux__
+
 #if defined BF_VERBS_ENABLED && BF_VERBS_ENABLED
 #include "ib_verbs_send.hpp"
 
@@ -405,6 +500,7 @@ public:
         }
         return nsent;
     }
+    inline void wait_until_idle() { _method->wait_until_idle(); }
     inline const char* get_name() { return _method->get_name(); }
     inline const int get_core() { return _core; }
     inline const PacketStats* get_stats() const { return &_stats; }
@@ -668,6 +764,11 @@ BFstatus BFpacketwriter_create(BFpacketwriter* obj,
         method = new DiskPacketWriter(fd, core=core);
     } else if( backend == BF_IO_UDP ) {
         method = new UDPPacketSender(fd, core=core);
+#if defined __linux__ && __linux__
+    } else if( backend == BF_IO_UDP_ZC ) {
+        BF_TRY_ELSE(method = new UDPPacketZCSender(fd, core=core),
+                    BF_NO_OP);
+#endif
 #if defined BF_VERBS_ENABLED && BF_VERBS_ENABLED
     } else if( backend == BF_IO_VERBS ) {
         method = new UDPVerbsSender(fd, core=core);
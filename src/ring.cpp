@@ -33,7 +33,9 @@
 #include <bifrost/ring.h>
 #include "ring_impl.hpp"
 #include "assert.hpp"
+#include <bifrost/cuda.h>
 #include <cstring> // For ::memset
+#include <algorithm>
 
 BFstatus bfRingCreate(BFring* ring, char const* name, BFspace space) {
 	BF_ASSERT(ring, BF_STATUS_INVALID_POINTER);
@@ -77,6 +79,26 @@ BFstatus bfRingGetAffinity(BFring ring, int* core) {
 	BF_ASSERT(core,  BF_STATUS_INVALID_POINTER);
 	BF_TRY_RETURN(*core = ring->core());
 }
+BFstatus bfRingSetNumaNode(BFring ring, int  node) {
+	BF_ASSERT(ring, BF_STATUS_INVALID_HANDLE);
+	BF_ASSERT(node >= -1, BF_STATUS_INVALID_ARGUMENT);
+	BF_ASSERT(BF_HWLOC_ENABLED, BF_STATUS_UNSUPPORTED);
+	BF_TRY_RETURN(ring->set_numa_node(node));
+}
+BFstatus bfRingGetNumaNode(BFring ring, int* node) {
+	BF_ASSERT(ring, BF_STATUS_INVALID_HANDLE);
+	BF_ASSERT(node, BF_STATUS_INVALID_POINTER);
+	BF_TRY_RETURN(*node = ring->numa_node());
+}
+BFstatus bfRingSetMallocFlags(BFring ring, unsigned flags) {
+	BF_ASSERT(ring, BF_STATUS_INVALID_HANDLE);
+	BF_TRY_RETURN(ring->set_malloc_flags(flags));
+}
+BFstatus bfRingGetMallocFlags(BFring ring, unsigned* flags) {
+	BF_ASSERT(ring,  BF_STATUS_INVALID_HANDLE);
+	BF_ASSERT(flags, BF_STATUS_INVALID_POINTER);
+	BF_TRY_RETURN(*flags = ring->malloc_flags());
+}
 BFstatus bfRingLock(BFring ring) {
 	BF_ASSERT(ring, BF_STATUS_INVALID_HANDLE);
 	BF_TRY_RETURN(ring->lock());
@@ -259,6 +281,34 @@ BFstatus   bfRingSpanCommit(BFwspan span,
 	BF_TRY_RETURN(delete span->commit(size));
 }
 
+BFstatus bfRingSequenceWrite(BFwsequence sequence,
+                             void const* data,
+                             BFspace     space,
+                             BFsize      size,
+                             BFsize      gulp_size) {
+	BF_ASSERT(sequence,         BF_STATUS_INVALID_HANDLE);
+	BF_ASSERT(data || !size,    BF_STATUS_INVALID_POINTER);
+	BF_ASSERT(gulp_size > 0,    BF_STATUS_INVALID_ARGUMENT);
+	BFring ring = sequence->ring();
+	uint8_t const* src = (uint8_t const*)data;
+	for( BFsize offset=0; offset<size; offset+=gulp_size ) {
+		BFsize nbyte = std::min(gulp_size, size - offset);
+		BFwspan span;
+		BF_CHECK(bfRingSpanReserve(&span, ring, nbyte, false));
+		BFstatus status = bfMemcpy2D(span->data(), span->stride(), ring->space(),
+		                             src + offset, size, space,
+		                             nbyte, span->nringlet());
+		if( status == BF_STATUS_SUCCESS &&
+		    (space != BF_SPACE_SYSTEM || ring->space() != BF_SPACE_SYSTEM) ) {
+			// Note: Device copies are asynchronous and must land before commit
+			status = bfStreamSynchronize();
+		}
+		BF_CHECK(bfRingSpanCommit(span, status == BF_STATUS_SUCCESS ? nbyte : 0));
+		BF_CHECK(status);
+	}
+	return BF_STATUS_SUCCESS;
+}
+
 BFstatus   bfRingSpanAcquire(BFrspan*    span,
                              BFrsequence sequence,
                              BFoffset    offset,
@@ -327,6 +377,56 @@ BFstatus bfRingSpanGetNRinglet(BFspan span, BFsize* val) {
 	BF_TRY_RETURN_ELSE(*val = span->nringlet(),
 	                   *val = 0);
 }
+struct BFrspaniter_impl {
+	BFrsequence   sequence;
+	BFoffset      offset;
+	BFsize        size;
+	BFsize        stride;
+	BFrspan_impl* span;
+	bool          started;
+};
+BFstatus bfRingSpanIteratorCreate(BFrspaniter* iter,
+                                  BFrsequence  sequence,
+                                  BFoffset     begin,
+                                  BFsize       size,
+                                  BFsize       stride) {
+	BF_ASSERT(iter,     BF_STATUS_INVALID_POINTER);
+	BF_ASSERT(sequence, BF_STATUS_INVALID_HANDLE);
+	BF_TRY_RETURN_ELSE(*iter = new BFrspaniter_impl({sequence, begin, size, stride,
+	                                                 nullptr, false}),
+	                   *iter = 0);
+}
+BFstatus bfRingSpanIteratorNext(BFrspaniter iter, BFspan_info* span_info) {
+	BF_ASSERT(iter,      BF_STATUS_INVALID_HANDLE);
+	BF_ASSERT(span_info, BF_STATUS_INVALID_POINTER);
+	if( iter->span ) {
+		delete iter->span;
+		iter->span = nullptr;
+	}
+	if( iter->started ) {
+		iter->offset += iter->stride;
+	}
+	iter->started = true;
+	BF_TRY_ELSE(iter->span = new BFrspan_impl(iter->sequence,
+	                                          iter->offset,
+	                                          iter->size),
+	            ::memset(span_info, 0, sizeof(BFspan_info)));
+	return bfRingSpanGetInfo(iter->span, span_info);
+}
+BFstatus bfRingSpanIteratorGetSpan(BFrspaniter iter, BFrspan* span) {
+	BF_ASSERT(iter,       BF_STATUS_INVALID_HANDLE);
+	BF_ASSERT(span,       BF_STATUS_INVALID_POINTER);
+	BF_ASSERT(iter->span, BF_STATUS_INVALID_STATE);
+	*span = iter->span;
+	return BF_STATUS_SUCCESS;
+}
+BFstatus bfRingSpanIteratorDestroy(BFrspaniter iter) {
+	BF_ASSERT(iter, BF_STATUS_INVALID_HANDLE);
+	delete iter->span;
+	delete iter;
+	return BF_STATUS_SUCCESS;
+}
+
 BFstatus bfRingSpanGetInfo(BFspan span, BFspan_info* span_info) {
 	BF_ASSERT(span,      BF_STATUS_INVALID_HANDLE);
 	BF_ASSERT(span_info, BF_STATUS_INVALID_POINTER);
@@ -90,7 +90,7 @@ BFring_impl::BFring_impl(const char* name, BFspace space)
 	  _ghost_dirty_beg(_ghost_span),
 	  _writing_begun(false), _writing_ended(false), _eod(0),
 	  _nread_open(0), _nwrite_open(0), _nrealloc_pending(0),
-	  _core(-1), _size_log(std::string("rings/")+name) {
+	  _core(-1), _numa_node(-1), _malloc_flags(BF_MALLOC_DEFAULT), _size_log(std::string("rings/")+name) {
 
 #if defined BF_CUDA_ENABLED && BF_CUDA_ENABLED
 	BF_ASSERT_EXCEPTION(space==BF_SPACE_SYSTEM       ||
@@ -157,15 +157,25 @@ void BFring_impl::resize(BFsize contiguous_span,
 	//std::std::cout << "new_nringlet:   " << new_nringlet << std::endl;
 	//std::std::cout << "new_stride:     " << new_stride << std::endl;
 	//std::std::cout << "Allocating " << new_nbyte << std::endl;
-	BF_ASSERT_EXCEPTION(bfMalloc((void**)&new_buf, new_nbyte, _space) == BF_STATUS_SUCCESS,
+	BF_ASSERT_EXCEPTION(bfMallocEx((void**)&new_buf, new_nbyte, _space,
+	                               _malloc_flags & ~BF_MALLOC_PREFAULT) == BF_STATUS_SUCCESS,
 	                    BF_STATUS_MEM_ALLOC_FAILED);
 #if BF_HWLOC_ENABLED
-	if( _core != -1 ) {
-		int node = _hwloc.get_numa_node_of_core(_core);
+	// Note: An explicit NUMA node takes precedence over the core's node
+	int node = _numa_node;
+	if( node == -1 && _core != -1 ) {
+		node = _hwloc.get_numa_node_of_core(_core);
 		BF_ASSERT_EXCEPTION(node != -1, BF_STATUS_INVALID_ARGUMENT);
+	}
+	if( node != -1 ) {
 		_hwloc.bind_memory_area_to_numa_node(new_buf, new_nbyte, node);
 	}
 #endif
+	// Note: This is done here rather than in bfMallocEx so that the pages
+	//         are first touched after the NUMA binding has been applied
+	if( (_malloc_flags & BF_MALLOC_PREFAULT) && _space == BF_SPACE_SYSTEM ) {
+		prefault_pages(new_buf, new_nbyte);
+	}
 	if( _buf ) {
 		// Must move existing data and delete old buf
 		if( _buf_offset(_tail) < _buf_offset(_head) ) {
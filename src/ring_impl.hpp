@@ -101,6 +101,8 @@ class BFring_impl {
   HardwareLocality _hwloc;
 #endif
 	int              _core;    	
+	int              _numa_node;
+	unsigned         _malloc_flags;
 	ProcLog          _size_log;
 	
 	std::queue<BFsequence_sptr>           _sequence_queue;
@@ -180,6 +182,10 @@ public:
 	inline BFspace space()    const { return _space; }
 	inline void set_core(int core)  { _core = core; }
 	inline int      core()    const { return _core; }
+	inline void set_numa_node(int node) { _numa_node = node; }
+	inline int      numa_node() const { return _numa_node; }
+	inline void set_malloc_flags(unsigned flags) { _malloc_flags = flags; }
+	inline unsigned malloc_flags() const { return _malloc_flags; }
 	inline void   lock()   { _mutex.lock(); }
 	inline void   unlock() { _mutex.unlock(); }
 	inline void*  locked_data()            const { return _buf; }
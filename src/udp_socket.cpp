@@ -111,6 +111,27 @@ BFstatus bfUdpSocketGetPromiscuous(BFudpsocket obj, int* promisc) {
 	}
 	return BF_STATUS_SUCCESS;
 }
+BFstatus bfUdpSocketSetBusyPoll(BFudpsocket obj, int usecs) {
+	BF_ASSERT(obj, BF_STATUS_INVALID_HANDLE);
+	BF_TRY_RETURN(obj->set_busy_poll(usecs));
+}
+BFstatus bfUdpSocketGetBusyPoll(BFudpsocket obj, int* usecs) {
+	BF_ASSERT(obj, BF_STATUS_INVALID_HANDLE);
+	BF_ASSERT(usecs, BF_STATUS_INVALID_POINTER);
+	// WAR for old Socket implem returning Socket::Error not BFexception
+	try {
+		*usecs = obj->get_busy_poll();
+	}
+	catch( Socket::Error& ) {
+		*usecs = 0;
+		return BF_STATUS_INVALID_STATE;
+	}
+	catch(...) {
+		*usecs = 0;
+		return BF_STATUS_INTERNAL_ERROR;
+	}
+	return BF_STATUS_SUCCESS;
+}
 BFstatus bfUdpSocketGetMTU(BFudpsocket obj, int* mtu) {
 	BF_ASSERT(obj, BF_STATUS_INVALID_HANDLE);
 	BF_ASSERT(mtu, BF_STATUS_INVALID_POINTER);
@@ -41,6 +41,7 @@
 #include <cstring> // For ::memcpy
 #include <cstdint>
 #include <cassert>
+#include <unistd.h> // For sysconf
 
 #define BF_DTYPE_IS_COMPLEX(dtype) bool((dtype) & BF_DTYPE_COMPLEX_BIT)
 #define BF_DTYPE_VECTOR_LENGTH(dtype) \
@@ -99,6 +100,15 @@ inline BFoffset round_up(BFoffset val, BFoffset mult) {
 	        0 :
 	        ((val-1)/mult+1)*mult);
 }
+// Note: This writes to every page, so it must only be used on memory whose
+//         contents are not yet meaningful (e.g., a fresh allocation)
+inline void prefault_pages(void* ptr, BFsize size) {
+	static const BFsize page_size = ::sysconf(_SC_PAGESIZE);
+	volatile uint8_t* bytes = (volatile uint8_t*)ptr;
+	for( BFsize i=0; i<size; i+=page_size ) {
+		bytes[i] = 0;
+	}
+}
 inline BFoffset round_up_pow2(BFoffset a) {
     size_t r = a-1;
     for( int i=1; i<=(int)sizeof(BFoffset)*8/2; i<<=1 ) r |= r >> i;
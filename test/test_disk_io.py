@@ -539,6 +539,34 @@ class SIMPLEReader(object):
                     break
         del capture
 
+class SIMPLEForeverReader(SIMPLEReader):
+    def __init__(self, sock, ring):
+        SIMPLEReader.__init__(self, sock, ring)
+        self.events = []
+    def on_event(self, status):
+        self.events.append(status)
+        return status in (1,4)
+    def main(self):
+        seq_callback = PacketCaptureCallback()
+        seq_callback.set_simple(self.seq_callback)
+        with DiskReader("simple" , self.sock, self.ring, self.nsrc, 0, 16, 128,
+                        sequence_callback=seq_callback) as capture:
+            self.status = capture.capture_forever(self.on_event)
+        del capture
+
+class SIMPLEForeverDefaultReader(SIMPLEForeverReader):
+    on_event = None
+
+class SIMPLEForeverRaisingReader(SIMPLEForeverReader):
+    def on_event(self, status):
+        self.events.append(status)
+        raise ValueError("Intentional on_event failure")
+    def main(self):
+        try:
+            SIMPLEForeverReader.main(self)
+        except ValueError as e:
+            self.error = e
+
 class SimpleDiskIOTest(BaseDiskIOTest.BaseDiskIOTestCase):
     """Test simple IO for the disk-based Simple packet reader and writing"""
     def _get_simple_data(self):
@@ -613,3 +641,102 @@ class SimpleDiskIOTest(BaseDiskIOTest.BaseDiskIOTestCase):
             
         del oop
         fh.close()
+        
+    def _read_simple_forever(self, reader_class):
+        # Write
+        fh = self._open('test_simple.dat', 'wb')
+        oop = DiskWriter('simple', fh)
+        
+        # Get data
+        timetag0, hdr_desc, data = self._get_simple_data()
+        
+        # Go!
+        oop.send(hdr_desc, timetag0, 1, 0, 1, data)
+        fh.close()
+        
+        # Read
+        fh = self._open('test_simple.dat', 'rb')
+        ring = Ring(name="capture_simple_forever")
+        iop = reader_class(fh, ring)
+        ## Data accumulation
+        times = []
+        final = []
+        expectedsize = 1*2048*4
+        aop = AccumulateOp(ring, times, final, expectedsize, dtype=np.uint16)
+        
+        # Start the reader and accumlator threads
+        reader = threading.Thread(target=iop.main)
+        accumu = threading.Thread(target=aop.main)
+        reader.start()
+        accumu.start()
+        
+        # Get simple data
+        reader.join()
+        accumu.join()
+        
+        del oop
+        fh.close()
+        return iop, data, times, final
+    def test_read_simple_forever(self):
+        iop, data, times, final = self._read_simple_forever(SIMPLEForeverReader)
+        
+        # Only the transitions are reported
+        self.assertEqual(iop.events, [0, 1])
+        self.assertEqual(iop.status, 1)
+        
+        # Compare
+        for seq_timetag,seq_data in zip(times, final):
+            seq_data = np.array(seq_data, dtype=np.uint16)
+            seq_data = seq_data.reshape(-1,2048,1,2)
+            seq_data = seq_data.transpose(0,2,1,3).copy()
+            ## Drop the last axis (complexity) since we are going to ci16
+            seq_data = bf.ndarray(shape=seq_data.shape[:-1], dtype='ci16', buffer=seq_data.ctypes.data)
+            
+            np.testing.assert_equal(seq_data[1:,...], data[1:,...])
+    def test_read_simple_forever_default(self):
+        # Without a callback the loop stops at the end of the file
+        iop, _, _, _ = self._read_simple_forever(SIMPLEForeverDefaultReader)
+        self.assertEqual(iop.status, 1)
+    def test_read_simple_forever_raises(self):
+        iop, _, _, _ = self._read_simple_forever(SIMPLEForeverRaisingReader)
+        self.assertEqual(iop.events, [0])
+        self.assertIsInstance(iop.error, ValueError)
+        
+    def test_read_simple_view(self):
+        # Write
+        fh = self._open('test_simple.dat', 'wb')
+        oop = DiskWriter('simple', fh)
+        
+        # Get data
+        timetag0, hdr_desc, data = self._get_simple_data()
+        
+        # Go!
+        oop.send(hdr_desc, timetag0, 1, 0, 1, data)
+        fh.close()
+        
+        # Read, keeping a copy of each span as it is committed
+        fh = self._open('test_simple.dat', 'rb')
+        ring = Ring(name="capture_simple_view")
+        iop = SIMPLEReader(fh, ring)
+        spans = []
+        def view_callback(view, status):
+            spans.append(bytes(view))
+        seq_callback = PacketCaptureCallback()
+        seq_callback.set_simple(iop.seq_callback)
+        with DiskReader("simple" , fh, ring, 1, 0, 16, 128,
+                        sequence_callback=seq_callback) as capture:
+            while True:
+                status = capture.recv_with_view(view_callback)
+                if status in (1,4,5,6):
+                    break
+        del capture
+        
+        # Compare
+        self.assertGreater(len(spans), 0)
+        seq_data = np.frombuffer(b''.join(spans), dtype=np.uint16)
+        seq_data = seq_data.reshape(-1,1,2048,2)
+        expected = data.view(np.uint16).reshape(-1,1,2048,2)
+        np.testing.assert_equal(seq_data, expected[:seq_data.shape[0],...])
+        
+        del oop
+        fh.close()
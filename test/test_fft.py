@@ -159,6 +159,25 @@ class TestFFT(unittest.TestCase):
 
     def test_2D(self):
         self.run_test_c2c(self.shape2D, [0, 1])
+    def test_2D_default_axes(self):
+        known_data = np.random.normal(size=self.shape2D).astype(np.complex64)
+        idata = bf.ndarray(known_data, space='cuda')
+        odata = bf.empty_like(idata)
+        fft = Fft()
+        fft.init(idata, odata)
+        fft.execute(idata, odata)
+        compare(odata.copy('system'), gold_fftn(known_data))
+    def test_2D_stream(self):
+        known_data = np.random.normal(size=self.shape2D).astype(np.complex64)
+        idata = bf.ndarray(known_data, space='cuda')
+        odata = bf.empty_like(idata)
+        fft = Fft()
+        fft.init(idata, odata, axes=[0, 1])
+        stream = bf.device.get_stream()
+        fft.execute(idata, odata, stream=stream)
+        self.assertEqual(bf.device.get_stream(), stream)
+        bf.device.stream_synchronize()
+        compare(odata.copy('system'), gold_fftn(known_data))
     def test_2D_in_3D_dims01(self):
         self.run_test_c2c(self.shape3D, [0, 1])
     def test_2D_in_3D_dims02(self):
@@ -131,3 +131,94 @@ class TestPyCUDA(unittest.TestCase):
             cp_data *= 4
             np_data = cp.asnumpy(cp_data)
         np.testing.assert_allclose(np_data, (data+2)*4)
+
+class _CudaArrayInterfaceWrapper(object):
+    """Minimal third-party producer of the CUDA Array Interface"""
+    def __init__(self, arr, **overrides):
+        self._arr = arr
+        cai = dict(arr.__cuda_array_interface__)
+        for key, value in overrides.items():
+            if value is None:
+                cai.pop(key, None)
+            else:
+                cai[key] = value
+        self.__cuda_array_interface__ = cai
+
+class _FakeCudaArrayInterface(object):
+    """Producer that only exposes an interface dictionary"""
+    def __init__(self, cai):
+        self.__cuda_array_interface__ = cai
+
+class TestCudaArrayInterface(unittest.TestCase):
+    @staticmethod
+    def create_data():
+        data = np.random.rand(100,1000)
+        return data.astype(np.float32)
+
+    def test_system_space(self):
+        bf_data = bf.ndarray(np.arange(10, dtype=np.float32), space='system')
+        self.assertFalse(hasattr(bf_data, '__cuda_array_interface__'))
+    def test_masked(self):
+        cai = {'shape': (10,), 'typestr': '<f4', 'data': (0, False),
+               'strides': None, 'mask': object(), 'version': 3}
+        with self.assertRaises(TypeError):
+            bf.ndarray(_FakeCudaArrayInterface(cai))
+    @unittest.skipUnless(BF_CUDA_ENABLED, "requires GPU support")
+    def test_roundtrip(self):
+        data = self.create_data()
+        bf_data = bf.ndarray(data, space='cuda')
+        cai = bf_data.__cuda_array_interface__
+        self.assertEqual(cai['data'][0], bf_data.ctypes.data)
+        self.assertEqual(cai['shape'], data.shape)
+        self.assertIsNone(cai['mask'])
+        self.assertNotEqual(cai['stream'], 0)
+
+        wrapped = bf.ndarray(_CudaArrayInterfaceWrapper(bf_data))
+        self.assertEqual(wrapped.bf.space, 'cuda')
+        self.assertEqual(wrapped.ctypes.data, bf_data.ctypes.data)
+        np.testing.assert_allclose(wrapped.copy(space='system'), data)
+    @unittest.skipUnless(BF_CUDA_ENABLED, "requires GPU support")
+    def test_no_strides(self):
+        data = self.create_data()
+        bf_data = bf.ndarray(data, space='cuda')
+        producer = _CudaArrayInterfaceWrapper(bf_data, strides=None, stream=None)
+        self.assertNotIn('strides', producer.__cuda_array_interface__)
+
+        wrapped = bf.ndarray(producer)
+        self.assertEqual(wrapped.strides, data.strides)
+        np.testing.assert_allclose(wrapped.copy(space='system'), data)
+    @unittest.skipUnless(BF_CUDA_ENABLED, "requires GPU support")
+    def test_strided(self):
+        data = self.create_data()
+        bf_data = bf.ndarray(data, space='cuda').T
+        self.assertFalse(bf_data.flags['C_CONTIGUOUS'])
+
+        wrapped = bf.ndarray(_CudaArrayInterfaceWrapper(bf_data))
+        self.assertEqual(wrapped.strides, bf_data.strides)
+        np.testing.assert_allclose(wrapped.copy(space='system'), data.T)
+    @unittest.skipUnless(BF_CUDA_ENABLED, "requires GPU support")
+    def test_structured_dtype(self):
+        bf_data = bf.ndarray(shape=(10,20), dtype='ci8', space='cuda')
+        bf.memset_array(bf_data, 1)
+        self.assertGreater(len(bf_data.__cuda_array_interface__['descr']), 1)
+
+        wrapped = bf.ndarray(_CudaArrayInterfaceWrapper(bf_data))
+        self.assertEqual(wrapped.bf.dtype, bf_data.bf.dtype)
+        np.testing.assert_equal(wrapped.copy(space='system'),
+                                bf_data.copy(space='system'))
+    @unittest.skipUnless(BF_CUDA_ENABLED, "requires GPU support")
+    def test_space(self):
+        data = self.create_data()
+        bf_data = bf.ndarray(data, space='cuda')
+
+        host = bf.asarray(_CudaArrayInterfaceWrapper(bf_data), space='system')
+        self.assertEqual(host.bf.space, 'system')
+        np.testing.assert_allclose(host, data)
+    @unittest.skipUnless(BF_CUDA_ENABLED and HAVE_CUPY, "requires GPU support and cupy")
+    def test_from_cupy_interface(self):
+        data = self.create_data()
+        cp_data = cp.asarray(data)
+
+        wrapped = bf.ndarray(_CudaArrayInterfaceWrapper(cp_data))
+        self.assertEqual(wrapped.ctypes.data, cp_data.data.ptr)
+        np.testing.assert_allclose(wrapped.copy(space='system'), data)
@@ -0,0 +1,102 @@
+
+# Copyright (c) 2016-2022, The Bifrost Authors. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+# * Redistributions of source code must retain the above copyright
+#   notice, this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright
+#   notice, this list of conditions and the following disclaimer in the
+#   documentation and/or other materials provided with the distribution.
+# * Neither the name of The Bifrost Authors nor the names of its
+#   contributors may be used to endorse or promote products derived
+#   from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS ``AS IS'' AND ANY
+# EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED.  IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+# PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY
+# OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import os
+import unittest
+import bifrost as bf
+
+from bifrost.libbifrost_generated import BF_CUDA_ENABLED
+from bifrost.libbifrost import _bf
+from bifrost.memory import MemoryPool, _pool_nbyte, raw_get_space, default_pool
+
+class MemoryPoolTest(unittest.TestCase):
+    def test_pool_nbyte(self):
+        self.assertEqual(_pool_nbyte(1), 1)
+        self.assertEqual(_pool_nbyte(3), 4)
+        self.assertEqual(_pool_nbyte(4096), 4096)
+        self.assertEqual(_pool_nbyte(4097), 8192)
+        self.assertEqual(_pool_nbyte((1 << 20) + 1), 2 << 20)
+        self.assertEqual(_pool_nbyte(3 << 20), 3 << 20)
+    @unittest.skipIf('BIFROST_POOL_MAX_MB' in os.environ,
+                     "default pool size set by the environment")
+    def test_default_pool_disabled(self):
+        self.assertEqual(default_pool.max_cached_nbyte, 0)
+    def test_system_not_pooled(self):
+        pool = MemoryPool()
+        ptr = pool.malloc(1000, 'system')
+        pool.free(ptr, 'system')
+        self.assertEqual(pool.cached_nbyte, 0)
+    @unittest.skipUnless(BF_CUDA_ENABLED, "requires GPU support")
+    def test_reuse(self):
+        pool = MemoryPool()
+        ptr = pool.malloc(1000, 'cuda')
+        pool.free(ptr, 'cuda')
+        self.assertEqual(pool.cached_nbyte, 1024)
+        self.assertEqual(pool.malloc(1024, 'cuda'), ptr)
+        self.assertEqual(pool.cached_nbyte, 0)
+        other = pool.malloc(2000, 'cuda')
+        self.assertNotEqual(other, ptr)
+        pool.free(ptr, 'cuda')
+        pool.free(other, 'cuda')
+        pool.clear()
+        self.assertEqual(pool.cached_nbyte, 0)
+    @unittest.skipUnless(BF_CUDA_ENABLED, "requires GPU support")
+    def test_limit(self):
+        pool = MemoryPool(max_cached_nbyte=1024)
+        ptrs = [pool.malloc(1024, 'cuda') for _ in range(2)]
+        for ptr in ptrs:
+            pool.free(ptr, 'cuda')
+        self.assertEqual(pool.cached_nbyte, 1024)
+        pool.clear()
+    @unittest.skipUnless(BF_CUDA_ENABLED, "requires GPU support")
+    def test_pin_host(self):
+        pool = MemoryPool(pin_host=True)
+        ptr = pool.malloc(1000, 'system')
+        self.assertEqual(raw_get_space(ptr), _bf.BF_SPACE_CUDA_HOST)
+        pool.free(ptr, 'system')
+        self.assertEqual(pool.cached_nbyte, 1024)
+        self.assertEqual(pool.malloc(1000, 'system'), ptr)
+        pool.free(ptr, 'system')
+        pool.clear()
+        self.assertEqual(pool.cached_nbyte, 0)
+    @unittest.skipUnless(BF_CUDA_ENABLED, "requires GPU support")
+    def test_pin_host_zero_size(self):
+        pool = MemoryPool(pin_host=True)
+        ptr = pool.malloc(0, 'system')
+        if ptr:
+            self.assertEqual(raw_get_space(ptr), _bf.BF_SPACE_SYSTEM)
+        pool.free(ptr, 'system')
+        self.assertEqual(pool.cached_nbyte, 0)
+    @unittest.skipUnless(BF_CUDA_ENABLED, "requires GPU support")
+    def test_ndarray(self):
+        a = bf.ndarray(shape=(3, 5), dtype='f32', space='cuda')
+        a[...] = 1
+        np_a = a.copy('system')
+        del a
+        b = bf.zeros(shape=(3, 5), dtype='f32', space='cuda')
+        self.assertEqual(float(b.copy('system').sum()), 0.)
+        self.assertEqual(float(np_a.sum()), 15.)
@@ -40,6 +40,27 @@ class NDArrayTest(unittest.TestCase):
     def test_construct(self):
         a = bf.ndarray(self.known_vals, dtype='f32')
         np.testing.assert_equal(a, self.known_array)
+    def test_construct_cast(self):
+        i = np.array(self.known_vals, dtype=np.int32)
+        a = bf.ndarray(i, dtype='f32')
+        self.assertEqual(str(a.bf.dtype), 'f32')
+        self.assertEqual(a.bf.space, 'system')
+        np.testing.assert_equal(a, self.known_array)
+        a = bf.ndarray(i.T, dtype='cf32')
+        self.assertEqual(str(a.bf.dtype), 'cf32')
+        np.testing.assert_equal(a, self.known_array.T)
+    def test_empty(self):
+        for _ in range(2):
+            a = bf.empty((3, 2), dtype='f32')
+            self.assertEqual(a.shape, (3, 2))
+            self.assertEqual(a.strides, (8, 4))
+            self.assertEqual(str(a.bf.dtype), 'f32')
+            self.assertEqual(a.bf.space, 'system')
+            a[...] = self.known_array
+            np.testing.assert_equal(a, self.known_array)
+        b = bf.empty(4, dtype=DataType('cf32'))
+        self.assertEqual(b.shape, (4,))
+        self.assertEqual(str(b.bf.dtype), 'cf32')
     def test_assign(self):
         b = bf.ndarray(shape=(3,2), dtype='f32')
         b[...] = self.known_array
@@ -133,12 +154,38 @@ class NDArrayTest(unittest.TestCase):
         g = g.copy('system')
         known = np.zeros_like(self.known_array)
         np.testing.assert_equal(g, known)
+    def test_byteswap(self):
+        a = bf.ndarray([1, 2, 3], dtype='i32')
+        b = a.byteswap()
+        self.assertTrue(a.bf.native)
+        self.assertFalse(b.bf.native)
+        np.testing.assert_equal(a, [1, 2, 3])
+        np.testing.assert_equal(b.view(np.ndarray).byteswap(), [1, 2, 3])
+    def test_key_returns_scalar(self):
+        a = bf.ndarray(self.known_vals, dtype='f32')
+        self.assertTrue(a._key_returns_scalar((1, 0)))
+        self.assertTrue(a._key_returns_scalar((np.int64(1), -1)))
+        self.assertFalse(a._key_returns_scalar(1))
+        self.assertFalse(a._key_returns_scalar((1, slice(None))))
+        self.assertFalse(a._key_returns_scalar((Ellipsis, 0)))
+        b = bf.ndarray([1, 2, 3], dtype='f32')
+        self.assertTrue(b._key_returns_scalar(1))
+        self.assertTrue(b._key_returns_scalar(np.int32(-1)))
+        self.assertFalse(b._key_returns_scalar(True))
+        self.assertFalse(b._key_returns_scalar(Ellipsis))
+        self.assertFalse(b._key_returns_scalar(slice(0, 1)))
+        b[1] = 5
+        self.assertEqual(b[1], 5)
     @unittest.skipUnless(BF_CUDA_ENABLED, "requires GPU support")
     def test_getitem(self):
         g = bf.ndarray(self.known_vals, space='cuda')
         np.testing.assert_equal(g[0].copy('system'),     self.known_array[0])
         np.testing.assert_equal(g[(0,)].copy('system'),  self.known_array[(0,)])
         np.testing.assert_equal(int(g[0,0]),             self.known_array[0,0])
+        np.testing.assert_equal(int(g[-1,-2]),           self.known_array[-1,-2])
+        np.testing.assert_equal(int(g[np.int64(2),1]),   self.known_array[2,1])
+        with self.assertRaises(IndexError):
+            g[-4,0]
         np.testing.assert_equal(g[:1,1:].copy('system'), self.known_array[:1,1:])
     @unittest.skipUnless(BF_CUDA_ENABLED, "requires GPU support")
     def test_setitem(self):
@@ -153,6 +200,13 @@ class NDArrayTest(unittest.TestCase):
         np.testing.assert_equal(g.copy('system'), np.array([[99,88],[2,3],[4,5]]))
         g[:,1] = [77,66,55]
         np.testing.assert_equal(g.copy('system'), np.array([[99,77],[2,66],[4,55]]))
+        g[-1,-2] = 44
+        np.testing.assert_equal(g.copy('system'), np.array([[99,77],[2,66],[44,55]]))
+    def test_setitem_scalar(self):
+        s = bf.zeros_like(self.known_vals)
+        s[0,1] = 999
+        s[-1,0] = 888
+        np.testing.assert_equal(s, np.array([[0,999],[0,0],[888,0]]))
     def run_type_conversion(self, space='system'):
         # Real
         for dtype_in in (np.int8, np.int16, np.int32, np.float32, np.float64):
@@ -205,3 +259,52 @@ class NDArrayTest(unittest.TestCase):
         aa = a.as_BFarray()
         b = bf.ndarray(aa)
         np.testing.assert_equal(a, b)
+    def test_BFarray_cache(self):
+        """ Test that ndarray.as_BFarray() is only rebuilt when needed """
+        a = bf.ndarray(np.arange(24, dtype=np.float32).reshape(2,3,4))
+        aa = a.as_BFarray()
+        self.assertIs(a.as_BFarray(), aa)
+
+        a.shape = (6,4)
+        ab = a.as_BFarray()
+        self.assertIsNot(ab, aa)
+        self.assertEqual(ab.ndim, 2)
+        self.assertEqual(list(ab.shape)[:2], [6,4])
+        self.assertEqual(list(ab.strides)[:2], [16,4])
+
+        a.bf.conjugated = True
+        self.assertTrue(a.as_BFarray().conjugated)
+        a.flags['WRITEABLE'] = False
+        self.assertTrue(a.as_BFarray().immutable)
+
+        v = a.view('i32')
+        self.assertEqual(v.as_BFarray().dtype, DataType('i32').as_BFdtype())
+        self.assertEqual(a.as_BFarray().dtype, DataType('f32').as_BFdtype())
+        c = a.astype('f64')
+        self.assertEqual(c.as_BFarray().dtype, DataType('f64').as_BFdtype())
+    def run_BFarray_cache_transposed_copy(self, space='system'):
+        a = bf.ndarray(np.random.rand(2,3,4).astype(np.float32), space=space)
+        t = a.transpose(2,0,1)
+        tt = t.as_BFarray()
+        shape = list(tt.shape)[:3]
+        strides = list(tt.strides)[:3]
+        c = t.copy(space='system')
+        self.assertIs(t.as_BFarray(), tt)
+        self.assertEqual(list(tt.shape)[:3], shape)
+        self.assertEqual(list(tt.strides)[:3], strides)
+        np.testing.assert_equal(c, a.copy(space='system').transpose(2,0,1))
+    def test_BFarray_cache_transposed_copy(self):
+        self.run_BFarray_cache_transposed_copy()
+    @unittest.skipUnless(BF_CUDA_ENABLED, "requires GPU support")
+    def test_space_BFarray_cache_transposed_copy(self):
+        self.run_BFarray_cache_transposed_copy(space='cuda')
+    def test_space_accessible(self):
+        from bifrost.memory import space_accessible
+        self.assertTrue(space_accessible('system', ['system']))
+        self.assertTrue(space_accessible('cuda_host', ['system']))
+        self.assertTrue(space_accessible('cuda_managed', ['cuda']))
+        self.assertTrue(space_accessible('cuda_managed', ['system', 'cuda']))
+        self.assertTrue(space_accessible('cuda', 'any'))
+        self.assertFalse(space_accessible('cuda', ['system', 'cuda_host']))
+        self.assertFalse(space_accessible('system', ['cuda']))
+        self.assertFalse(space_accessible('cuda_host', []))
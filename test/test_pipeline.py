@@ -72,6 +72,31 @@ class CorrelateTestInputBlock(SourceBlock):
         self.nframe -= nframe
         return [nframe]
 
+class RealTestInputBlock(SourceBlock):
+    """Test-only block which generates f32 data with a frame axis and a
+    'time' axis that can be transformed."""
+    def create_reader(self, idict):
+        return DictReader(idict)
+    def on_sequence(self, idict, _):
+        ohdr = {
+            '_tensor': {
+                'dtype':  'f32',
+                'shape':  [-1, idict['nchan'], idict['ntime']],
+                'labels': ['frame', 'freq', 'time'],
+                'scales': [[0, 1.], [0, 1.], [0, 1e-3]],
+                'units':  [None, None, 's']
+            }
+        }
+        self.nframe = idict['nframe']
+        return [ohdr]
+    def on_data(self, reader, ospans):
+        ospan = ospans[0]
+        odata = ospan.data
+        odata[...] = np.cos(np.arange(odata.size) * 0.1).reshape(odata.shape)
+        nframe = min(ospan.nframe, self.nframe)
+        self.nframe -= nframe
+        return [nframe]
+
 class ToComplexBlock(TransformBlock):
     """Test-only block which converts the input data to cf32 data."""
     def on_sequence(self, iseq):
@@ -160,6 +185,52 @@ class PipelineTest(unittest.TestCase):
             self.assertEqual(ref['idata'].dtype, 'float32')
             #self.assertEqual(ref['idata'].shape, (1, 5, 17))
             self.assertEqual(ref['idata'].shape, (1, 5, 24)) # TODO: Need to check this against an absolute somehow
+    def run_fused_fftshift(self, extra_reader):
+        idict = {'nchan': 4, 'nstation': 16, 'npol': 2, 'ntime': 64,
+                 'chan_bw': 1e3, 'cfreq': 60e6}
+        def check_sequence(seq):
+            tensor = seq.header['_tensor']
+            self.assertEqual(tensor['dtype'], 'cf32')
+        with bf.Pipeline(fuse_producers=True) as pipeline:
+            data = CorrelateTestInputBlock([idict], gulp_nframe=16)
+            data = copy(data, space='cuda')
+            spectra = fft(data, axes='station')
+            shifted = fftshift(spectra, axes='station')
+            if extra_reader:
+                CallbackBlock(spectra, None, None)
+            data = copy(shifted, space='cuda_host')
+            ref = {}
+            CallbackBlock(data, check_sequence, None, data_ref=ref)
+            pipeline.run()
+            fused = shifted not in pipeline.blocks
+        i = np.arange(idict['nstation'] * idict['npol'] * 2) % 255 - 127
+        i = i.reshape((idict['nstation'], idict['npol'], 2))
+        expected = np.fft.fftshift(np.fft.fft(i[...,0] + 1j*i[...,1], axis=0), axes=0)
+        np.testing.assert_allclose(ref['idata'][-1,-1], expected, RTOL, ATOL)
+        return fused
+    def test_fused_fftshift(self):
+        self.assertTrue(self.run_fused_fftshift(extra_reader=False))
+    def test_unfused_fftshift(self):
+        self.assertFalse(self.run_fused_fftshift(extra_reader=True))
+    def run_real_fftshift(self, fuse_producers):
+        idict = {'nframe': 32, 'nchan': 16, 'ntime': 64}
+        with bf.Pipeline(fuse_producers=fuse_producers) as pipeline:
+            data = RealTestInputBlock([idict], gulp_nframe=16)
+            data = copy(data, space='cuda')
+            spectra = fft(data, axes='time')
+            shifted = fftshift(spectra, axes='time')
+            data = copy(shifted, space='cuda_host')
+            ref = {}
+            CallbackBlock(data, None, None, data_ref=ref)
+            pipeline.run()
+            self.assertEqual(shifted not in pipeline.blocks, fuse_producers)
+        return ref['idata']
+    def test_fused_fftshift_r2c(self):
+        # The fused r2c transform goes through FftBlock's shift_tmp scratch
+        #   array, so check it against the unfused chain
+        unfused = self.run_real_fftshift(fuse_producers=False)
+        fused = self.run_real_fftshift(fuse_producers=True)
+        np.testing.assert_allclose(fused, unfused, RTOL, ATOL)
     def test_reduce(self):
         gulp_nframe = 128
         nreduce_freq = 2
@@ -27,9 +27,11 @@
 
 import unittest
 import os, sys
+import numpy as np
 import bifrost as bf
 
 from bifrost.blocks import *
+from bifrost.pipeline import SourceBlock
 
 from io import StringIO
 
@@ -54,6 +56,41 @@ class CallbackBlock(CopyBlock):
             self.data_ref['odata'] = ospan.data.copy()
         return super(CallbackBlock, self).on_data(ispan, ospan)
 
+class DictReader(object):
+    def __init__(self, dict_):
+        self.dict = dict_
+    def __enter__(self):
+        return self.dict
+    def __exit__(self, type, value, tb):
+        pass
+
+class RampSourceBlock(SourceBlock):
+    """Testing-only block which generates a ramp of u16 values"""
+    def create_reader(self, idict):
+        return DictReader(idict)
+    def on_sequence(self, idict, _):
+        self.nframe = idict['nframe']
+        self.iframe = 0
+        return [{'_tensor': {'dtype':  'u16',
+                             'shape':  [-1, idict['nchan']],
+                             'labels': ['time', 'freq']}}]
+    def on_data(self, reader, ospans):
+        ospan = ospans[0]
+        nframe = min(ospan.nframe, self.nframe)
+        nchan = ospan.data.shape[1]
+        ramp = np.arange(self.iframe*nchan, (self.iframe+nframe)*nchan,
+                         dtype=np.uint16)
+        ospan.data[:nframe] = ramp.reshape((nframe, nchan))
+        self.iframe += nframe
+        self.nframe -= nframe
+        return [nframe]
+
+class BypassableCopyBlock(CopyBlock):
+    """Testing-only block which removes itself from the pipeline when
+        fusion is requested"""
+    def fuse_with_producer(self, blocks):
+        return self.bypass(blocks)
+
 def identity_block(block, *args, **kwargs):
     return block
 
@@ -172,3 +209,37 @@ class PipelineTestCPU(unittest.TestCase):
             finally:
                 sys.stderr = orig_stderr
                 new_stderr.close()
+
+class FuseProducersTestCPU(unittest.TestCase):
+    def setUp(self):
+        self.idict = {'nframe': 300, 'nchan': 4}
+    def run_bypass(self, fuse_producers, view=False):
+        frames = []
+        def check_sequence(seq):
+            pass
+        def check_data(ispan, ospan):
+            frames.append(ispan.data.copy())
+        with bf.Pipeline(fuse_producers=fuse_producers) as pipeline:
+            source = RampSourceBlock([self.idict], gulp_nframe=64)
+            middle = BypassableCopyBlock(source)
+            data = middle
+            if view:
+                data = bf.views.astype(data, 'i16')
+            sink = CallbackBlock(data, check_sequence, check_data)
+            pipeline.run()
+            fused = middle not in pipeline.blocks
+            if fused:
+                self.assertIs(sink.irings[0], source.orings[0])
+            else:
+                self.assertIs(bf.pipeline.base_ring(sink.irings[0]),
+                              middle.orings[0])
+        nvalue = self.idict['nframe'] * self.idict['nchan']
+        np.testing.assert_equal(np.concatenate(frames).ravel(),
+                                np.arange(nvalue))
+        return fused
+    def test_not_fused_by_default(self):
+        self.assertFalse(self.run_bypass(fuse_producers=False))
+    def test_fused_rewires_readers(self):
+        self.assertTrue(self.run_bypass(fuse_producers=True))
+    def test_not_fused_through_view(self):
+        self.assertFalse(self.run_bypass(fuse_producers=True, view=True))
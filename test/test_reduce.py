@@ -30,6 +30,7 @@ import numpy as np
 import bifrost as bf
 from bifrost.DataType import ci4
 
+from bifrost.libbifrost import _th
 from bifrost.libbifrost_generated import BF_CUDA_ENABLED
 
 #import time
@@ -238,3 +239,47 @@ class ReduceTest(unittest.TestCase):
                     for op in ['sum', 'mean', 'pwrsum', 'pwrmean']:
                         #print(f"CI4 pow2: shape={shape}, axis={axis}, n={n}, op={op}")
                         self.run_ci4_reduce_test(shape, axis, n, op)
+
+class ReduceSystemTest(unittest.TestCase):
+    def setUp(self):
+        np.random.seed(1234)
+    def run_reduce_test(self, shape, axis, n, op='sum', dtype=np.float32):
+        a = ((np.random.random(size=shape)*2-1)*127).astype(np.int8).astype(dtype)
+        if np.issubdtype(dtype, np.complexfloating):
+            a = a + 1j*((np.random.random(size=shape)*2-1)*127).astype(np.int8)
+            a = a.astype(dtype)
+        if op[:3] == 'pwr':
+            b_gold = pwrscrunch(a, n, axis, NP_OPS[op[3:]]).astype(np.float32)
+        else:
+            b_gold = scrunch(a.astype(np.result_type(dtype, np.float32)),
+                             n, axis, NP_OPS[op])
+        a = bf.asarray(a, space='system')
+        b = bf.empty_like(b_gold, space='system')
+        bf.reduce(a, b, op)
+        np.testing.assert_allclose(b, b_gold, rtol=1e-5)
+    def test_reduce(self):
+        for shape in [(3,6,5), (16,32,64)]:
+            for axis in range(3):
+                for n in [2, None]:
+                    for op in ['sum', 'mean', 'min', 'max', 'stderr',
+                               'pwrsum', 'pwrmean', 'pwrmax']:
+                        for dtype in [np.float32, np.int16, np.complex64]:
+                            if dtype is np.complex64 and op in ('min', 'max'):
+                                continue
+                            if n == 2 and shape[axis] % 2:
+                                continue
+                            self.run_reduce_test(shape, axis, n, op, dtype)
+    def test_reduce_op_enum(self):
+        a = bf.ndarray(np.arange(24, dtype=np.float32).reshape(4,6))
+        b_gold = scrunch(np.array(a), 3, 1, np.sum)
+        for op in (_th.BFreduce_enum.sum, 0, 'BF_REDUCE_SUM'):
+            b = bf.ndarray(shape=(4,2), dtype='f32')
+            bf.reduce(a, b, op)
+            np.testing.assert_allclose(b, b_gold)
+        with self.assertRaises(ValueError):
+            bf.reduce(a, b, 100)
+    def test_reduce_invalid_shape(self):
+        a = bf.ndarray(np.ones((4,6), dtype=np.float32))
+        b = bf.ndarray(shape=(4,4), dtype='f32')
+        with self.assertRaises(ValueError):
+            bf.reduce(a, b, 'sum')
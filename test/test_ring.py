@@ -0,0 +1,228 @@
+# Copyright (c) 2026, The Bifrost Authors. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+# * Redistributions of source code must retain the above copyright
+#   notice, this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright
+#   notice, this list of conditions and the following disclaimer in the
+#   documentation and/or other materials provided with the distribution.
+# * Neither the name of The Bifrost Authors nor the names of its
+#   contributors may be used to endorse or promote products derived
+#   from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS ``AS IS'' AND ANY
+# EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED.  IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+# PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY
+# OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+import gc
+import threading
+import ctypes
+import unittest
+import numpy as np
+from bifrost.ring import Ring, ReadSpan
+from bifrost import ring2
+from bifrost.libbifrost import _bf, _get
+from bifrost.libbifrost_generated import BF_CUDA_ENABLED, BF_HWLOC_ENABLED
+
+class RingReadTest(unittest.TestCase):
+    """Test reading spans back out of a ring"""
+    def setUp(self):
+        self.ring = Ring(name="test_ring_read")
+        self.ring.resize(256, 4096)
+        self.data = np.arange(1000, dtype=np.uint8)
+        with self.ring.begin_writing() as oring:
+            with oring.begin_sequence(name="seq") as oseq:
+                with oseq.reserve(self.data.size) as ospan:
+                    ospan.data[0, :] = self.data
+    def _read(self, **kwargs):
+        spans = []
+        for iseq in self.ring.read(guarantee=True):
+            if 'n' in kwargs:
+                reader = iseq.read_batch(100, **kwargs)
+            else:
+                reader = iseq.read(100)
+            for ispan in reader:
+                spans.append((ispan.offset, ispan.data.copy()))
+        return spans
+    def test_read(self):
+        spans = self._read()
+        self.assertEqual(len(spans), 10)
+        np.testing.assert_equal(np.concatenate([d[0] for _, d in spans]),
+                                self.data)
+    def test_read_span_obj(self):
+        for iseq in self.ring.read(guarantee=True):
+            for ispan in iseq.read(100):
+                self.assertIsInstance(ispan, ReadSpan)
+                size = _get(_bf.bfRingSpanGetSize,
+                            ctypes.cast(ispan.obj, _bf.BFspan))
+                self.assertEqual(size, ispan.size)
+    def test_read_batch(self):
+        spans = self._read()
+        for n in (1, 3, 4, 16):
+            batched = self._read(n=n)
+            self.assertEqual(len(batched), len(spans))
+            for (offset, data), (boffset, bdata) in zip(spans, batched):
+                self.assertEqual(offset, boffset)
+                np.testing.assert_equal(data, bdata)
+    def test_read_span_batches(self):
+        spans = self._read()
+        offsets, sizes = [], []
+        for iseq in self.ring.read(guarantee=True):
+            for batch in iseq.read_span_batches(100, n=3):
+                self.assertEqual(len(batch), len(batch.data_ptrs))
+                offsets.extend(batch.offsets)
+                sizes.extend(batch.sizes)
+        self.assertEqual(offsets, [offset for offset, _ in spans])
+        self.assertEqual(sizes, [data.shape[-1] for _, data in spans])
+    def test_write_array(self):
+        ring = Ring(name="test_ring_write_array")
+        ring.resize(256, 4096)
+        with ring.begin_writing() as oring:
+            with oring.begin_sequence(name="seq") as oseq:
+                oseq.write_array(self.data, 100)
+        spans = []
+        for iseq in ring.read(guarantee=True):
+            for ispan in iseq.read(100):
+                spans.append(ispan.data[0].copy())
+        self.assertEqual(len(spans), 10)
+        np.testing.assert_equal(np.concatenate(spans), self.data)
+    def test_read_early_exit(self):
+        for iseq in self.ring.read(guarantee=True):
+            for ispan in iseq.read(100):
+                break
+        # Note: This would block if the span above had not been released
+        self.ring.resize(512, 8192)
+        self.assertEqual(len(self._read()), 10)
+    def test_open_sequence(self):
+        for name in ("seq", b"seq"):
+            with self.ring.open_sequence(name) as iseq:
+                self.assertEqual(iseq.name, "seq")
+    def test_data_view_cached(self):
+        for iseq in self.ring.read(guarantee=True):
+            for ispan in iseq.read(100):
+                self.assertIs(ispan.data, ispan.data)
+                self.assertFalse(ispan.data.flags['WRITEABLE'])
+
+class RingHeaderTest(unittest.TestCase):
+    """Test the types accepted for sequence headers"""
+    def _roundtrip(self, header):
+        ring = Ring(name="test_ring_header")
+        ring.resize(256)
+        with ring.begin_writing() as oring:
+            with oring.begin_sequence(name="seq", header=header):
+                pass
+        for iseq in ring.read(guarantee=True):
+            return iseq.header.tobytes()
+    def test_header_types(self):
+        text = '{"name": "\u00e9t\u00e9"}'
+        encoded = text.encode()
+        for header in (text, encoded, bytearray(encoded), memoryview(encoded),
+                       np.frombuffer(encoded, dtype=np.uint8)):
+            self.assertEqual(self._roundtrip(header), encoded)
+
+class RingAllocTest(unittest.TestCase):
+    """Test ring memory allocation options"""
+    def test_write_combined_requires_cuda_host(self):
+        with self.assertRaises(ValueError):
+            Ring(space='system', write_combined=True)
+    def test_resize_lazy(self):
+        for eager in (False, True):
+            ring = Ring(space='system')
+            ring.resize(4096, eager=eager)
+            with ring.begin_writing() as oring:
+                with oring.begin_sequence(name="seq") as oseq:
+                    with oseq.reserve(4096) as ospan:
+                        ospan.data[0, :] = np.ones(4096, dtype=np.uint8)
+            for iseq in ring.read(guarantee=True):
+                for ispan in iseq.read(4096):
+                    np.testing.assert_equal(ispan.data[0], 1)
+    def test_resize_malloc_flags(self):
+        for ring in (Ring(space='system'), ring2.Ring(space='system').view()):
+            ring.resize(4096, 16384)
+            flags = _get(_bf.bfRingGetMallocFlags, ring.obj)
+            self.assertEqual(flags & _bf.BF_MALLOC_PREFAULT, 0)
+            ring.resize(8192, 32768, eager=True)
+            flags = _get(_bf.bfRingGetMallocFlags, ring.obj)
+            self.assertEqual(flags & _bf.BF_MALLOC_PREFAULT,
+                             _bf.BF_MALLOC_PREFAULT)
+            ring.resize(8192, 32768)
+            flags = _get(_bf.bfRingGetMallocFlags, ring.obj)
+            self.assertEqual(flags & _bf.BF_MALLOC_PREFAULT, 0)
+    def test_resize_hugepages(self):
+        ring = Ring(space='system')
+        ring.resize(4 << 20, hugepages=True)
+        with ring.begin_writing() as oring:
+            with oring.begin_sequence(name="seq") as oseq:
+                with oseq.reserve(4096) as ospan:
+                    ospan.data[0, :] = np.ones(4096, dtype=np.uint8)
+        for iseq in ring.read(guarantee=True):
+            for ispan in iseq.read(4096):
+                np.testing.assert_equal(ispan.data[0], 1)
+    @unittest.skipUnless(BF_HWLOC_ENABLED, "requires hwloc support")
+    def test_numa_node(self):
+        ring = Ring(space='system', numa_node=0)
+        self.assertEqual(ring.numa_node, 0)
+        ring.resize(4096)
+        with ring.begin_writing() as oring:
+            with oring.begin_sequence(name="seq") as oseq:
+                with oseq.reserve(4096) as ospan:
+                    ospan.data[0, :] = np.ones(4096, dtype=np.uint8)
+        for iseq in ring.read(guarantee=True):
+            for ispan in iseq.read(4096):
+                np.testing.assert_equal(ispan.data[0], 1)
+    @unittest.skipUnless(BF_CUDA_ENABLED, "requires GPU support")
+    def test_write_combined(self):
+        ring = Ring(space='cuda_host', write_combined=True)
+        ring.resize(4096)
+        with ring.begin_writing() as oring:
+            with oring.begin_sequence(name="seq") as oseq:
+                with oseq.reserve(4096) as ospan:
+                    ospan.data[0, :] = np.ones(4096, dtype=np.uint8)
+
+class Ring2ViewTest(unittest.TestCase):
+    """Test views of ring2 rings"""
+    def setUp(self):
+        self.ring = ring2.Ring(name="test_ring2_view")
+        self.header = {'name': "seq", 'time_tag': 0,
+                       '_tensor': {'dtype': 'u8', 'shape': [-1, 4],
+                                   'labels': ['time', 'chan'],
+                                   'units': [None, None],
+                                   'scales': [[0, 1], [0, 1]]}}
+    def write(self):
+        with self.ring.begin_writing() as oring:
+            with oring.begin_sequence(self.header, gulp_nframe=4,
+                                      buf_nframe=16) as oseq:
+                with oseq.reserve(4) as ospan:
+                    ospan.data[...] = np.arange(16, dtype=np.uint8).reshape(4, 4)
+                    ospan.commit(4)
+    def test_view_shares_ring(self):
+        view = self.ring.view()
+        self.assertIs(view.obj, self.ring.obj)
+        self.assertIs(view.base, self.ring)
+        self.assertTrue(view.is_view)
+        # Deleting the view must not destroy the ring it shares
+        del view
+        gc.collect()
+        self.write()
+        for iseq in self.ring.read(guarantee=True):
+            for ispan in iseq.read(4):
+                np.testing.assert_equal(ispan.data[0], np.arange(4))
+    def test_ring_view_header_transform(self):
+        def add_label(hdr):
+            hdr['name'] += "_view"
+            return hdr
+        view = ring2.ring_view(ring2.ring_view(self.ring, add_label), add_label)
+        writer = threading.Thread(target=self.write)
+        writer.start()
+        names = [iseq.header['name'] for iseq in view.read(guarantee=True)]
+        writer.join()
+        self.assertEqual(names, ["seq_view_view"])
@@ -28,6 +28,10 @@ import unittest
 import bifrost
 from bifrost.sigproc import *
 import time
+import io
+import os
+import shutil
+import tempfile
 
 class Test_init(unittest.TestCase):
     def setUp(self):
@@ -207,3 +211,106 @@ class Test_data_slicing(unittest.TestCase):
     def test_different_signs(self):
         data = self.myfile.read_data(3,-3)
         self.assertEqual(data.shape, (12800 - 6, 1, 1)) # assumes more than ~100 frames in .fil
+class Test_pack(unittest.TestCase):
+    def test_pack_lsb_first(self):
+        for nbit in (1, 2, 4):
+            pack_factor = 8 // nbit
+            values = np.arange(8 * pack_factor, dtype=np.uint8) % (1 << nbit)
+            expected = np.zeros(values.size // pack_factor, dtype=np.uint8)
+            for index in range(pack_factor):
+                expected |= values[index::pack_factor] << (index * nbit)
+            packed = pack(values << (8 - nbit), nbit)
+            np.testing.assert_array_equal(packed, expected)
+    def test_unpack_pack_roundtrip(self):
+        packed = np.arange(256, dtype=np.uint8).reshape(32, 2, 4)
+        for dtype in (np.uint8, np.int8):
+            for nbit in (1, 2, 4):
+                unpacked = unpack(packed.view(dtype), nbit)
+                self.assertEqual(unpacked.shape, (32, 2, 4 * 8 // nbit))
+                self.assertEqual(unpacked.dtype, dtype)
+                np.testing.assert_array_equal(pack(unpacked, nbit),
+                                              packed.ravel())
+class Test_header(unittest.TestCase):
+    def test_write_read_header(self):
+        header = {'telescope_id': 6, 'machine_id': 10, 'data_type': 1,
+                  'source_name': 'B0329+54', 'tstart': 58000.5,
+                  'tsamp': 1e-3, 'fch1': 1500.0, 'foff': -1.0,
+                  'nbits': 8, 'nchans': 4, 'nifs': 2}
+        file_object = io.BytesIO()
+        bifrost.sigproc._write_header(header, file_object)
+        header_size = file_object.tell()
+        file_object.write(b'\x00' * 64)
+        read_header = bifrost.sigproc._read_header(file_object)
+        self.assertEqual(read_header.pop('header_size'), header_size)
+        self.assertEqual(read_header, header)
+        self.assertEqual(file_object.tell(), header_size)
+class Test_append(unittest.TestCase):
+    def test_repeated_append(self):
+        testfile = SigprocFile()
+        testfile.header = {'nifs': 2, 'nchans': 4, 'nbits': 8}
+        testfile.interpret_header()
+        chunks = [np.random.randint(63, size=8 * (i + 1)).astype('uint8')
+                  for i in range(10)]
+        for chunk in chunks:
+            testfile.append_data(chunk)
+        self.assertEqual(testfile.data.shape, (55, 2, 4))
+        self.assertEqual(testfile.get_nframe(), 55)
+        np.testing.assert_array_equal(testfile.data.ravel(),
+                                      np.concatenate(chunks))
+class Test_sigproc2_subbyte_read(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp(suffix='.tmp', prefix='bifrost_test_')
+    def tearDown(self):
+        shutil.rmtree(self.path)
+    def test_read_all_frames(self):
+        from bifrost import sigproc2
+        packed = (np.arange(2 * 64 * 32) % 251).astype(np.uint8)
+        for nbit in (1, 2, 4):
+            filename = os.path.join(self.path, f"{nbit}bit.fil")
+            header = {'telescope_id': 0, 'machine_id': 0, 'data_type': 1,
+                      'nbits': nbit, 'nchans': 64, 'nifs': 2}
+            with open(filename, 'wb') as file_object:
+                sigproc2.write_header(header, file_object)
+                packed.tofile(file_object)
+            with sigproc2.SigprocFile(filename) as testfile:
+                nframe = packed.size * 8 // nbit // (2 * 64)
+                self.assertEqual(testfile.nframe(), nframe)
+                data = testfile.read(0, -1)
+                self.assertEqual(data.shape, (nframe, 2, 64))
+                np.testing.assert_array_equal(data.ravel(),
+                                              sigproc2.unpack(packed, nbit).ravel())
+    def test_unpack_signed(self):
+        from bifrost import sigproc2
+        packed = np.arange(256, dtype=np.uint8)
+        for nbit in (1, 2, 4):
+            pack_factor = 8 // nbit
+            expected = np.empty((256, pack_factor), dtype=np.int8)
+            for index in range(pack_factor):
+                value = (packed >> (index * nbit)) << (8 - nbit)
+                expected[:, index] = value.view(np.int8) >> (8 - nbit)
+            unpacked = sigproc2.unpack(packed.view(np.int8), nbit)
+            np.testing.assert_array_equal(unpacked, expected.ravel())
+
+class Test_sigproc2_read_channels(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp(suffix='.tmp', prefix='bifrost_test_')
+    def tearDown(self):
+        shutil.rmtree(self.path)
+    def test_read_channels_f32(self):
+        from bifrost import sigproc2
+        raw = (np.arange(2 * 16 * 40) % 251).astype(np.uint8)
+        for nbit in (8, 4):
+            filename = os.path.join(self.path, f"{nbit}bit.fil")
+            header = {'telescope_id': 0, 'machine_id': 0, 'data_type': 1,
+                      'nbits': nbit, 'nchans': 16, 'nifs': 2}
+            with open(filename, 'wb') as file_object:
+                sigproc2.write_header(header, file_object)
+                raw.tofile(file_object)
+            with sigproc2.SigprocFile(filename) as testfile:
+                expected = np.moveaxis(testfile.read(25).astype(np.float32), 0, -1)
+            with sigproc2.SigprocFile(filename) as testfile:
+                data = testfile.read_channels_f32(25)
+            self.assertEqual(data.dtype, np.float32)
+            self.assertEqual(data.shape, (2, 16, 25))
+            self.assertTrue(data.flags['C_CONTIGUOUS'])
+            np.testing.assert_array_equal(data, expected)
@@ -36,7 +36,7 @@ from contextlib import closing
 from bifrost.ring import Ring
 from bifrost.address import Address
 from bifrost.udp_socket import UDPSocket
-from bifrost.packet_writer import HeaderInfo, UDPTransmit
+from bifrost.packet_writer import HeaderInfo, UDPTransmit, UDPZCTransmit
 from bifrost.packet_capture import PacketCaptureCallback, UDPCapture
 from bifrost.quantize import quantize
 import numpy as np
@@ -189,6 +189,73 @@ class TBNUDPIOTest(BaseUDPIOTest.BaseUDPIOTestCase):
                     
             # Clean up
             del oop
+    def test_read_zerocopy(self):
+        # Setup the ring
+        ring = Ring(name="capture_tbn_zc")
+        
+        # Setup the blocks
+        addr = Address('127.0.0.1', 7147)
+        ## Output via UDPZCTransmit
+        with closing(UDPSocket()) as osock:
+            osock.connect(addr)
+            oop = UDPZCTransmit('tbn', osock)
+            ## Input via UDPCapture
+            with closing(UDPSocket()) as isock:
+                isock.bind(addr)
+                isock.timeout = 0.1
+                iop = TBNReader(isock, ring, nsrc=32)
+                ## Data accumulation
+                times = []
+                final = []
+                aop = AccumulateOp(ring, times, final, 32*512*2)
+                
+                # Start the reader and accumlator threads
+                reader = threading.Thread(target=iop.main)
+                accumu = threading.Thread(target=aop.main)
+                reader.start()
+                accumu.start()
+                
+                # Get TBN data and send it off
+                timetag0, hdr_desc, data = self._get_data()
+                for p in range(data.shape[0]):
+                    oop.send(hdr_desc, timetag0+p*1960*512, 1960*512, 0, 1, data[[p],...])
+                    time.sleep(0.001)
+                reader.join()
+                accumu.join()
+                
+                # Compare
+                for seq_timetag,seq_data in zip(times, final):
+                    ## Loop over sequences
+                    seq_data = np.array(seq_data, dtype=np.uint8)
+                    seq_data = seq_data.reshape(-1,512,32,2)
+                    seq_data = seq_data.transpose(0,2,1,3).copy()
+                    ## Drop the last axis (complexity) since we are going to ci8
+                    seq_data = bf.ndarray(shape=seq_data.shape[:-1], dtype='ci8', buffer=seq_data.ctypes.data)
+                    
+                    ## Ignore the first set of packets
+                    np.testing.assert_equal(seq_data[1:,...], data[1:,...])
+                    
+            # Clean up
+            del oop
+    def test_busy_poll(self):
+        ring = Ring(name="capture_tbn_busy_poll")
+        addr = Address('127.0.0.1', 7147)
+        with closing(UDPSocket()) as sock:
+            sock.bind(addr)
+            sock.busy_poll = 0
+            self.assertEqual(sock.busy_poll, 0)
+            try:
+                sock.busy_poll = 1
+            except RuntimeError:
+                self.skipTest("raising SO_BUSY_POLL requires CAP_NET_ADMIN")
+            iop = TBNReader(sock, ring, nsrc=32)
+            seq_callback = PacketCaptureCallback()
+            seq_callback.set_tbn(iop.callback)
+            with UDPCapture("tbn", sock, ring, 32, 0, 9000, 16, 128,
+                            sequence_callback=seq_callback,
+                            busy_poll_us=25) as capture:
+                self.assertEqual(sock.busy_poll, 25)
+            del capture
     def test_write_multicast(self):
         addr = Address('224.0.0.251', 7147)
         with closing(UDPSocket()) as sock: